@@ -0,0 +1,167 @@
+"""
+Runs the benchmark suite of `benchmarks.suite` and compares results with a saved baseline.
+
+    python -m benchmarks run [--filter SUBSTRING] [--repeat N] [--output results.json]
+    python -m benchmarks run --compare baseline.json [--threshold 0.1]
+    python -m benchmarks compare baseline.json results.json [--threshold 0.1]
+    python -m benchmarks list
+
+Results are JSON: environment metadata and, per case, the best, median and mean time of one
+call in seconds. A case whose median grew by more than the threshold is reported as a
+regression and makes the command exit with status 1.
+"""
+
+import argparse
+import json
+import pathlib
+import platform
+import statistics
+import sys
+import time
+import typing
+
+import PIL
+
+from benchmarks.suite import CASES
+
+# Upper bound on calls per sample for cases faster than the timer resolution.
+MAX_NUMBER = 1_000_000
+
+
+def time_case(
+    fn: typing.Callable[[], typing.Any], repeat: int, min_time: float
+) -> dict[str, typing.Any]:
+    fn()
+    # Calls per sample so that a sample lasts at least `min_time`.
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or number >= MAX_NUMBER:
+            break
+        number *= 2 if elapsed * 2 >= min_time else 10
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started) / number)
+    return {
+        "best": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def run(args: argparse.Namespace) -> int:
+    results: dict[str, typing.Any] = {
+        "meta": {
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": {},
+    }
+    for case in CASES:
+        if args.filter and args.filter not in case.name:
+            continue
+        result = time_case(case.setup(), args.repeat, args.min_time)
+        results["results"][case.name] = result
+        print(
+            f"{case.name:<44} {result['median'] * 1000:10.3f}ms "
+            f"(best {result['best'] * 1000:.3f}ms, {result['repeat']}x{result['number']})",
+            file=sys.stderr,
+        )
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        pathlib.Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    if args.compare:
+        baseline = json.loads(pathlib.Path(args.compare).read_text(encoding="utf-8"))
+        return compare_results(baseline, results, args.threshold)
+    return 0
+
+
+def compare_results(
+    baseline: dict[str, typing.Any], current: dict[str, typing.Any], threshold: float
+) -> int:
+    regressions = 0
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<44} {'new':>10}", file=sys.stderr)
+            continue
+        ratio = result["median"] / before["median"]
+        if ratio > 1 + threshold:
+            status = "REGRESSION"
+            regressions += 1
+        elif ratio < 1 - threshold:
+            status = "improved"
+        else:
+            status = "same"
+        print(
+            f"{name:<44} {before['median'] * 1000:10.3f}ms -> {result['median'] * 1000:10.3f}ms "
+            f"{ratio:6.2f}x  {status}",
+            file=sys.stderr,
+        )
+    for name in baseline["results"].keys() - current["results"].keys():
+        print(f"{name:<44} {'missing':>10}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    baseline, current = (
+        json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
+        for path in (args.baseline, args.current)
+    )
+    return compare_results(baseline, current, args.threshold)
+
+
+def list_cases(_args: argparse.Namespace) -> int:
+    for case in CASES:
+        print(case.name)
+    return 0
+
+
+def main(argv: typing.Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description=__doc__.split("\n\n")[0]
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the suite and print JSON results")
+    run_parser.add_argument("--filter", help="only run cases whose name contains this string")
+    run_parser.add_argument("--repeat", type=int, default=5, help="samples per case")
+    run_parser.add_argument(
+        "--min-time", type=float, default=0.05, help="minimal duration of a sample in seconds"
+    )
+    run_parser.add_argument("--output", help="write the JSON results to this file")
+    run_parser.add_argument("--compare", help="baseline JSON file to compare the results with")
+    run_parser.add_argument(
+        "--threshold", type=float, default=0.1, help="relative slowdown reported as a regression"
+    )
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two JSON result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    compare_parser.set_defaults(handler=compare)
+
+    list_parser = commands.add_parser("list", help="list the benchmark cases")
+    list_parser.set_defaults(handler=list_cases)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""
+Measures the throughput of rendering quote cards in one process against `BatchRenderer` worker
+processes, in ordered and unordered mode.
+
+Run with `python -m benchmarks.bench_batch [renders]`.
+"""
+
+import os
+import sys
+import time
+
+from benchmarks.fixtures import fixture_generator, fixture_request
+from quote_image_generator import BatchRenderer
+
+
+def report(name: str, renders: int, elapsed: float) -> None:
+    print(f"{name:<34} {renders / elapsed:8.1f} cards/s   {elapsed * 1000:9.1f}ms")
+
+
+def main(renders: int = 128) -> None:
+    print(f"{renders} renders, {os.cpu_count()} CPUs")
+    generator = fixture_generator()
+    generator.generate_quote(**fixture_request())
+
+    started = time.perf_counter()
+    for index in range(renders):
+        generator.generate_quote(**fixture_request(index))
+    report("single process", renders, time.perf_counter() - started)
+
+    for processes in sorted({2, os.cpu_count() or 1}):
+        with BatchRenderer(fixture_generator, processes=processes) as renderer:
+            for ordered in (True, False):
+                started = time.perf_counter()
+                for _ in renderer.render(
+                    (fixture_request(index) for index in range(renders)), ordered=ordered
+                ):
+                    pass
+                elapsed = time.perf_counter() - started
+                report(f"processes x{processes} ordered={ordered}", renders, elapsed)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,55 @@
+"""
+Measures the throughput of rendering many quote cards one after another against
+`QuoteGenerator.generate_many` and `QuoteGenerator.agenerate_quote` on the render thread pool.
+
+Run with `python -m benchmarks.bench_concurrency [renders]`.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+from benchmarks.fixtures import fixture_generator, fixture_request
+
+
+def report(name: str, renders: int, elapsed: float) -> None:
+    print(f"{name:<34} {renders / elapsed:8.1f} cards/s   {elapsed * 1000:9.1f}ms")
+
+
+async def render_async(generator, renders: int) -> None:
+    await asyncio.gather(
+        *(generator.agenerate_quote(**fixture_request(index)) for index in range(renders))
+    )
+
+
+def main(renders: int = 64) -> None:
+    print(f"{renders} renders, {os.cpu_count()} CPUs")
+    generator = fixture_generator()
+    # Warm the font, emoji and gradient caches so every run measures rendering only.
+    generator.generate_quote(**fixture_request())
+
+    started = time.perf_counter()
+    for index in range(renders):
+        generator.generate_quote(**fixture_request(index))
+    report("sequential", renders, time.perf_counter() - started)
+
+    for workers in (2, 4, os.cpu_count() or 1):
+        with fixture_generator(max_workers=workers) as threaded:
+            threaded.generate_quote(**fixture_request())
+            for ordered in (True, False):
+                started = time.perf_counter()
+                for _ in threaded.generate_many(
+                    (fixture_request(index) for index in range(renders)), ordered=ordered
+                ):
+                    pass
+                elapsed = time.perf_counter() - started
+                report(f"generate_many x{workers} ordered={ordered}", renders, elapsed)
+
+            started = time.perf_counter()
+            asyncio.run(render_async(threaded, renders))
+            report(f"agenerate_quote x{workers}", renders, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
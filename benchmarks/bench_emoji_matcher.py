@@ -0,0 +1,83 @@
+"""
+Compares the alternation regex of `FileEmojiSource.get_emoji_regex` with the trie
+`EmojiMatcher`: cold start (compile, build, load from disk) and segmentation throughput over a
+mixed Cyrillic/Latin/emoji corpus.
+
+Run with `python -m benchmarks.bench_emoji_matcher`.
+"""
+
+import random
+import time
+
+from benchmarks.fixtures import EMOJI_SEQUENCES, fixture_emoji_dir
+from quote_image_generator import processors
+from quote_image_generator.processors.emoji_matcher import EmojiMatcher
+
+EMOJI_COUNT = 3600
+WORDS = (
+    "Цитаты",
+    "великих",
+    "людей",
+    "сегодня",
+    "quote",
+    "of",
+    "the",
+    "day",
+    "lorem",
+    "ipsum",
+)
+
+
+def make_corpus(emoji: list[str], lines: int = 2000, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        " ".join(
+            rng.choice(emoji) if rng.random() < 0.15 else rng.choice(WORDS)  # noqa: PLR2004
+            for _ in range(rng.randint(3, 30))
+        )
+        for _ in range(lines)
+    ]
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def regex_split(pattern, corpus: list[str]) -> int:
+    return sum(1 for text in corpus for chunk in pattern.split(text) if chunk)
+
+
+def matcher_split(matcher: EmojiMatcher, corpus: list[str]) -> int:
+    return sum(len(matcher.split(text)) for text in corpus)
+
+
+def main() -> None:
+    emoji_dir = fixture_emoji_dir(EMOJI_COUNT)
+    source = processors.FileEmojiSource(emoji_dir, save_matcher=False)
+    emoji = sorted(source.emoji_table)
+    corpus = make_corpus(list(EMOJI_SEQUENCES) + emoji[:200])
+    corpus_bytes = sum(len(text.encode("utf-8")) for text in corpus)
+
+    pattern, compile_time = timed(source.get_emoji_regex)
+    matcher, build_time = timed(EmojiMatcher, emoji)
+    matcher_file = source.cache_dir / source.MATCHER_FILE_NAME
+    matcher.dump(matcher_file, "benchmark")
+    _, load_time = timed(EmojiMatcher.load, matcher_file, "benchmark")
+
+    print(f"emoji table: {len(emoji)} sequences, corpus: {corpus_bytes / 1024:.0f} KiB")
+    print(f"regex compile    {compile_time * 1000:9.2f}ms")
+    print(f"matcher build    {build_time * 1000:9.2f}ms")
+    print(f"matcher load     {load_time * 1000:9.2f}ms")
+
+    _, regex_time = timed(regex_split, pattern, corpus)
+    _, matcher_time = timed(matcher_split, matcher, corpus)
+    for name, elapsed in (("regex split", regex_time), ("matcher split", matcher_time)):
+        print(
+            f"{name:<16} {elapsed * 1000:9.2f}ms {corpus_bytes / elapsed / 1024 / 1024:8.2f} MiB/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Counts FreeType font loads and measures the time needed to fit text into a box, comparing the
+previous linear walk over font sizes with the search used by `TextProcessor`.
+
+Run with `python -m benchmarks.bench_font_fit`.
+"""
+
+import contextlib
+import functools
+import math
+import time
+import typing
+
+from PIL import ImageFont
+
+from benchmarks.fixtures import fixture_emoji_dir, fixture_font, fixture_fontset
+from quote_image_generator import processors, types
+
+CASES = (
+    ("short title, wide box", "Quote of the day 😂", types.Size(1500, 50)),
+    ("long quote, large box", "Lorem ipsum dolor sit amet 🔥 " * 20, types.Size(1500, 495)),
+    ("long title, narrow box", "Lorem ipsum dolor sit amet 🔥 " * 3, types.Size(300, 100)),
+)
+
+
+@contextlib.contextmanager
+def count_font_loads() -> typing.Iterator[list[int]]:
+    counter = [0]
+    truetype = ImageFont.truetype
+
+    def counting_truetype(*args, **kwargs):
+        counter[0] += 1
+        return truetype(*args, **kwargs)
+
+    ImageFont.truetype = counting_truetype
+    try:
+        yield counter
+    finally:
+        ImageFont.truetype = truetype
+
+
+def linear_fit(
+    text_processor: processors.TextProcessor,
+    text: str,
+    max_box_size: types.Size,
+    font_path: str,
+    max_font_size: int,
+) -> tuple[int, types.Size]:
+    """The walk `TextProcessor.get_line_size_by_box` used before the search was introduced."""
+    emojies = text_processor.emoji_source.get_emojies(text)
+    for emoji in emojies:
+        text = text.replace(emoji, "", 1)
+    for size in range(max_font_size, 0, -1):
+        font = ImageFont.truetype(font_path, size=size, encoding="utf-8")
+        text_size = types.Size(
+            math.floor(font.getlength(text))
+            + math.floor(len(emojies) * size * text_processor.emoji_source.emoji_scale),
+            size,
+        )
+        if text_size.width <= max_box_size.width and text_size.height <= max_box_size.height:
+            return size, text_size
+    raise ValueError("Unable to fit text")
+
+
+def entities_for(
+    text: str, entities_processor: processors.EntitiesProcessor
+) -> list[types.DrawEntity]:
+    return entities_processor.convert_input_to_draw_entity(
+        text, [types.InputEntity(type="bold", offset=0, length=len(text) // 2)]
+    )
+
+
+def main() -> None:
+    font = fixture_font()
+    text_processor = processors.TextProcessor(
+        processors.FileEmojiSource(fixture_emoji_dir()),
+        font_registry=processors.FontRegistry(),
+    )
+    entities_processor = processors.EntitiesProcessor(
+        fixture_fontset(), types.ColorSet((255, 255, 255), (0, 0, 255), (255, 0, 0))
+    )
+
+    for name, text, box in CASES:
+        fitters = (
+            ("linear line", functools.partial(linear_fit, text_processor, text, box, font, 128)),
+            (
+                "search line",
+                functools.partial(text_processor.get_line_size_by_box, text, box, font, 128),
+            ),
+            (
+                "search entities",
+                functools.partial(
+                    text_processor.get_entities_size,
+                    entities_for(text, entities_processor),
+                    types.SizeBox(0, 0, *box),
+                    128,
+                ),
+            ),
+        )
+        for fitter_name, fit in fitters:
+            text_processor.font_registry.clear()
+            with count_font_loads() as loads:
+                started = time.perf_counter()
+                size, _ = fit()
+                elapsed = time.perf_counter() - started
+            print(
+                f"{name:<24} {fitter_name:<16} size={size:<4} font loads={loads[0]:<4} "
+                f"time={elapsed * 1000:.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Times `GradientBackgroundPipeLine` for every direction at common card sizes and compares the
+result with the per-pixel drawing the pipeline used before.
+
+Run with `python -m benchmarks.bench_gradient`, add `--no-legacy` to skip the slow reference.
+"""
+
+import sys
+import time
+
+from PIL import Image, ImageChops, ImageDraw
+
+from quote_image_generator.pipelines.background import GradientBackgroundPipeLine
+
+SIZES = ((1600, 900), (900, 900), (320, 180))
+DIRECTIONS = ("l-r", "t-b", "lt-rb", "rt-lb")
+FROM_COLOR = (255, 0, 0, 255)
+TO_COLOR = (0, 0, 255, 255)
+
+
+def legacy_gradient(
+    pipe: GradientBackgroundPipeLine, width: int, height: int, direction: str
+) -> Image.Image:
+    gradient = Image.new("RGBA", (width, height))
+    draw = ImageDraw.Draw(gradient)
+    if direction == "l-r":
+        for x in range(width):
+            color = pipe._blend_colors(FROM_COLOR, TO_COLOR, x / width)
+            draw.line([(x, 0), (x, height)], fill=color)
+    elif direction == "t-b":
+        for y in range(height):
+            color = pipe._blend_colors(FROM_COLOR, TO_COLOR, y / height)
+            draw.line([(0, y), (width, y)], fill=color)
+    else:
+        for y in range(height):
+            for x in range(width):
+                blend = (
+                    (x + y) / (width + height)
+                    if direction == "lt-rb"
+                    else (width - x + y) / (width + height)
+                )
+                draw.point((x, y), fill=pipe._blend_colors(FROM_COLOR, TO_COLOR, blend))
+    return gradient
+
+
+def best_of(repeat: int, fn, *args) -> tuple[Image.Image, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return result, best
+
+
+def main(legacy: bool = True) -> None:
+    pipe = GradientBackgroundPipeLine()
+    for width, height in SIZES:
+        for direction in DIRECTIONS:
+            gradient, elapsed = best_of(
+                5, pipe._create_gradient, width, height, FROM_COLOR, TO_COLOR, direction
+            )
+            line = f"{width}x{height:<5} {direction:<6} {elapsed * 1000:9.2f}ms"
+            if legacy:
+                reference, legacy_elapsed = best_of(
+                    1, legacy_gradient, pipe, width, height, direction
+                )
+                identical = ImageChops.difference(gradient, reference).getbbox() is None
+                line += f"   legacy {legacy_elapsed * 1000:9.2f}ms   identical={identical}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main(legacy="--no-legacy" not in sys.argv)
@@ -0,0 +1,30 @@
+"""
+Simulates an edit preview where only the author name changes between renders and compares
+direct rendering with the layered mode of `QuoteGenerator`.
+
+Run with `python -m benchmarks.bench_layers [renders]`.
+"""
+
+import sys
+import time
+
+from benchmarks.fixtures import fixture_generator, fixture_request
+
+
+def main(renders: int = 32) -> None:
+    request = fixture_request()
+    edits = [{**request, "author_name_content": f"© Author {index}"} for index in range(renders)]
+    direct = fixture_generator()
+    layered = fixture_generator(layered=True)
+    for name, generator in (("direct", direct), ("layered", layered)):
+        generator.render(**request)
+        started = time.perf_counter()
+        for edit in edits:
+            generator.render(**edit)
+        elapsed = time.perf_counter() - started
+        print(f"{name:<8} {elapsed / renders * 1000:8.2f}ms/render")
+    print(f"{'':<8} {layered.layer_cache_stats}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
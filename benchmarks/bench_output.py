@@ -0,0 +1,45 @@
+"""
+Compares the time and size of the encodings `OutputSpec` can select for a rendered quote card.
+
+Run with `python -m benchmarks.bench_output`.
+"""
+
+import io
+import time
+
+from benchmarks.fixtures import fixture_generator, fixture_request
+from quote_image_generator.types import OutputSpec
+
+SPECS = (
+    OutputSpec(),
+    OutputSpec(compress_level=1),
+    OutputSpec(compress_level=0),
+    OutputSpec("WEBP", quality=80, method=0),
+    OutputSpec("WEBP", quality=80, method=4),
+    OutputSpec("WEBP", lossless=True, method=0),
+    OutputSpec("JPEG", quality=85),
+)
+
+
+def main(repeat: int = 5) -> None:
+    generator = fixture_generator()
+    started = time.perf_counter()
+    image = generator.render(**fixture_request())
+    print(f"{'render':<52} {(time.perf_counter() - started) * 1000:9.2f}ms")
+
+    for spec in SPECS:
+        best = float("inf")
+        for _ in range(repeat):
+            output = io.BytesIO()
+            started = time.perf_counter()
+            generator.save_image(image, output, spec)
+            best = min(best, time.perf_counter() - started)
+        options = ", ".join(f"{key}={value}" for key, value in spec.save_options().items())
+        print(
+            f"{spec.format:<5} {options:<46} {best * 1000:9.2f}ms "
+            f"{len(output.getvalue()) / 1024:9.1f}KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Measures `QuoteGenerator` renders with and without the prefix canvas cache, for two templates:
+
+- `fixture`: the quote and the author change, the avatar pipe runs after the quote.
+- `quote last`: the same pipes with the quote drawn last and only the quote changing.
+
+Run with `python -m benchmarks.bench_prefix_cache [renders]`.
+"""
+
+import sys
+import time
+
+from benchmarks.fixtures import fixture_generator, fixture_request
+from quote_image_generator import QuoteGenerator
+
+
+def quote_last(generator: QuoteGenerator) -> QuoteGenerator:
+    generator.pipeline = [
+        *(pipe for pipe in generator.pipeline if getattr(pipe, "key", None) != "quote"),
+        *(pipe for pipe in generator.pipeline if getattr(pipe, "key", None) == "quote"),
+    ]
+    return generator
+
+
+def quote_only_request(index: int) -> dict:
+    request = fixture_request()
+    request["quote_input_text"] = fixture_request(index)["quote_input_text"]
+    return request
+
+
+def main(renders: int = 32) -> None:
+    templates = (
+        ("fixture", lambda generator: generator, fixture_request),
+        ("quote last", quote_last, quote_only_request),
+    )
+    for template, prepare, make_request in templates:
+        for prefix_cache_size in (0, 8):
+            generator = prepare(fixture_generator(prefix_cache_size=prefix_cache_size))
+            generator.render(**make_request(0))
+            started = time.perf_counter()
+            for index in range(renders):
+                generator.render(**make_request(index))
+            elapsed = time.perf_counter() - started
+            print(
+                f"{template:<12} prefix_cache_size={prefix_cache_size:<3} "
+                f"{elapsed / renders * 1000:8.2f}ms/render   {generator.prefix_cache_stats}"
+            )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
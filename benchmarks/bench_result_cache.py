@@ -0,0 +1,45 @@
+"""
+Measures `generate_quote` with a `ResultCache`: cold renders, memory hits, disk hits from a
+fresh generator sharing the cache directory, and identical requests issued concurrently.
+
+Run with `python -m benchmarks.bench_result_cache [renders]`.
+"""
+
+import sys
+import tempfile
+import time
+
+from benchmarks.fixtures import fixture_generator, fixture_request
+from quote_image_generator import ResultCache
+
+
+def timed(name: str, renders: int, fn) -> None:
+    started = time.perf_counter()
+    for index in range(renders):
+        fn(index)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<12} {elapsed / renders * 1000:9.3f}ms/request")
+
+
+def main(renders: int = 16) -> None:
+    with tempfile.TemporaryDirectory(prefix="qig-results-") as disk_dir:
+        generator = fixture_generator(result_cache=ResultCache(disk_dir=disk_dir))
+        generator.generate_quote(**fixture_request(-1))
+
+        timed("cold", renders, lambda i: generator.generate_quote(**fixture_request(i)))
+        timed("memory hit", renders, lambda i: generator.generate_quote(**fixture_request(i)))
+        reopened = fixture_generator(result_cache=ResultCache(disk_dir=disk_dir))
+        timed("disk hit", renders, lambda i: reopened.generate_quote(**fixture_request(i)))
+        print(f"{'':<12} {reopened.result_cache.stats}")
+
+        with fixture_generator(result_cache=ResultCache(), max_workers=8) as concurrent:
+            started = time.perf_counter()
+            for _ in concurrent.generate_many(fixture_request(0) for _ in range(renders)):
+                pass
+            elapsed = time.perf_counter() - started
+            print(f"{'coalesced':<12} {elapsed / renders * 1000:9.3f}ms/request")
+            print(f"{'':<12} {concurrent.result_cache.stats}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,53 @@
+"""
+Measures converting entities with UTF-16 offsets on emoji-dense text: re-encoding the text
+prefix for every entity, the usual workaround, against `offset_unit="utf16"`, which builds
+one offset index for the text.
+
+Run with `python -m benchmarks.bench_utf16_offsets [words]`.
+"""
+
+import sys
+import time
+
+from benchmarks.fixtures import fixture_generator, fixture_utf16_entities
+from quote_image_generator import types
+
+ROUNDS = 5
+
+
+def _code_point_offset(text: str, offset: int) -> int:
+    return len(text.encode("utf-16-le")[: offset * 2].decode("utf-16-le", "ignore"))
+
+
+def _reencoded(text: str, entities: tuple[types.InputEntity, ...]) -> list[types.InputEntity]:
+    converted = []
+    for entity in entities:
+        offset = _code_point_offset(text, entity["offset"])
+        end = _code_point_offset(text, entity["offset"] + entity["length"])
+        converted.append(
+            types.InputEntity(type=entity["type"], offset=offset, length=end - offset)
+        )
+    return converted
+
+
+def main(words: int = 2000) -> None:
+    text, entities = fixture_utf16_entities(words)
+    processor = fixture_generator().entities_processor
+
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        processor.convert_input_to_draw_entity(text, _reencoded(text, entities))
+    reencoded = (time.perf_counter() - started) / ROUNDS
+
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        processor.convert_input_to_draw_entity(text, list(entities), "utf16")
+    indexed = (time.perf_counter() - started) / ROUNDS
+
+    print(f"{len(text)} code points, {len(entities)} entities")
+    print(f"re-encode per entity    {reencoded * 1000:8.2f}ms")
+    print(f"offset_unit='utf16'     {indexed * 1000:8.2f}ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,39 @@
+"""
+Measures rendering a quote at several sizes with one `QuoteGenerator.generate_variants` call
+against one generator per size. Rendering and encoding dominate and `prepare` shares little,
+so `generate_variants` is only faster when its renders run in parallel on more than one CPU.
+
+Run with `python -m benchmarks.bench_variants [rounds]`.
+"""
+
+import os
+import sys
+import time
+
+from benchmarks.fixtures import fixture_avatar, fixture_generator, fixture_request
+
+SIZES = ((1600, 900), (900, 900), (320, 180))
+
+
+def main(rounds: int = 8) -> None:
+    request = {**fixture_request(), "author_image_image": fixture_avatar((1600, 1200))}
+    generators = {size: fixture_generator(size) for size in SIZES}
+    generator = fixture_generator()
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for size in SIZES:
+            generators[size].generate_quote(**request)
+    separate = (time.perf_counter() - started) / rounds
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        generator.generate_variants(SIZES, **request)
+    shared = (time.perf_counter() - started) / rounds
+
+    print(f"one generator per size  {separate * 1000:8.2f}ms/quote")
+    print(f"generate_variants       {shared * 1000:8.2f}ms/quote ({os.cpu_count()} CPUs)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,197 @@
+"""
+Offline fixtures for the benchmarks: a font extracted from the one embedded in Pillow and a
+directory of generated emoji images named the way `FileEmojiSource` expects.
+"""
+
+import functools
+import io
+import pathlib
+import tempfile
+import typing
+
+from PIL import Image, ImageDraw, ImageFont
+
+from quote_image_generator import QuoteGenerator, pipelines, processors, types
+
+__all__ = (
+    "EMOJI_SEQUENCES",
+    "fixture_avatar",
+    "fixture_dir",
+    "fixture_emoji_dir",
+    "fixture_entities",
+    "fixture_font",
+    "fixture_fontset",
+    "fixture_generator",
+    "fixture_request",
+    "fixture_utf16_entities",
+)
+
+
+EMOJI_SEQUENCES = (
+    "😂",
+    "👍",
+    "🔥",
+    "❤️",
+    "❤️‍🔥",
+    "😀",
+    "👨‍👩‍👧",
+    "🇺🇦",
+    "✨",
+    "🎉",
+)
+# `fixture_entities` puts emoji after every EMOJI_EVERY-th word and a line break after every
+# NEWLINE_EVERY-th one.
+EMOJI_EVERY = 5
+NEWLINE_EVERY = 11
+
+
+@functools.cache
+def fixture_dir() -> pathlib.Path:
+    return pathlib.Path(tempfile.mkdtemp(prefix="qig-bench-"))
+
+
+@functools.cache
+def fixture_font() -> str:
+    path = fixture_dir() / "fixture.ttf"
+    font = ImageFont.load_default(size=16)
+    if not isinstance(font, ImageFont.FreeTypeFont):
+        raise RuntimeError("Pillow was built without FreeType support")
+    path.write_bytes(font.font_bytes)
+    return str(path)
+
+
+def fixture_fontset() -> types.FontSet:
+    font = fixture_font()
+    return types.FontSet(default=font, bold=font, italic=font, mono=font)
+
+
+def _emoji_file_name(sequence: str) -> str:
+    return " ".join(f"U+{ord(char):X}" for char in sequence) + ".png"
+
+
+@functools.cache
+def fixture_emoji_dir(extra: int = 0) -> pathlib.Path:
+    """
+    Emoji directory with `EMOJI_SEQUENCES` plus `extra` single code point emoji taken from the
+    pictographs blocks, so the emoji table can be grown to a realistic size.
+    """
+    path = fixture_dir() / f"emoji-{extra}"
+    path.mkdir()
+    extra_sequences = tuple(chr(0x1F300 + index) for index in range(extra))
+    for index, sequence in enumerate(dict.fromkeys(EMOJI_SEQUENCES + extra_sequences)):
+        image = Image.new("RGBA", (72, 72), (0, 0, 0, 0))
+        ImageDraw.Draw(image).ellipse(
+            (4, 4, 68, 68), fill=((index * 37) % 256, (index * 91) % 256, (index * 53) % 256)
+        )
+        image.save(path / _emoji_file_name(sequence))
+    return path
+
+
+@functools.cache
+def fixture_avatar(size: tuple[int, int] = (800, 600)) -> bytes:
+    """JPEG photo-like avatar: a gradient with a few shapes, so it does not compress to nothing."""
+    width, height = size
+    image = Image.linear_gradient("L").resize(size).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((width // 8, height // 6, width * 5 // 8, height * 2 // 3), fill=(0, 50, 200))
+    draw.ellipse((width // 2, height // 3, width * 7 // 8, height * 5 // 6), fill=(200, 100, 50))
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+
+@functools.cache
+def fixture_entities(count: int) -> tuple[str, tuple[types.InputEntity, ...]]:
+    """Text of `count` words with emoji, each word carrying an entity, cycling through types."""
+    entity_types: tuple[types.InputEntityType, ...] = (
+        "bold",
+        "italic",
+        "underline",
+        "strikethrough",
+        "code",
+        "link",
+    )
+    parts: list[str] = []
+    entities: list[types.InputEntity] = []
+    offset = 0
+    for index in range(count):
+        word = f"word{index}"
+        entities.append(
+            types.InputEntity(
+                type=entity_types[index % len(entity_types)], offset=offset, length=len(word)
+            )
+        )
+        separator = (
+            f" {EMOJI_SEQUENCES[index % len(EMOJI_SEQUENCES)]} "
+            if index % EMOJI_EVERY == EMOJI_EVERY - 1
+            else ("\n" if index % NEWLINE_EVERY == NEWLINE_EVERY - 1 else " ")
+        )
+        parts.append(word + separator)
+        offset += len(word) + len(separator)
+    return "".join(parts), tuple(entities)
+
+
+def fixture_utf16_entities(count: int) -> tuple[str, tuple[types.InputEntity, ...]]:
+    """
+    Emoji-dense text of `count` words, each followed by two emoji and carrying an entity whose
+    offset and length count UTF-16 code units.
+    """
+    text, entities = fixture_entities(count)
+    parts: list[str] = []
+    utf16_entities: list[types.InputEntity] = []
+    offset = 0
+    for index, entity in enumerate(entities):
+        word = text[entity["offset"] : entity["offset"] + entity["length"]]
+        separator = (
+            f" {EMOJI_SEQUENCES[index % len(EMOJI_SEQUENCES)]}"
+            f"{EMOJI_SEQUENCES[(index + 3) % len(EMOJI_SEQUENCES)]} "
+        )
+        utf16_entities.append({**entity, "offset": offset, "length": len(word)})
+        parts.append(word + separator)
+        offset += len((word + separator).encode("utf-16-le")) // 2
+    return "".join(parts), tuple(utf16_entities)
+
+
+def fixture_generator(size: tuple[int, int] = (1600, 900), **kwargs) -> QuoteGenerator:
+    """Quote card generator laid out like the `examples/entities_quote.py` one."""
+    return QuoteGenerator(
+        size,
+        [
+            pipelines.GradientBackgroundPipeLine(),
+            pipelines.GridResizePipeLine(),
+            pipelines.TextPipeLine(key="title"),
+            pipelines.EntitiesPipeLine(key="quote"),
+            pipelines.CircleImagePipeLine("author_image"),
+            pipelines.TextPipeLine(key="author_name"),
+        ],
+        text_processor=processors.TextProcessor(processors.FileEmojiSource(fixture_emoji_dir())),
+        entities_processor=processors.EntitiesProcessor(
+            fixture_fontset(), types.ColorSet((255, 255, 255), (0, 0, 255), (255, 0, 0))
+        ),
+        **kwargs,
+    )
+
+
+def fixture_request(index: int = 0) -> dict[str, typing.Any]:
+    """`generate_quote` kwargs for `fixture_generator`, varied by `index`."""
+    quote = f"Quote number {index} 😂\nSecond line is bold 🔥\nThird line is italic ❤️‍🔥"
+    return {
+        "box_keys": ["title_box", "quote_box", "author_name_box", "author_image_box"],
+        "background_from_color": (255, 0, 0),
+        "background_to_color": (0, 0, 255),
+        "background_direction": "t-b",
+        "title_content": "✨ Quote of the day ✨",
+        "title_box": types.SizeBox(50, 50, 1500, 50),
+        "quote_input_text": quote,
+        "quote_input_enitites": [
+            types.InputEntity(type="bold", offset=quote.index("Second"), length=20),
+            types.InputEntity(type="italic", offset=quote.index("Third"), length=20),
+        ],
+        "quote_box": types.SizeBox(50, 175, 1500, 495),
+        "author_name_content": f"© Author {index} 👍",
+        "author_name_box": types.SizeBox(275, 760, 1275, 50),
+        "author_name_vertical_align": "middle",
+        "author_name_horizontal_align": "left",
+        "author_image_image": fixture_avatar(),
+        "author_image_box": types.SizeBox(50, 685, 200, 200),
+    }
@@ -0,0 +1,162 @@
+"""
+Benchmark cases run by `python -m benchmarks`. Every case prepares its inputs once and returns
+the callable that is timed.
+"""
+
+import functools
+import typing
+
+from PIL import Image
+
+from benchmarks.fixtures import (
+    fixture_avatar,
+    fixture_entities,
+    fixture_generator,
+    fixture_request,
+    fixture_utf16_entities,
+)
+from quote_image_generator import QuoteGenerator, pipelines, types
+from quote_image_generator.pipelines.background import GradientDirection
+from quote_image_generator.types import OutputSpec
+
+__all__ = (
+    "CASES",
+    "Case",
+)
+
+
+class Case(typing.NamedTuple):
+    name: str
+    setup: typing.Callable[[], typing.Callable[[], typing.Any]]
+
+
+CASES: list[Case] = []
+
+CANVAS_SIZE = (1600, 900)
+
+
+def case(name: str):
+    def register(setup: typing.Callable[[], typing.Callable[[], typing.Any]]):
+        CASES.append(Case(name, setup))
+        return setup
+
+    return register
+
+
+@functools.cache
+def _generator() -> QuoteGenerator:
+    generator = fixture_generator()
+    generator.render(**fixture_request())
+    return generator
+
+
+def _canvas() -> Image.Image:
+    return Image.new("RGBA", CANVAS_SIZE, (20, 20, 20, 255))
+
+
+def _run_pipe(pipe: pipelines.BasePipeLine, **kwargs) -> typing.Callable[[], typing.Any]:
+    generator = _generator()
+    kwargs = {"debug": False, **kwargs}
+    return lambda: pipe.pipe(_canvas(), generator, **kwargs)
+
+
+def _gradient_case(direction: GradientDirection, cached: bool) -> None:
+    def setup() -> typing.Callable[[], typing.Any]:
+        return _run_pipe(
+            pipelines.GradientBackgroundPipeLine(layer_cache_size=16 if cached else 0),
+            background_from_color=(255, 0, 0),
+            background_to_color=(0, 0, 255),
+            background_direction=direction,
+        )
+
+    case(f"gradient_background.{direction}{'.cached' if cached else ''}")(setup)
+
+
+for _direction in typing.get_args(GradientDirection):
+    _gradient_case(_direction, cached=False)
+_gradient_case("t-b", cached=True)
+
+
+@case("text_pipe.title")
+def text_pipe_title() -> typing.Callable[[], typing.Any]:
+    return _run_pipe(
+        pipelines.TextPipeLine(key="title"),
+        title_content="✨ Quote of the day, with a longer decorative title ✨",
+        title_box=types.SizeBox(50, 50, 1500, 80),
+    )
+
+
+@case("entities_pipe.long")
+def entities_pipe_long() -> typing.Callable[[], typing.Any]:
+    text, entities = fixture_entities(300)
+    return _run_pipe(
+        pipelines.EntitiesPipeLine(key="quote"),
+        quote_input_text=text,
+        quote_input_enitites=list(entities),
+        quote_box=types.SizeBox(50, 175, 1500, 495),
+    )
+
+
+@case("circle_image_pipe.jpeg_4000x3000")
+def circle_image_pipe_large_jpeg() -> typing.Callable[[], typing.Any]:
+    return _run_pipe(
+        pipelines.CircleImagePipeLine("author_image"),
+        author_image_image=fixture_avatar((4000, 3000)),
+        author_image_box=types.SizeBox(50, 685, 200, 200),
+    )
+
+
+@case("circle_image_pipe.jpeg_4000x3000.tile_cache")
+def circle_image_pipe_tile_cache() -> typing.Callable[[], typing.Any]:
+    return _run_pipe(
+        pipelines.CircleImagePipeLine("author_image", tile_cache_bytes=4 * 1024 * 1024),
+        author_image_image=fixture_avatar((4000, 3000)),
+        author_image_box=types.SizeBox(50, 685, 200, 200),
+        author_image_image_cache_key=("user", 1),
+    )
+
+
+@case("entities_processor.convert_2000")
+def convert_entities() -> typing.Callable[[], typing.Any]:
+    text, entities = fixture_entities(2000)
+    processor = _generator().entities_processor
+    return lambda: processor.convert_input_to_draw_entity(text, list(entities))
+
+
+@case("entities_processor.convert_2000.utf16")
+def convert_entities_utf16() -> typing.Callable[[], typing.Any]:
+    text, entities = fixture_utf16_entities(2000)
+    processor = _generator().entities_processor
+    return lambda: processor.convert_input_to_draw_entity(text, list(entities), "utf16")
+
+
+@case("emoji_source.chunk_by_emoji")
+def chunk_by_emoji() -> typing.Callable[[], typing.Any]:
+    text, _ = fixture_entities(2000)
+    source = _generator().text_processor.emoji_source
+    # The uncached method: `chunk_by_emoji` memoizes its results.
+    chunk = type(source).chunk_by_emoji.__wrapped__  # type: ignore[attr-defined]
+    return lambda: chunk(source, text)
+
+
+def _generate_case(name: str, output_spec: OutputSpec) -> None:
+    def setup() -> typing.Callable[[], typing.Any]:
+        generator = _generator()
+        request = fixture_request(1)
+        return lambda: generator.generate_quote(output_spec, **request)
+
+    case(f"generate_quote.{name}")(setup)
+
+
+_generate_case("png", OutputSpec())
+_generate_case("png_fast", OutputSpec(compress_level=1))
+_generate_case("webp", OutputSpec("WEBP", quality=80, method=4))
+_generate_case("jpeg", OutputSpec("JPEG", quality=85))
+
+
+@case("generate_variants.3_sizes")
+def generate_variants() -> typing.Callable[[], typing.Any]:
+    generator = _generator()
+    request = {**fixture_request(1), "author_image_image": fixture_avatar((1600, 1200))}
+    sizes = ((1600, 900), (900, 900), (320, 180))
+    return lambda: generator.generate_variants(sizes, **request)
@@ -1,4 +1,14 @@
-from . import pipelines, processors, types
+from . import instrumentation, pipelines, processors, types
+from .batch import BatchRenderer
 from .generator import QuoteGenerator
+from .result_cache import ResultCache
 
-__all__ = ("QuoteGenerator", "pipelines", "processors", "types")
+__all__ = (
+    "BatchRenderer",
+    "QuoteGenerator",
+    "ResultCache",
+    "instrumentation",
+    "pipelines",
+    "processors",
+    "types",
+)
@@ -0,0 +1,131 @@
+import concurrent.futures
+import logging
+import multiprocessing.context
+import os
+import typing
+
+from quote_image_generator.concurrency import iter_windowed
+from quote_image_generator.generator import QuoteGenerator
+
+__all__ = ("BatchRenderer",)
+
+
+logger = logging.getLogger(__name__)
+
+
+class _WorkerState:
+    """
+    Generator and shared kwargs of a worker process, set by `_init_worker`. A pool worker keeps
+    no state between jobs other than its process globals, so the generator built once per
+    worker lives in this per-process holder instead of being sent with every job.
+    """
+
+    def __init__(self) -> None:
+        self.generator: typing.Optional[QuoteGenerator] = None
+        self.shared_kwargs: dict[str, typing.Any] = {}
+
+
+_worker = _WorkerState()
+
+
+def _init_worker(
+    generator_factory: typing.Callable[[], QuoteGenerator],
+    shared_kwargs: dict[str, typing.Any],
+    warm_font_sizes: typing.Optional[tuple[int, ...]],
+    max_font_size: int,
+) -> None:
+    generator = generator_factory()
+    if warm_font_sizes is None:
+        warm_font_sizes = generator.text_processor.get_font_size_probes(max_font_size)
+    if warm_font_sizes:
+        generator.text_processor.font_registry.warm(
+            generator.entities_processor.fontset, warm_font_sizes
+        )
+    generator.text_processor.emoji_source.get_emoji_matcher()
+    logger.debug(f"Render worker {os.getpid()} is ready")
+    _worker.generator = generator
+    _worker.shared_kwargs = shared_kwargs
+
+
+def _render(request: typing.Mapping[str, typing.Any]) -> bytes:
+    if _worker.generator is None:
+        raise RuntimeError("Render worker is not initialized")
+    return _worker.generator.generate_quote(**{**_worker.shared_kwargs, **request})
+
+
+class BatchRenderer:
+    """
+    Renders quote cards on a pool of worker processes, for bulk jobs that are bound by a single
+    core in one process.
+
+    Every worker builds its own `QuoteGenerator` once with `generator_factory`, loads the fonts
+    of its fontset at `warm_font_sizes` and the emoji index and matcher of its emoji source, and
+    then renders jobs until the renderer is closed.
+
+    Parameters:
+    - `generator_factory`: Module-level callable (or `functools.partial` of one) building the
+      generator. It is pickled to the workers unless the `fork` start method is used.
+    - `processes`: Number of worker processes, `os.cpu_count()` by default.
+    - `shared_kwargs`: `generate_quote` kwargs common to every job, such as a background image or
+      colors. They are sent to each worker once instead of with every job.
+    - `warm_font_sizes`: Font sizes to load for every font of the fontset at start-up. By
+      default, the sizes the font size search measures first when fitting up to `max_font_size`
+      (`TextProcessor.get_font_size_probes`). Other sizes load on first use.
+    - `max_font_size`: Largest `max_font_size` of the text pipes, 128 like theirs by default.
+    - `max_pending`: Jobs in flight at once, twice the number of processes by default.
+    - `mp_context`: `multiprocessing` context selecting the start method.
+
+    Jobs are `generate_quote` kwargs mappings. They are pickled to a worker, so avatars are best
+    passed as encoded bytes rather than decoded `Image` objects, which pickle as raw pixels. The
+    PNG bytes come back as a single pickled buffer. Bytes are copied once per pickle, about a
+    millisecond per megabyte, which is small next to a render, so no shared memory is used.
+    Blobs common to every job belong in `shared_kwargs`, which is sent once per worker.
+
+    Methods:
+    - `render`: Yields `(index, image)` pairs for an iterable of jobs, in job order or, with
+      `ordered=False`, as they finish.
+    - `close`: Stops the worker processes. The renderer is also a context manager.
+    """
+
+    def __init__(
+        self,
+        generator_factory: typing.Callable[[], QuoteGenerator],
+        processes: typing.Optional[int] = None,
+        *,
+        shared_kwargs: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+        warm_font_sizes: typing.Optional[typing.Iterable[int]] = None,
+        max_font_size: int = 128,
+        max_pending: typing.Optional[int] = None,
+        mp_context: typing.Optional[multiprocessing.context.BaseContext] = None,
+    ) -> None:
+        self.processes = processes or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.processes
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(
+                generator_factory,
+                dict(shared_kwargs or {}),
+                tuple(warm_font_sizes) if warm_font_sizes is not None else None,
+                max_font_size,
+            ),
+        )
+
+    def render(
+        self,
+        requests: typing.Iterable[typing.Mapping[str, typing.Any]],
+        ordered: bool = True,
+    ) -> typing.Iterator[tuple[int, bytes]]:
+        return iter_windowed(
+            self._executor, _render, requests, max_pending=self.max_pending, ordered=ordered
+        )
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "BatchRenderer":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
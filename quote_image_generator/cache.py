@@ -0,0 +1,149 @@
+import collections
+import threading
+import typing
+
+__all__ = (
+    "CacheStats",
+    "LRUCache",
+    "freeze",
+)
+
+
+K = typing.TypeVar("K", bound=typing.Hashable)
+V = typing.TypeVar("V")
+
+
+class CacheStats(typing.NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    nbytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"(hits={self.hits}, misses={self.misses}, evictions={self.evictions}, "
+            f"entries={self.entries}, nbytes={self.nbytes}, hit_rate={self.hit_rate:.2%})"
+        )
+
+
+class LRUCache(typing.Generic[K, V]):
+    """
+    Thread-safe least-recently-used mapping bounded by the number of entries (`maxsize`),
+    by the summed `sizeof` of the values (`max_bytes`), or both. `None` disables a bound.
+    Values larger than `max_bytes` on their own are returned to the caller but never stored.
+    """
+
+    def __init__(
+        self,
+        maxsize: typing.Optional[int] = 128,
+        max_bytes: typing.Optional[int] = None,
+        sizeof: typing.Optional[typing.Callable[[V], int]] = None,
+    ) -> None:
+        if max_bytes is not None and sizeof is None:
+            raise ValueError("`sizeof` must be set to bound the cache by `max_bytes`")
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._data: collections.OrderedDict[K, tuple[V, int]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def get(self, key: K, default: typing.Optional[V] = None) -> typing.Optional[V]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return item[0]
+
+    def put(self, key: K, value: V) -> None:
+        nbytes = self.sizeof(value) if self.sizeof is not None else 0
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self._nbytes -= previous[1]
+            self._data[key] = (value, nbytes)
+            self._nbytes += nbytes
+            self._evict()
+
+    def get_or_create(self, key: K, factory: typing.Callable[[], V]) -> V:
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def pop(self, key: K) -> typing.Optional[V]:
+        with self._lock:
+            item = self._data.pop(key, None)
+            if item is None:
+                return None
+            self._nbytes -= item[1]
+            return item[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._nbytes = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            entries=len(self._data),
+            nbytes=self._nbytes,
+        )
+
+    def _evict(self) -> None:
+        while self._data and (
+            (self.maxsize is not None and len(self._data) > self.maxsize)
+            or (self.max_bytes is not None and self._nbytes > self.max_bytes)
+        ):
+            _, (_, nbytes) = self._data.popitem(last=False)
+            self._nbytes -= nbytes
+            self._evictions += 1
+
+
+def freeze(value: typing.Any) -> typing.Hashable:
+    """
+    Hashable equivalent of a kwarg value: lists, tuples, sets and mappings are converted
+    recursively, other values must already be hashable. Raises `TypeError` for values that
+    cannot be compared by content, such as images.
+    """
+    if isinstance(value, (str, bytes, int, float, bool, type(None))):
+        return value
+    if isinstance(value, tuple) and not hasattr(value, "_fields"):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, list):
+        return (list, tuple(freeze(item) for item in value))
+    if isinstance(value, typing.Mapping):
+        return (dict, tuple(sorted((key, freeze(item)) for key, item in value.items())))
+    if isinstance(value, (set, frozenset)):
+        return (frozenset, frozenset(freeze(item) for item in value))
+    if isinstance(value, (bytearray, memoryview)):
+        return bytes(value)
+    if isinstance(value, tuple):
+        return (type(value), tuple(freeze(item) for item in value))
+    hash(value)
+    return value
@@ -0,0 +1,58 @@
+import collections
+import concurrent.futures
+import typing
+
+__all__ = ("iter_windowed",)
+
+
+T = typing.TypeVar("T")
+R = typing.TypeVar("R")
+
+
+def iter_windowed(
+    executor: concurrent.futures.Executor,
+    fn: typing.Callable[[T], R],
+    items: typing.Iterable[T],
+    max_pending: int,
+    ordered: bool = True,
+) -> typing.Iterator[tuple[int, R]]:
+    """
+    Runs `fn` over `items` on `executor` and yields `(index, result)` pairs.
+
+    `items` is consumed lazily and at most `max_pending` calls are submitted but not yet
+    yielded, so a slow consumer or a huge iterable never queues unbounded work or results.
+    With `ordered=False` results are yielded as soon as they complete.
+    """
+    if max_pending < 1:
+        raise ValueError("`max_pending` must be at least 1")
+
+    pending: collections.deque[tuple[int, concurrent.futures.Future[R]]] = collections.deque()
+    unordered: dict[concurrent.futures.Future[R], int] = {}
+
+    try:
+        for index, item in enumerate(items):
+            future = executor.submit(fn, item)
+            if ordered:
+                pending.append((index, future))
+                if len(pending) >= max_pending:
+                    done_index, done = pending.popleft()
+                    yield done_index, done.result()
+            else:
+                unordered[future] = index
+                if len(unordered) >= max_pending:
+                    done_futures, _ = concurrent.futures.wait(
+                        unordered, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    for done in done_futures:
+                        yield unordered.pop(done), done.result()
+
+        while pending:
+            done_index, done = pending.popleft()
+            yield done_index, done.result()
+        for done in concurrent.futures.as_completed(list(unordered)):
+            yield unordered.pop(done), done.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
+        for future in unordered:
+            future.cancel()
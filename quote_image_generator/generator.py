@@ -1,12 +1,30 @@
+import asyncio
+import concurrent.futures
+import contextvars
 import io
 import logging
+import os
+import threading
+import time
 import typing
+import weakref
 
-from PIL import Image
+import typing_extensions
+from PIL import Image, ImageOps
 
-from quote_image_generator.pipelines.base import BasePipeLine
+from quote_image_generator.cache import CacheStats, LRUCache, freeze
+from quote_image_generator.concurrency import iter_windowed
+from quote_image_generator.instrumentation import Hooks, count, get_hooks, use_hooks
+from quote_image_generator.pipelines.base import (
+    BasePipeLine,
+    KeywordRoute,
+    MissingPipelineKeysError,
+    route_kwargs,
+)
 from quote_image_generator.processors.entities import EntitiesProcessor
 from quote_image_generator.processors.text import TextProcessor
+from quote_image_generator.result_cache import ResultCache, content_key
+from quote_image_generator.types import OutputSpec
 
 __all__ = ("QuoteGenerator",)
 
@@ -14,7 +32,59 @@ __all__ = ("QuoteGenerator",)
 logger = logging.getLogger(__name__)
 
 
+DEFAULT_OUTPUT_SPEC = OutputSpec()
+
+
+# Cropped layer image, its position, whether it is opaque, and the kwargs the pipe returned.
+_Layer: typing_extensions.TypeAlias = tuple[
+    typing.Optional[Image.Image], tuple[int, int], bool, typing.Optional[dict[str, typing.Any]]
+]
+_PrefixCache: typing_extensions.TypeAlias = LRUCache[
+    tuple[tuple[BasePipeLine, typing.Hashable], ...],
+    tuple[typing.Optional[Image.Image], dict[str, typing.Any]],
+]
+_Routes: typing_extensions.TypeAlias = dict[
+    BasePipeLine, typing.Optional[tuple[KeywordRoute, ...]]
+]
+
+
 class QuoteGenerator:
+    """
+    Runs a pipeline of `BasePipeLine` steps on a copy of the base image.
+
+    The pipeline is compiled into the routes of its pipes (`BasePipeLine.get_route`) on the
+    first render and again when `pipeline` changes. Every render first checks that the kwargs
+    required by the pipes are set, raising `MissingPipelineKeysError` with all of them, and then
+    passes each routed pipe only the kwargs it reads.
+
+    Parameters:
+    - `max_workers` (Optional[int]): Threads of the pool behind `agenerate_quote` and
+      `generate_many`.
+    - `max_pending` (Optional[int]): Renders queued at once by `generate_many` and, per event
+      loop, by `agenerate_quote`. Defaults to twice `max_workers`.
+    - `output_spec` (OutputSpec): Default encoding of `generate_quote`.
+    - `prefix_cache_size` (int): Canvases kept after the first pipes when their inputs repeat
+      across renders, so later renders start from a copy of the canvas instead of re-running
+      them. Only pipes declaring their inputs (`BasePipeLine.get_input_keys`) are cached.
+      Defaults to 0, which disables the cache.
+    - `layered` (bool): Draws every pipe on its own transparent layer, cropped to what the pipe
+      drew, and composites the layers in order. Layers of pipes whose declared inputs did not
+      change are taken from a cache, so a render where one input changes only redraws the pipes
+      reading it. Pipes must draw without reading the canvas. Takes precedence over
+      `prefix_cache_size`.
+    - `layer_cache_size` (int): Layers kept in memory in layered mode. Defaults to 32.
+    - `result_cache` (Optional[ResultCache]): Cache of `generate_quote` results keyed by
+      `get_result_key`. The generator config is hashed on first use, so a generator whose
+      pipeline or processors change afterwards needs a new cache. Results are rendered
+      uncached when the config cannot be hashed, e.g. a pipe holds a custom object.
+    - `hooks` (Optional[Hooks]): Observer receiving per-pipe timings, counters and encode
+      timings, see `instrumentation`. Hooks set with `instrumentation.use_hooks` are used when
+      it is not given.
+
+    `generate_variants` renders one quote at several sizes: the base image is fitted to each
+    size and a `GridResizePipeLine` in the pipeline scales the boxes, while the work of the
+    pipes that does not depend on the size (`BasePipeLine.prepare`) is done once.
+    """
 
     def __init__(
         self,
@@ -24,6 +94,14 @@ class QuoteGenerator:
         text_processor: TextProcessor,
         entities_processor: EntitiesProcessor,
         debug: bool = False,
+        max_workers: typing.Optional[int] = None,
+        max_pending: typing.Optional[int] = None,
+        output_spec: OutputSpec = DEFAULT_OUTPUT_SPEC,
+        prefix_cache_size: int = 0,
+        layered: bool = False,
+        layer_cache_size: int = 32,
+        result_cache: typing.Optional[ResultCache] = None,
+        hooks: typing.Optional[Hooks] = None,
         **kwargs,
     ) -> None:
         self.base_image = (
@@ -40,19 +118,499 @@ class QuoteGenerator:
         self.entities_processor = entities_processor
 
         self.pipeline = pipeline
+        self.output_spec = output_spec
+        self._routed_pipeline: tuple[BasePipeLine, ...] = ()
+        self._routes: _Routes = {}
 
-    def generate_quote(self, **kwargs) -> bytes:
+        # Canvases after the longest repeated prefix of pipes, see `_render_from_prefix`.
+        self._prefixes: typing.Optional[_PrefixCache] = (
+            LRUCache(maxsize=prefix_cache_size) if prefix_cache_size else None
+        )
+        self._seen_prefixes: LRUCache[tuple[tuple[BasePipeLine, typing.Hashable], ...], bool] = (
+            LRUCache(maxsize=8 * prefix_cache_size)
+        )
+        self.layered = layered
+        self._layers: LRUCache[tuple[BasePipeLine, typing.Hashable], _Layer] = LRUCache(
+            maxsize=layer_cache_size
+        )
+        self._variant_bases: LRUCache[tuple[int, int], Image.Image] = LRUCache(maxsize=8)
 
-        pipeline_kwargs = {**kwargs, **self.kwargs}
+        self.result_cache = result_cache
+        self.hooks = hooks
+        self._config_key: typing.Optional[str] = None
+        self._config_keyable = True
 
-        quote_image = self.base_image.copy().convert("RGBA")
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.max_pending = max_pending or 2 * self.max_workers
+        self._async_slots: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+        self._executor: typing.Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def render(self, **kwargs) -> Image.Image:
+        """Runs the pipeline and returns the quote image without encoding it."""
+        if self.hooks is None:
+            return self._render({**kwargs, **self.kwargs})
+        with use_hooks(self.hooks):
+            return self._render({**kwargs, **self.kwargs})
+
+    def _get_routes(self) -> _Routes:
+        pipeline = tuple(self.pipeline)
+        if pipeline != self._routed_pipeline:
+            self._routes = {pipe: pipe.get_route() for pipe in pipeline}
+            self._routed_pipeline = pipeline
+        return self._routes
+
+    def validate(self, pipeline_kwargs: typing.Mapping[str, typing.Any]) -> None:
+        """
+        Raises `MissingPipelineKeysError` listing every required kwarg missing from
+        `pipeline_kwargs`. Pipes after one that may return any kwargs are checked when they run.
+        """
+        routes = self._get_routes()
+        available = set(pipeline_kwargs)
+        missing = []
+        for pipe in self.pipeline:
+            route = routes[pipe]
+            sources = available.union(pipe.pipe_kwargs) if pipe.pipe_kwargs else available
+            if route is None:
+                keys = tuple(
+                    key for key in pipe.get_required_keys(pipeline_kwargs) if key not in sources
+                )
+            else:
+                keys = tuple(
+                    keys[-1]
+                    for _, keys, required in route
+                    if required and not any(key in sources for key in keys)
+                )
+            if keys:
+                missing.append((pipe, keys))
+            outputs = pipe.get_output_keys(pipeline_kwargs)
+            if outputs is None:
+                break
+            available.update(outputs)
+        if missing:
+            raise MissingPipelineKeysError(missing)
+
+    def _render(
+        self,
+        pipeline_kwargs: dict[str, typing.Any],
+        base_image: typing.Optional[Image.Image] = None,
+    ) -> Image.Image:
+        self.validate(pipeline_kwargs)
+        if base_image is None:
+            if self.layered:
+                return self._render_layered(pipeline_kwargs)
+            if self._prefixes is not None:
+                return self._render_from_prefix(self._prefixes, pipeline_kwargs)
+            base_image = self.base_image
+        # Other bases are variant sizes, the layer and prefix caches do not key by canvas size.
+
+        quote_image = base_image.copy().convert("RGBA")
 
         for pipe in self.pipeline:
-            logger.debug(f"Run pipe: {pipe.__class__.__name__}")
-            pipe_result = pipe.pipe(quote_image, self, **pipeline_kwargs, **pipe.pipe_kwargs)
+            self._run_pipe(pipe, quote_image, pipeline_kwargs)
+
+        return quote_image
+
+    @property
+    def layer_cache_stats(self) -> CacheStats:
+        return self._layers.stats
+
+    @property
+    def prefix_cache_stats(self) -> typing.Optional[CacheStats]:
+        return self._prefixes.stats if self._prefixes is not None else None
+
+    def _call_pipe(
+        self, pipe: BasePipeLine, image: Image.Image, pipeline_kwargs: dict[str, typing.Any]
+    ) -> typing.Optional[dict[str, typing.Any]]:
+        logger.debug(f"Run pipe: {pipe.__class__.__name__}")
+        sources = {**pipeline_kwargs, **pipe.pipe_kwargs} if pipe.pipe_kwargs else pipeline_kwargs
+        route = self._routes.get(pipe)
+        if route is None:
+            run, kwargs = pipe.pipe, sources
+        else:
+            kwargs, missing = route_kwargs(route, sources)
+            if missing:
+                raise MissingPipelineKeysError([(pipe, missing)])
+            run = pipe.pipe_routed
+        hooks = get_hooks()
+        if hooks is None:
+            return run(image, self, **kwargs)
+        wall_time, cpu_time = time.perf_counter(), time.thread_time()
+        try:
+            return run(image, self, **kwargs)
+        finally:
+            hooks.on_pipe(pipe, time.perf_counter() - wall_time, time.thread_time() - cpu_time)
+
+    def _run_pipe(
+        self, pipe: BasePipeLine, quote_image: Image.Image, pipeline_kwargs: dict[str, typing.Any]
+    ) -> typing.Optional[dict[str, typing.Any]]:
+        pipe_result = self._call_pipe(pipe, quote_image, pipeline_kwargs)
+        if pipe_result:
+            pipeline_kwargs.update(pipe_result)
+        return pipe_result
+
+    def _get_pipe_inputs(
+        self, pipe: BasePipeLine, pipeline_kwargs: dict[str, typing.Any]
+    ) -> typing.Optional[typing.Hashable]:
+        keys = pipe.get_input_keys(pipeline_kwargs)
+        if keys is None:
+            return None
+        try:
+            return freeze({key: pipeline_kwargs[key] for key in keys if key in pipeline_kwargs})
+        except TypeError:
+            return None
+
+    def _render_layered(self, pipeline_kwargs: dict[str, typing.Any]) -> Image.Image:
+        quote_image = self.base_image.copy().convert("RGBA")
+        for pipe in self.pipeline:
+            inputs = self._get_pipe_inputs(pipe, pipeline_kwargs)
+            layer = self._layers.get((pipe, inputs)) if inputs is not None else None
+            if layer is None:
+                layer = self._draw_layer(pipe, quote_image.size, pipeline_kwargs)
+                if inputs is not None:
+                    self._layers.put((pipe, inputs), layer)
+            else:
+                logger.debug(f"Reuse layer of pipe: {pipe.__class__.__name__}")
+                count("cached_pipes")
+            image, position, opaque, pipe_result = layer
+            if opaque:
+                quote_image.paste(image, position)
+            elif image is not None:
+                quote_image.alpha_composite(image, position)
             if pipe_result:
                 pipeline_kwargs.update(pipe_result)
+        return quote_image
+
+    def _draw_layer(
+        self, pipe: BasePipeLine, size: tuple[int, int], pipeline_kwargs: dict[str, typing.Any]
+    ) -> _Layer:
+        layer = Image.new("RGBA", size, (0, 0, 0, 0))
+        pipe_result = self._call_pipe(pipe, layer, pipeline_kwargs)
+        bbox = layer.getbbox()
+        if bbox is None:
+            return None, (0, 0), False, pipe_result
+        image = layer.crop(bbox)
+        return image, bbox[:2], image.getextrema()[3] == (255, 255), pipe_result
+
+    def _render_from_prefix(
+        self,
+        prefixes: _PrefixCache,
+        pipeline_kwargs: dict[str, typing.Any],
+    ) -> Image.Image:
+        # A prefix is the first pipes with their inputs, one `(pipe, inputs)` entry per pipe, as
+        # the keys of `_layers`: another pipe with the same inputs, like a text pipe of another
+        # color, starts another prefix. Pipes are deterministic, so the kwargs they returned and
+        # the canvas after them only depend on it. Every prefix
+        # seen twice stores the kwargs, the canvas is only kept after the deepest repeated prefix
+        # of a render and after the prefix where a render leaves the known ones.
+        walk_kwargs = dict(pipeline_kwargs)
+        prefix: tuple[tuple[BasePipeLine, typing.Hashable], ...] = ()
+        start = 0
+        snapshot: typing.Optional[Image.Image] = None
+        updates: dict[str, typing.Any] = {}
+        for pipe in self.pipeline:
+            inputs = self._get_pipe_inputs(pipe, walk_kwargs)
+            cached = prefixes.get((*prefix, (pipe, inputs))) if inputs is not None else None
+            if cached is None:
+                break
+            prefix = (*prefix, (pipe, inputs))
+            walk_kwargs.update(cached[1])
+            if cached[0] is not None:
+                start = len(prefix)
+                snapshot, updates = cached
+
+        logger.debug(f"Start render after {start} cached pipes")
+        if start:
+            count("cached_pipes", start)
+        known = len(prefix)
+        prefix = prefix[:start]
+        pipeline_kwargs.update(updates)
+        quote_image = (
+            snapshot.copy() if snapshot is not None else self.base_image.copy().convert("RGBA")
+        )
+
+        candidate = None
+        updates = dict(updates)
+        pipes = iter(self.pipeline[start:])
+        for pipe in pipes:
+            inputs = self._get_pipe_inputs(pipe, pipeline_kwargs)
+            pipe_result = self._run_pipe(pipe, quote_image, pipeline_kwargs)
+            if inputs is None:
+                break
+            prefix = (*prefix, (pipe, inputs))
+            if pipe_result:
+                updates.update(pipe_result)
+            if len(prefix) == known:
+                candidate = (prefix, (quote_image.copy(), dict(updates)))
+            elif prefix in prefixes:
+                continue
+            elif self._seen_prefixes.pop(prefix) is not None:
+                prefixes.put(prefix, (None, dict(updates)))
+                candidate = (prefix, (quote_image.copy(), dict(updates)))
+            else:
+                self._seen_prefixes.put(prefix, True)
+
+        # Nothing after a pipe with unknown inputs can be cached.
+        for pipe in pipes:
+            self._run_pipe(pipe, quote_image, pipeline_kwargs)
+
+        if candidate is not None:
+            prefixes.put(*candidate)
+        return quote_image
+
+    def prepare(self, **kwargs) -> dict[str, typing.Any]:
+        """
+        Pipeline kwargs for several renders of the same quote, with the size independent work of
+        every pipe done (`BasePipeLine.prepare`), such as converting entities and decoding
+        images.
+        """
+        pipeline_kwargs = {**kwargs, **self.kwargs}
+        self.validate(pipeline_kwargs)
+        prepared = dict(pipeline_kwargs)
+        for pipe in self.pipeline:
+            updates = pipe.prepare(
+                self,
+                {**pipeline_kwargs, **pipe.pipe_kwargs} if pipe.pipe_kwargs else pipeline_kwargs,
+            )
+            if updates:
+                prepared.update(updates)
+        return prepared
+
+    def _get_variant_base(self, size: tuple[int, int]) -> Image.Image:
+        if size == self.base_image.size:
+            return self.base_image
+        return self._variant_bases.get_or_create(
+            size, lambda: ImageOps.fit(self.base_image, size, Image.Resampling.LANCZOS)
+        )
+
+    def _map_variants(
+        self,
+        sizes: typing.Iterable[tuple[int, int]],
+        kwargs: dict[str, typing.Any],
+        finish: typing.Callable[[Image.Image], typing.Any],
+    ) -> list[typing.Any]:
+        hooks = self.hooks or get_hooks()
+        with use_hooks(hooks):
+            pipeline_kwargs = self.prepare(**kwargs)
+
+        def render(size: tuple[int, int]) -> typing.Any:
+            with use_hooks(hooks):
+                return finish(self._render(dict(pipeline_kwargs), self._get_variant_base(size)))
+
+        sizes = [tuple(size) for size in sizes]
+        # On a single CPU the renders cannot overlap, threads would only add switches.
+        if len(sizes) == 1 or (os.cpu_count() or 1) == 1:
+            return [render(size) for size in sizes]
+        return list(self.executor.map(render, sizes))
+
+    def render_variants(
+        self, sizes: typing.Iterable[tuple[int, int]], **kwargs
+    ) -> list[Image.Image]:
+        """`render` at every size of `sizes`, see `generate_variants`."""
+        return self._map_variants(sizes, kwargs, lambda image: image)
+
+    def generate_variants(
+        self,
+        sizes: typing.Iterable[tuple[int, int]],
+        output_spec: typing.Optional[OutputSpec] = None,
+        **kwargs,
+    ) -> list[bytes]:
+        """
+        Encoded quotes at every size of `sizes`, in order. The kwargs are prepared once with
+        `prepare` and the sizes are rendered in parallel on `executor` when there is more than
+        one CPU, without the layer, prefix and result caches. Must not be called from a render
+        of `executor`.
+        """
 
+        def encode(image: Image.Image) -> bytes:
+            output = io.BytesIO()
+            self.save_image(image, output, output_spec)
+            return output.getvalue()
+
+        return self._map_variants(sizes, kwargs, encode)
+
+    def generate_quote(self, output_spec: typing.Optional[OutputSpec] = None, **kwargs) -> bytes:
+        if self.result_cache is not None:
+            key = self.get_result_key(output_spec, **kwargs)
+            if key is not None:
+                return self.result_cache.get_or_render(
+                    key, lambda: self._encode_quote(output_spec, **kwargs)
+                )
+        return self._encode_quote(output_spec, **kwargs)
+
+    def get_result_key(
+        self, output_spec: typing.Optional[OutputSpec] = None, **kwargs
+    ) -> typing.Optional[str]:
+        """
+        Content key of the `generate_quote` result, built from the merged pipeline kwargs, the
+        output spec, the generator config and the emoji signature
+        (`ABCEmojiSource.get_signature`). `None` when a kwarg or the config cannot be hashed by
+        content, in which case the quote is rendered without the cache.
+        """
+        try:
+            if self._config_key is None:
+                if not self._config_keyable:
+                    return None
+                self._config_key = self._get_config_key()
+            return content_key(
+                self._config_key,
+                self.text_processor.emoji_source.get_signature(),
+                output_spec or self.output_spec,
+                {**kwargs, **self.kwargs},
+            )
+        except TypeError as e:
+            if self._config_key is None:
+                self._config_keyable = False
+            logger.debug(f"Result is not cached: {e}")
+            return None
+
+    def _get_config_key(self) -> str:
+        return content_key(
+            self.base_image,
+            [
+                (
+                    f"{type(pipe).__module__}.{type(pipe).__qualname__}",
+                    {name: value for name, value in vars(pipe).items() if name[0] != "_"},
+                )
+                for pipe in self.pipeline
+            ],
+            self.entities_processor.fontset,
+            self.entities_processor.colorset,
+            f"{type(self.text_processor.emoji_source).__qualname__}",
+            {
+                name: value
+                for name, value in vars(self.text_processor.emoji_source).items()
+                if name in ("emoji_scale", "emoji_dir", "atlas_path")
+            },
+        )
+
+    def _encode_quote(self, output_spec: typing.Optional[OutputSpec] = None, **kwargs) -> bytes:
         output = io.BytesIO()
-        quote_image.save(output, format="PNG")
+        self.generate_quote_to(output, output_spec, **kwargs)
         return output.getvalue()
+
+    def generate_quote_to(
+        self,
+        fp: typing.Union[str, os.PathLike, typing.IO[bytes]],
+        output_spec: typing.Optional[OutputSpec] = None,
+        **kwargs,
+    ) -> None:
+        """Renders the quote and encodes it straight into a file path or a binary file object."""
+        self.save_image(self.render(**kwargs), fp, output_spec)
+
+    def save_image(
+        self,
+        image: Image.Image,
+        fp: typing.Union[str, os.PathLike, typing.IO[bytes]],
+        output_spec: typing.Optional[OutputSpec] = None,
+    ) -> None:
+        output_spec = output_spec or self.output_spec
+        hooks = self.hooks or get_hooks()
+        if output_spec.format == "JPEG":
+            image = image.convert("RGB")
+        if hooks is None:
+            image.save(fp, format=output_spec.format, **output_spec.save_options())
+            return
+        started = time.perf_counter()
+        if isinstance(fp, (str, os.PathLike)):
+            image.save(fp, format=output_spec.format, **output_spec.save_options())
+            nbytes = os.stat(fp).st_size
+        else:
+            # Counted while writing, pipes and sockets have no `tell`.
+            writer = _CountingWriter(fp)
+            image.save(writer, format=output_spec.format, **output_spec.save_options())
+            nbytes = writer.nbytes
+        hooks.on_encode(output_spec.format, time.perf_counter() - started, nbytes)
+
+    @property
+    def executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        """
+        Thread pool running `agenerate_quote` and `generate_many` renders, created on first use
+        with `max_workers` threads. Pillow releases the GIL while resizing, pasting and
+        encoding, so renders overlap on several cores.
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="quote-generator",
+                )
+            return self._executor
+
+    async def agenerate_quote(self, **kwargs) -> bytes:
+        """
+        `generate_quote` run on `executor`, without blocking the event loop. At most
+        `max_pending` renders of an event loop are queued, later calls wait for a slot. Hooks
+        set with `instrumentation.use_hooks` in the calling task are used by the render.
+        """
+        async with self._get_async_slots():
+            context = contextvars.copy_context()
+            return await asyncio.wrap_future(
+                self.executor.submit(context.run, self.generate_quote, **kwargs)
+            )
+
+    def _get_async_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._executor_lock:
+            slots = self._async_slots.get(loop)
+            if slots is None:
+                slots = self._async_slots[loop] = asyncio.Semaphore(self.max_pending)
+            return slots
+
+    def generate_many(
+        self,
+        requests: typing.Iterable[typing.Mapping[str, typing.Any]],
+        ordered: bool = True,
+        max_pending: typing.Optional[int] = None,
+    ) -> typing.Iterator[tuple[int, bytes]]:
+        """
+        Renders every `generate_quote` kwargs mapping of `requests` on `executor` and yields
+        `(index, image)` pairs, in request order or, with `ordered=False`, as renders finish.
+
+        `requests` is read lazily and at most `max_pending` renders (the generator
+        `max_pending` by default) are in flight, so slow consumers apply backpressure. Renders
+        see the context variables of the call, such as hooks set with
+        `instrumentation.use_hooks`.
+        """
+        executor = self.executor
+        context = contextvars.copy_context()
+        return iter_windowed(
+            executor,
+            # A context can only be entered by one thread at a time, every render gets a copy.
+            lambda request: context.copy().run(self.generate_quote, **request),
+            requests,
+            max_pending=max_pending or self.max_pending,
+            ordered=ordered,
+        )
+
+    def close(self) -> None:
+        """Shuts the render thread pool down, waiting for running renders."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def __enter__(self) -> "QuoteGenerator":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+
+class _CountingWriter:
+    """Binary file object forwarding writes to `fp` and counting the written bytes."""
+
+    def __init__(self, fp: typing.IO[bytes]) -> None:
+        self.fp = fp
+        self.nbytes = 0
+
+    def write(self, data: bytes) -> int:
+        self.fp.write(data)
+        size = memoryview(data).nbytes
+        self.nbytes += size
+        return size
+
+    def flush(self) -> None:
+        self.fp.flush()
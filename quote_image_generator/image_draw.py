@@ -2,11 +2,41 @@ import functools
 import math
 import typing
 
-from PIL import ImageDraw, ImageFont
+from PIL import Image, ImageDraw, ImageFont
 
 from quote_image_generator.types import Color, Point, Size
 
-__all__ = ("CustomImageDraw",)
+__all__ = (
+    "CustomImageDraw",
+    "alpha_paste",
+)
+
+
+def alpha_paste(im: Image.Image, image: Image.Image, position: tuple[int, int]) -> None:
+    """
+    Composites `image` over `im` at `position`, clipped to `im`.
+
+    On an RGBA `im`, unlike `im.paste(image, position, image)`, the alpha of `im` is combined
+    with the alpha of `image` instead of being blended like a color, so drawing on a
+    transparent layer and compositing the layer later gives the same pixels as drawing
+    directly. Other modes, such as RGB, fall back to `im.paste` with the alpha of `image` as
+    the mask.
+    """
+    if image.mode != "RGBA":
+        image = image.convert("RGBA")
+    if im.mode != "RGBA":
+        im.paste(image, position, image)
+        return
+    x, y = position
+    box = (
+        max(0, -x),
+        max(0, -y),
+        min(image.width, im.width - x),
+        min(image.height, im.height - y),
+    )
+    if box[0] >= box[2] or box[1] >= box[3]:
+        return
+    im.alpha_composite(image, (x + box[0], y + box[1]), box)
 
 
 class CustomImageDraw(ImageDraw.ImageDraw):
@@ -196,6 +226,27 @@ class CustomImageDraw(ImageDraw.ImageDraw):
             width=line_width,
         )
 
+    def decorated_text(
+        self,
+        xy: tuple[float, float],
+        text: str,
+        fill: typing.Optional[Color] = None,
+        font: typing.Optional[
+            typing.Union[ImageFont.ImageFont, ImageFont.FreeTypeFont, ImageFont.TransposedFont]
+        ] = None,
+        underline: bool = False,
+        strikethrough: bool = False,
+    ) -> None:
+        """Draws `text` once with the lines of `underline_text` and `strikethrough_text`."""
+        x, y, x1, y1 = self.textbbox(xy, text, font=font)
+        self.text(xy, text, fill=fill, font=font)
+        line_width = math.floor(1 / 17 * abs(y1 - y)) or 1
+        if underline:
+            self.line((x, y1 + 1, x1, y1 + 1), fill=fill, width=line_width)
+        if strikethrough:
+            middle = y1 - abs(y1 - y) // 2
+            self.line((x, middle, x1, middle), fill=fill, width=line_width)
+
     def strikethrough_text(
         self,
         xy: tuple[float, float],
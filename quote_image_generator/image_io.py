@@ -0,0 +1,73 @@
+import io
+import typing
+
+from PIL import Image
+
+from quote_image_generator.instrumentation import count
+
+__all__ = (
+    "DEFAULT_MAX_PIXELS",
+    "ImageTooLargeError",
+    "decode_image",
+    "decodes_reduced",
+    "resize_image",
+)
+
+
+DEFAULT_MAX_PIXELS = 64_000_000
+
+# Downscales keep at least this factor for the final LANCZOS pass, see `Image.resize`.
+REDUCING_GAP = 2.0
+
+
+class ImageTooLargeError(ValueError):
+    """Raised by `decode_image` for images that would decode to more than `max_pixels`."""
+
+
+def decode_image(
+    data: bytes,
+    size: typing.Optional[tuple[int, int]] = None,
+    *,
+    max_pixels: typing.Optional[int] = DEFAULT_MAX_PIXELS,
+) -> Image.Image:
+    """
+    Decodes an encoded image to a new RGBA image, resized to `size` when it is given.
+
+    Only the header is read before `max_pixels` is checked. A JPEG is decoded at a reduced DCT
+    scale (`Image.draft`) still at least twice `size`, so a large photo can be accepted as long
+    as its reduced scale is under the limit. The remaining downscale is done with `reduce` and
+    a final LANCZOS resize.
+    """
+    image = Image.open(io.BytesIO(data))
+    box = None
+    if size is not None:
+        drafted = image.draft(None, (int(size[0] * REDUCING_GAP), int(size[1] * REDUCING_GAP)))
+        if drafted is not None:
+            box = drafted[1]
+    if max_pixels is not None and image.width * image.height > max_pixels:
+        raise ImageTooLargeError(
+            f"Image of {image.width}x{image.height} pixels is larger than {max_pixels} pixels"
+        )
+    count("image_decodes")
+    image = image.convert("RGBA")
+    if size is None or (image.size == size and box is None):
+        return image
+    count("image_resizes")
+    return image.resize(size, Image.Resampling.LANCZOS, box=box, reducing_gap=REDUCING_GAP)
+
+
+def decodes_reduced(data: bytes) -> bool:
+    """Whether `decode_image` can decode `data` at a reduced scale, i.e. it is a JPEG."""
+    return Image.open(io.BytesIO(data)).format == "JPEG"
+
+
+def resize_image(image: Image.Image, size: tuple[int, int]) -> Image.Image:
+    """A new RGBA copy of `image` resized to `size`, `image` itself is not modified."""
+    if image.mode != "RGBA":
+        image = image.convert("RGBA")
+    elif image.size == size:
+        return image.copy()
+    if image.size == size:
+        return image
+    count("image_resizes")
+    return image.resize(size, Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
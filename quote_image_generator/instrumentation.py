@@ -0,0 +1,167 @@
+import collections
+import contextlib
+import contextvars
+import threading
+import typing
+
+if typing.TYPE_CHECKING:
+    from quote_image_generator.pipelines.base import BasePipeLine
+
+__all__ = (
+    "Hooks",
+    "PrometheusHooks",
+    "count",
+    "get_hooks",
+    "use_hooks",
+)
+
+
+class Hooks:
+    """
+    Observer of a `QuoteGenerator` render. Every method does nothing by default, subclasses
+    override the events they need. Methods are called from the rendering threads.
+
+    Methods:
+    - `on_pipe`: A pipe ran, with its wall and CPU time in seconds.
+    - `on_count`: A counted event happened `value` times, see `count`.
+    - `on_encode`: The quote was encoded to `nbytes` bytes in `seconds`.
+    """
+
+    def on_pipe(self, pipe: "BasePipeLine", wall_time: float, cpu_time: float) -> None:
+        pass
+
+    def on_count(self, name: str, value: int = 1) -> None:
+        pass
+
+    def on_encode(self, image_format: str, seconds: float, nbytes: int) -> None:
+        pass
+
+
+_hooks: contextvars.ContextVar[typing.Optional[Hooks]] = contextvars.ContextVar(
+    "quote_image_generator_hooks", default=None
+)
+
+
+def get_hooks() -> typing.Optional[Hooks]:
+    return _hooks.get()
+
+
+@contextlib.contextmanager
+def use_hooks(hooks: typing.Optional[Hooks]) -> typing.Iterator[None]:
+    """Routes the events of the current thread or task to `hooks` inside the block."""
+    token = _hooks.set(hooks)
+    try:
+        yield
+    finally:
+        _hooks.reset(token)
+
+
+def count(name: str, value: int = 1) -> None:
+    """
+    Reports a counted event to the active hooks. Without hooks it costs one context variable
+    lookup. Events of the library:
+
+    - `font_loads`: FreeType fonts opened by a `FontRegistry`.
+    - `emoji_decodes`: Emoji images decoded and resized, i.e. sized emoji cache misses.
+    - `image_decodes`: Images decoded by the image pipelines.
+    - `image_resizes`: Resize calls, for emoji and images.
+    - `font_size_probes`: Font sizes measured while fitting text into a box.
+    - `measured_runs`: Text, emoji and bar runs measured by the entities layout.
+    - `cached_pipes`: Pipes skipped thanks to the prefix or layer caches of `QuoteGenerator`.
+    - `cached_image_tiles`: Resized and masked images taken from the tile cache of an image pipe.
+    """
+    hooks = _hooks.get()
+    if hooks is not None:
+        hooks.on_count(name, value)
+
+
+class PrometheusHooks(Hooks):
+    """
+    Hooks accumulating totals in memory and rendering them in the Prometheus text exposition
+    format with `render`, e.g. from a `/metrics` handler.
+
+    Metrics:
+    - `{namespace}_pipe_runs_total{pipe, key}`
+    - `{namespace}_pipe_seconds_total{pipe, key, clock="wall"|"cpu"}`
+    - `{namespace}_events_total{event}`
+    - `{namespace}_encodes_total{format}`, `{namespace}_encode_seconds_total{format}` and
+      `{namespace}_encode_bytes_total{format}`
+    """
+
+    def __init__(self, namespace: str = "quote_image_generator") -> None:
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._pipe_runs: collections.Counter[tuple[str, str]] = collections.Counter()
+        self._pipe_seconds: collections.Counter[tuple[str, str, str]] = collections.Counter()
+        self._events: collections.Counter[str] = collections.Counter()
+        self._encodes: collections.Counter[str] = collections.Counter()
+        self._encode_seconds: collections.Counter[str] = collections.Counter()
+        self._encode_bytes: collections.Counter[str] = collections.Counter()
+
+    def on_pipe(self, pipe: "BasePipeLine", wall_time: float, cpu_time: float) -> None:
+        labels = (type(pipe).__name__, getattr(pipe, "key", ""))
+        with self._lock:
+            self._pipe_runs[labels] += 1
+            self._pipe_seconds[(*labels, "wall")] += wall_time
+            self._pipe_seconds[(*labels, "cpu")] += cpu_time
+
+    def on_count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._events[name] += value
+
+    def on_encode(self, image_format: str, seconds: float, nbytes: int) -> None:
+        with self._lock:
+            self._encodes[image_format] += 1
+            self._encode_seconds[image_format] += seconds
+            self._encode_bytes[image_format] += nbytes
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = [
+                (
+                    "pipe_runs_total",
+                    "Pipe runs.",
+                    {(("pipe", p), ("key", k)): v for (p, k), v in self._pipe_runs.items()},
+                ),
+                (
+                    "pipe_seconds_total",
+                    "Time spent in pipes.",
+                    {
+                        (("pipe", p), ("key", k), ("clock", c)): v
+                        for (p, k, c), v in self._pipe_seconds.items()
+                    },
+                ),
+                (
+                    "events_total",
+                    "Counted rendering events.",
+                    {(("event", e),): v for e, v in self._events.items()},
+                ),
+                (
+                    "encodes_total",
+                    "Encoded quotes.",
+                    {(("format", f),): v for f, v in self._encodes.items()},
+                ),
+                (
+                    "encode_seconds_total",
+                    "Time spent encoding quotes.",
+                    {(("format", f),): v for f, v in self._encode_seconds.items()},
+                ),
+                (
+                    "encode_bytes_total",
+                    "Size of the encoded quotes.",
+                    {(("format", f),): v for f, v in self._encode_bytes.items()},
+                ),
+            ]
+        lines = []
+        for name, help_text, samples in metrics:
+            full_name = f"{self.namespace}_{name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} counter")
+            for labels, value in sorted(samples.items()):
+                label_text = ",".join(f'{label}="{_escape(text)}"' for label, text in labels)
+                lines.append(f"{full_name}{{{label_text}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
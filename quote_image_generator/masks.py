@@ -0,0 +1,61 @@
+import typing
+
+from PIL import Image, ImageDraw
+
+from quote_image_generator.cache import CacheStats, LRUCache
+
+__all__ = (
+    "MaskProvider",
+    "MaskShape",
+    "default_mask_provider",
+)
+
+
+MaskShape = typing.Literal["rectangle", "ellipse", "rounded_rectangle"]
+
+
+class MaskProvider:
+    """
+    Cache of antialiased "L" masks keyed by shape, size and corner radius. Masks are drawn
+    `supersample` times larger and reduced with a box filter, so their edges are smooth. A
+    render then looks the mask up instead of rasterizing it.
+
+    Parameters:
+    - `maxsize` (int): Masks kept in memory. Defaults to 64.
+    - `supersample` (int): Scale at which the masks are drawn. Defaults to 4.
+
+    Masks are shared between callers and must not be modified.
+    """
+
+    def __init__(self, maxsize: int = 64, supersample: int = 4) -> None:
+        self.supersample = supersample
+        self._masks: LRUCache[tuple[MaskShape, tuple[int, int], int], Image.Image] = LRUCache(
+            maxsize=maxsize
+        )
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._masks.stats
+
+    def get_mask(self, shape: MaskShape, size: tuple[int, int], radius: int = 0) -> Image.Image:
+        size = (int(size[0]), int(size[1]))
+        radius = max(0, min(int(radius), min(size) // 2)) if shape == "rounded_rectangle" else 0
+        return self._masks.get_or_create(
+            (shape, size, radius), lambda: self._draw_mask(shape, size, radius)
+        )
+
+    def _draw_mask(self, shape: MaskShape, size: tuple[int, int], radius: int) -> Image.Image:
+        if shape == "rectangle" or (shape == "rounded_rectangle" and not radius):
+            return Image.new("L", size, 255)
+        scale = self.supersample
+        mask = Image.new("L", (size[0] * scale, size[1] * scale), 0)
+        draw = ImageDraw.Draw(mask)
+        box = (0, 0, mask.width - 1, mask.height - 1)
+        if shape == "ellipse":
+            draw.ellipse(box, fill=255)
+        else:
+            draw.rounded_rectangle(box, radius * scale, fill=255)
+        return mask.reduce(scale) if scale > 1 else mask
+
+
+default_mask_provider = MaskProvider()
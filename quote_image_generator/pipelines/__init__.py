@@ -1,8 +1,14 @@
 from quote_image_generator.pipelines.background import (
     GradientBackgroundPipeLine,
+    GradientTheme,
     StaticColorBackgroundPipeLine,
 )
-from quote_image_generator.pipelines.base import BasePipeLine, RedirectKeywordPipeLine
+from quote_image_generator.pipelines.base import (
+    BasePipeLine,
+    KeywordRoute,
+    MissingPipelineKeysError,
+    RedirectKeywordPipeLine,
+)
 from quote_image_generator.pipelines.entities import EntitiesPipeLine
 from quote_image_generator.pipelines.grid import GridResizePipeLine
 from quote_image_generator.pipelines.image import (
@@ -17,8 +23,11 @@ __all__ = (
     "CircleImagePipeLine",
     "EntitiesPipeLine",
     "GradientBackgroundPipeLine",
+    "GradientTheme",
     "GridResizePipeLine",
     "ImagePipeLine",
+    "KeywordRoute",
+    "MissingPipelineKeysError",
     "RedirectKeywordPipeLine",
     "RoundedImagePipeLine",
     "StaticColorBackgroundPipeLine",
@@ -1,8 +1,9 @@
 import typing
 
 import typing_extensions
-from PIL import Image, ImageColor, ImageDraw
+from PIL import Image, ImageColor
 
+from quote_image_generator.cache import CacheStats, LRUCache
 from quote_image_generator.image_draw import CustomImageDraw
 from quote_image_generator.pipelines.base import BasePipeLine
 from quote_image_generator.types import Color
@@ -10,6 +11,14 @@ from quote_image_generator.types import Color
 if typing.TYPE_CHECKING:
     from quote_image_generator.generator import QuoteGenerator
 
+__all__ = (
+    "GradientBackgroundPipeLine",
+    "GradientTheme",
+    "StaticColorBackgroundPipeLine",
+)
+
+GradientDirection = typing.Literal["l-r", "t-b", "lt-rb", "rt-lb"]
+
 
 class _StaticColorBackgroundPipeLineKwargs(typing.TypedDict):
     background_color: typing_extensions.NotRequired[Color]
@@ -27,10 +36,15 @@ class StaticColorBackgroundPipeLine(BasePipeLine):
     - `debug` (bool): Enables a grid overlay in a semi-transparent, dashed style if set to True.
 
     Methods:
-    - `pipe`: Applies the specified solid color as the background of the image. If debug is enabled,
-      adds a grid overlay on top of the color for visual aid during development.
+    - `pipe`: Fills the image with the specified solid color, without building an intermediate
+      image. If debug is enabled, adds a grid overlay on top of the color for visual aid during
+      development.
     """
 
+    INPUT_KEYS: typing.ClassVar[tuple[str, ...]] = ("background_color", "debug")
+    REQUIRED_INPUT_KEYS: typing.ClassVar[tuple[str, ...]] = ("background_color",)
+    OUTPUT_KEYS: typing.ClassVar[tuple[str, ...]] = ()
+
     def __init__(
         self, **kwargs: typing_extensions.Unpack[_StaticColorBackgroundPipeLineKwargs]
     ) -> None:
@@ -45,7 +59,7 @@ class StaticColorBackgroundPipeLine(BasePipeLine):
         debug: bool,
         **kwargs,
     ) -> None:
-        im.paste(Image.new("RGBA", im.size, background_color))
+        im.paste(background_color, (0, 0, *im.size))
         if debug:
             draw = CustomImageDraw(im)
             draw.grid(fill=(0, 255, 0, 75), style="dashed")
@@ -54,7 +68,14 @@ class StaticColorBackgroundPipeLine(BasePipeLine):
 class _GradientBackgroundPipeLineKwargs(typing.TypedDict):
     background_from_color: typing_extensions.NotRequired[Color]
     background_to_color: typing_extensions.NotRequired[Color]
-    background_direction: typing_extensions.NotRequired[Color]
+    background_direction: typing_extensions.NotRequired[GradientDirection]
+
+
+class GradientTheme(typing.NamedTuple):
+    size: tuple[int, int]
+    from_color: Color
+    to_color: Color
+    direction: GradientDirection = "t-b"
 
 
 class GradientBackgroundPipeLine(BasePipeLine):
@@ -74,9 +95,17 @@ class GradientBackgroundPipeLine(BasePipeLine):
       - "rt-lb": Right-Top to Left-Bottom (diagonal)
     - `debug` (bool): When set to True, overlays a semi-transparent dashed grid for alignment assistance.
 
+    Constructor Parameters:
+    - `layer_cache_size` (int): Number of finished gradient layers kept in memory, keyed by
+      (size, colors, direction). Defaults to 16, 0 disables the cache.
+    - `themes` (Iterable[GradientTheme]): Gradients rendered into the cache at construction time.
+
     Methods:
     - `pipe`: Applies the gradient background to the image based on specified colors and direction.
       If debug mode is active, it overlays a grid for visual reference during adjustments.
+    - `get_layer`: Returns the cached gradient layer, creating it on a miss. The layer is shared
+      and must not be modified.
+    - `layer_cache_stats`: Hit, miss and eviction counters of the layer cache.
 
     Internal Methods:
     - `_create_gradient`: Generates a gradient image in the specified direction.
@@ -90,16 +119,61 @@ class GradientBackgroundPipeLine(BasePipeLine):
             background_to_color="green",
             background_direction="l-r"
         )
+        themed_background = GradientBackgroundPipeLine(
+            themes=[GradientTheme((1600, 900), "blue", "green", "l-r")]
+        )
         ```
 
     Thanks:
         https://github.com/hexvel
     """
 
+    INPUT_KEYS: typing.ClassVar[tuple[str, ...]] = (
+        "background_from_color",
+        "background_to_color",
+        "background_direction",
+        "debug",
+    )
+    REQUIRED_INPUT_KEYS: typing.ClassVar[tuple[str, ...]] = (
+        "background_from_color",
+        "background_to_color",
+    )
+    OUTPUT_KEYS: typing.ClassVar[tuple[str, ...]] = ()
+
     def __init__(
-        self, **kwargs: typing_extensions.Unpack[_GradientBackgroundPipeLineKwargs]
+        self,
+        layer_cache_size: int = 16,
+        themes: typing.Iterable[GradientTheme] = (),
+        **kwargs: typing_extensions.Unpack[_GradientBackgroundPipeLineKwargs],
     ) -> None:
         super().__init__(**kwargs)
+        self._layers: LRUCache[
+            tuple[tuple[int, int], tuple[int, int, int, int], tuple[int, int, int, int], str],
+            Image.Image,
+        ] = LRUCache(maxsize=layer_cache_size)
+        for theme in themes:
+            self.get_layer(*theme)
+
+    def get_layer(
+        self,
+        size: tuple[int, int],
+        from_color: Color,
+        to_color: Color,
+        direction: GradientDirection = "t-b",
+    ) -> Image.Image:
+        width, height = size
+        parsed_from_color = self._parse_color(from_color)
+        parsed_to_color = self._parse_color(to_color)
+        return self._layers.get_or_create(
+            ((width, height), parsed_from_color, parsed_to_color, direction),
+            lambda: self._create_gradient(
+                width, height, parsed_from_color, parsed_to_color, direction
+            ),
+        )
+
+    @property
+    def layer_cache_stats(self) -> CacheStats:
+        return self._layers.stats
 
     def pipe(
         self,
@@ -108,18 +182,18 @@ class GradientBackgroundPipeLine(BasePipeLine):
         *,
         background_from_color: Color,
         background_to_color: Color,
-        background_direction: typing.Literal["l-r", "t-b", "lt-rb", "rt-lb"] = "t-b",
+        background_direction: GradientDirection = "t-b",
         debug: bool = False,
         **kwargs,
     ) -> None:
-        width, height = im.size
-        background_from_color = self._parse_color(background_from_color)
-        background_to_color = self._parse_color(background_to_color)
-
-        gradient = self._create_gradient(
-            width, height, background_from_color, background_to_color, background_direction
-        )
-        im.paste(gradient, (0, 0), gradient)
+        from_color = self._parse_color(background_from_color)
+        to_color = self._parse_color(background_to_color)
+        gradient = self.get_layer(im.size, from_color, to_color, background_direction)
+        if from_color[3] == to_color[3] == 255:  # noqa: PLR2004
+            # An opaque layer replaces the canvas, there is nothing to blend through its alpha.
+            im.paste(gradient)
+        else:
+            im.alpha_composite(gradient)
         if debug:
             draw = CustomImageDraw(im)
             draw.grid(fill=(0, 255, 0, 75), style="dashed")
@@ -132,31 +206,40 @@ class GradientBackgroundPipeLine(BasePipeLine):
         to_color: tuple[int, int, int, int],
         direction: str,
     ) -> Image.Image:
-        gradient = Image.new("RGBA", (width, height))
-        draw = ImageDraw.Draw(gradient)
-
+        # Every pixel color only depends on one index along a ramp (x, y, x + y or
+        # width - x + y), so the ramp is computed once and spread over the image by Pillow.
         if direction == "l-r":
-            for x in range(width):
-                color = self._blend_colors(from_color, to_color, x / width)
-                draw.line([(x, 0), (x, height)], fill=color)
-
-        elif direction == "t-b":
-            for y in range(height):
-                color = self._blend_colors(from_color, to_color, y / height)
-                draw.line([(0, y), (width, y)], fill=color)
-
-        elif direction in {"lt-rb", "rt-lb"}:
-            for y in range(height):
-                for x in range(width):
-                    blend = (
-                        (x + y) / (width + height)
-                        if direction == "lt-rb"
-                        else (width - x + y) / (width + height)
-                    )
-                    color = self._blend_colors(from_color, to_color, blend)
-                    draw.point((x, y), fill=color)
-
-        return gradient
+            ramp = self._create_ramp(width, width, from_color, to_color)
+            return ramp.resize((width, height), Image.Resampling.NEAREST)
+
+        if direction == "t-b":
+            ramp = self._create_ramp(height, height, from_color, to_color, vertical=True)
+            return ramp.resize((width, height), Image.Resampling.NEAREST)
+
+        if direction in {"lt-rb", "rt-lb"}:
+            ramp = self._create_ramp(width + height + 1, width + height, from_color, to_color)
+            # Affine transforms sample the ramp at pixel centers, (x + 0.5, y + 0.5).
+            matrix = (
+                (1, 1, -0.5, 0, 0, 0) if direction == "lt-rb" else (-1, 1, width + 0.5, 0, 0, 0)
+            )
+            return ramp.transform(
+                (width, height), Image.Transform.AFFINE, matrix, Image.Resampling.NEAREST
+            )
+
+        return Image.new("RGBA", (width, height))
+
+    def _create_ramp(
+        self,
+        length: int,
+        denominator: int,
+        from_color: tuple[int, int, int, int],
+        to_color: tuple[int, int, int, int],
+        vertical: bool = False,
+    ) -> Image.Image:
+        data = bytearray()
+        for index in range(length):
+            data.extend(self._blend_colors(from_color, to_color, index / denominator))
+        return Image.frombytes("RGBA", (1, length) if vertical else (length, 1), bytes(data))
 
     def _blend_colors(
         self,
@@ -8,20 +8,127 @@ if typing.TYPE_CHECKING:
 
 __all__ = (
     "BasePipeLine",
+    "KeywordRoute",
+    "MissingPipelineKeysError",
     "RedirectKeywordPipeLine",
+    "route_kwargs",
 )
 
 
+class KeywordRoute(typing.NamedTuple):
+    """
+    Routing of one pipe argument: the first of `keys` present in the render kwargs is passed
+    as `argument`. A key other than the argument itself holding `None` is skipped, unless the
+    argument is required.
+    """
+
+    argument: str
+    keys: tuple[str, ...]
+    required: bool = False
+
+
+class MissingPipelineKeysError(KeyError, ValueError):
+    """
+    Raised before a render starts when kwargs required by its pipes are missing. `missing`
+    lists the pipes with the keys each of them lacks.
+    """
+
+    def __init__(self, missing: typing.Sequence[tuple["BasePipeLine", tuple[str, ...]]]) -> None:
+        super().__init__(missing)
+        self.missing = list(missing)
+
+    def __str__(self) -> str:
+        return "Missing pipeline keys: " + "; ".join(
+            f"{type(pipe).__name__}"
+            f"{f'({pipe.key!r})' if isinstance(pipe, RedirectKeywordPipeLine) else ''}: "
+            f"{', '.join(keys)}"
+            for pipe, keys in self.missing
+        )
+
+
 class BasePipeLine(abc.ABC):
+    """
+    Base class of the pipeline steps run by `QuoteGenerator`.
+
+    `pipe` draws onto the image and may return kwargs for the next pipes. A pipe whose result
+    only depends on some kwargs lists them in `INPUT_KEYS` (or computes them in
+    `get_input_keys`), which lets the generator reuse the canvas after it. `None`, the default,
+    means the pipe may read anything.
+
+    The generator also compiles `get_route` once per pipeline: a pipe with a route receives only
+    the kwargs it lists, through `pipe_routed`, and kwargs marked as required are checked for
+    the whole pipeline before drawing starts. `REQUIRED_INPUT_KEYS` lists the required
+    `INPUT_KEYS`, pipes without a route list theirs in `get_required_keys`. `OUTPUT_KEYS` (or
+    `get_output_keys`) lists the kwargs `pipe` may return; `None`, the default, means any, so
+    required kwargs of the later pipes are only checked when they run.
+
+    `prepare` does the work of a pipe that does not depend on the canvas size once for all the
+    renders of `QuoteGenerator.generate_variants`, returning kwargs that replace its inputs.
+    """
+
+    INPUT_KEYS: typing.ClassVar[typing.Optional[tuple[str, ...]]] = None
+    REQUIRED_INPUT_KEYS: typing.ClassVar[tuple[str, ...]] = ()
+    OUTPUT_KEYS: typing.ClassVar[typing.Optional[tuple[str, ...]]] = None
 
     def __init__(self, **kwargs) -> None:
         self.pipe_kwargs = kwargs
 
+    def get_input_keys(
+        self, kwargs: typing.Mapping[str, typing.Any]
+    ) -> typing.Optional[typing.Collection[str]]:
+        return self.INPUT_KEYS
+
+    def get_required_keys(self, kwargs: typing.Mapping[str, typing.Any]) -> typing.Collection[str]:
+        return ()
+
+    def get_output_keys(
+        self, kwargs: typing.Mapping[str, typing.Any]
+    ) -> typing.Optional[typing.Collection[str]]:
+        return self.OUTPUT_KEYS
+
+    def get_route(self) -> typing.Optional[tuple[KeywordRoute, ...]]:
+        if self.INPUT_KEYS is None:
+            return None
+        return tuple(
+            KeywordRoute(key, (key,), key in self.REQUIRED_INPUT_KEYS) for key in self.INPUT_KEYS
+        )
+
     @abc.abstractmethod
     def pipe(
         self, im: Image.Image, generator: "QuoteGenerator", /, **kwargs
     ) -> typing.Optional[dict[str, typing.Any]]: ...
 
+    def pipe_routed(
+        self, im: Image.Image, generator: "QuoteGenerator", /, **kwargs
+    ) -> typing.Optional[dict[str, typing.Any]]:
+        """Runs the pipe with kwargs already routed by `get_route`."""
+        return self.pipe(im, generator, **kwargs)
+
+    def prepare(
+        self, generator: "QuoteGenerator", kwargs: typing.Mapping[str, typing.Any]
+    ) -> typing.Optional[dict[str, typing.Any]]:
+        return None
+
+
+def route_kwargs(
+    route: tuple[KeywordRoute, ...], kwargs: typing.Mapping[str, typing.Any]
+) -> tuple[dict[str, typing.Any], tuple[str, ...]]:
+    """Picks the arguments of `route` from `kwargs`, with the keys of the missing ones."""
+    arguments = {}
+    missing: tuple[str, ...] = ()
+    for argument, keys, required in route:
+        for key in keys:
+            if key in kwargs:
+                value = kwargs[key]
+                if value is None and not required and key != argument:
+                    continue
+                arguments[argument] = value
+                break
+        else:
+            if required:
+                missing = (*missing, keys[-1])
+    return arguments, missing
+
 
 class RedirectKeywordPipeLine(BasePipeLine, abc.ABC):
     """
@@ -45,7 +152,12 @@ class RedirectKeywordPipeLine(BasePipeLine, abc.ABC):
       arguments. Calls an abstract `_pipe` method for the specific implementation of
       transformations.
     - `_get_kwargs`: Internal helper that gathers required and optional arguments prefixed
-      by the given `key`, allowing flexible keyword handling.
+      by the given `key`, allowing flexible keyword handling. Plain argument names override the
+      prefixed ones.
+    - `get_route`: The same gathering compiled once, used by `QuoteGenerator` to pass the pipe
+      only its arguments and `INPUT_KEYS`.
+    - `get_input_keys`: The prefixed and plain names of the required and optional arguments,
+      plus the unprefixed `INPUT_KEYS`.
 
     Abstract Methods:
     - `_pipe`: Subclasses must implement this method to define their specific behavior
@@ -64,16 +176,53 @@ class RedirectKeywordPipeLine(BasePipeLine, abc.ABC):
         self.required_keys = required_keys or getattr(self, "REQUIRED_ARGS", [])
         self.optional_keys = optional_keys or getattr(self, "OPTIONAL_ARGS", [])
 
+    INPUT_KEYS: typing.ClassVar[typing.Optional[tuple[str, ...]]] = ("debug",)
+
+    def get_input_keys(
+        self, kwargs: typing.Mapping[str, typing.Any]
+    ) -> typing.Optional[typing.Collection[str]]:
+        if self.INPUT_KEYS is None:
+            return None
+        arguments = [*self.required_keys, *self.optional_keys]
+        return (
+            *(f"{self.key}_{argument}" for argument in arguments),
+            *arguments,
+            *self.INPUT_KEYS,
+        )
+
+    def _get_argument_route(self) -> tuple[KeywordRoute, ...]:
+        return (
+            *(
+                KeywordRoute(argument, (argument, f"{self.key}_{argument}"), required=True)
+                for argument in self.required_keys
+            ),
+            *(
+                KeywordRoute(argument, (argument, f"{self.key}_{argument}"))
+                for argument in self.optional_keys
+            ),
+        )
+
+    def get_route(self) -> typing.Optional[tuple[KeywordRoute, ...]]:
+        if self.INPUT_KEYS is None:
+            return None
+        arguments = [*self.required_keys, *self.optional_keys]
+        return (
+            *self._get_argument_route(),
+            *(KeywordRoute(key, (key,)) for key in self.INPUT_KEYS if key not in arguments),
+        )
+
+    def _get_prepare_arguments(
+        self, kwargs: typing.Mapping[str, typing.Any]
+    ) -> dict[str, typing.Any]:
+        # Only prefixed arguments are replaced by `prepare`, plain names would override them.
+        arguments, _ = route_kwargs(self._get_argument_route(), kwargs)
+        return {name: value for name, value in arguments.items() if name not in kwargs}
+
     def _get_kwargs(self, **kwargs) -> dict[str, typing.Any]:
-        return {
-            **{key: kwargs[f"{self.key}_{key}"] for key in self.required_keys},
-            **{
-                key: kwargs.get(f"{self.key}_{key}")
-                for key in self.optional_keys
-                if kwargs.get(f"{self.key}_{key}") is not None
-            },
-            **kwargs,
-        }
+        arguments, missing = route_kwargs(self._get_argument_route(), kwargs)
+        if missing:
+            raise MissingPipelineKeysError([(self, missing)])
+        return {**arguments, **kwargs}
 
     @abc.abstractmethod
     def _pipe(
@@ -88,3 +237,8 @@ class RedirectKeywordPipeLine(BasePipeLine, abc.ABC):
             generator,
             **self._get_kwargs(**kwargs),
         )
+
+    def pipe_routed(
+        self, im: Image.Image, generator: "QuoteGenerator", /, **kwargs
+    ) -> typing.Optional[dict[str, typing.Any]]:
+        return self._pipe(im, generator, **kwargs)
@@ -4,7 +4,15 @@ from PIL.Image import Image
 
 from quote_image_generator.image_draw import CustomImageDraw
 from quote_image_generator.pipelines.base import RedirectKeywordPipeLine
-from quote_image_generator.types import DrawEntity, InputEntity, Point, Size, SizeBox
+from quote_image_generator.processors.layout import EntitiesLayout
+from quote_image_generator.types import (
+    DrawEntity,
+    InputEntity,
+    OffsetUnit,
+    Point,
+    Size,
+    SizeBox,
+)
 
 __all__ = ("EntitiesPipeLine",)
 
@@ -25,6 +33,7 @@ class EntitiesPipeLine(RedirectKeywordPipeLine):
         - `vertical_align`, `horizontal_align`: Control the alignment of entities within the box.
         - `input_text`: Text to convert into drawable entities.
         - `input_entities`, draw_entities: Input or pre-drawn entities for customization.
+        - `offset_unit`: Unit of the offsets of the input entities.
         - `max_font_size`: Maximum font size for drawing entities.
 
     Parameters:
@@ -33,13 +42,20 @@ class EntitiesPipeLine(RedirectKeywordPipeLine):
     - `horizontal_align` (Literal["left", "middle", "right"]): Horizontal alignment of entities within the box.
     - `input_text` (Optional[str]): Text content to convert into drawable entities if provided.
     - `input_entities` (Optional[list[InputEntity]]): List of input entities for custom drawing.
+    - `offset_unit` (OffsetUnit): "utf16" when the input entities count UTF-16 code units, as
+      Telegram and JavaScript do. Defaults to "code_point".
     - `draw_entities` (Optional[list[DrawEntity]]): List of pre-created drawable entities to render.
     - `max_font_size` (int): Maximum font size allowed for entities. Defaults to 128.
+    - `layout` (Optional[EntitiesLayout]): Layout computed beforehand with
+      `TextProcessor.layout_entities`. When set, it is painted without measuring anything and
+      the other entity arguments are ignored.
     - `debug` (bool): When True, renders an anchor marker at the box origin for alignment reference.
 
     Methods:
     - `_pipe`: Converts input text to entities or directly draws given entities within the box.
       Aligns entities based on the specified parameters and optionally marks the anchor for debugging.
+      Returns nothing; use `TextProcessor.layout_entities` to inspect or cache a layout.
+    - `prepare`: Converts the input text to draw entities once for all the variants of a quote.
     """
 
     REQUIRED_ARGS: typing.ClassVar[list[str]] = ["box"]
@@ -48,9 +64,32 @@ class EntitiesPipeLine(RedirectKeywordPipeLine):
         "horizontal_align",
         "input_text",
         "input_enitites",
+        "offset_unit",
         "draw_entities",
         "max_font_size",
+        "layout",
     ]
+    OUTPUT_KEYS: typing.ClassVar[tuple[str, ...]] = ()
+
+    def prepare(
+        self, generator: "QuoteGenerator", kwargs: typing.Mapping[str, typing.Any]
+    ) -> typing.Optional[dict[str, typing.Any]]:
+        arguments = self._get_prepare_arguments(kwargs)
+        if (
+            not arguments.get("input_text")
+            or arguments.get("layout") is not None
+            or "layout" in kwargs
+            or "draw_entities" in kwargs
+        ):
+            return None
+        return {
+            f"{self.key}_input_text": None,
+            f"{self.key}_draw_entities": generator.entities_processor.convert_input_to_draw_entity(
+                arguments["input_text"],
+                arguments.get("input_enitites") or [],
+                arguments.get("offset_unit", "code_point"),
+            ),
+        }
 
     def _pipe(
         self,
@@ -62,15 +101,25 @@ class EntitiesPipeLine(RedirectKeywordPipeLine):
         horizontal_align: typing.Literal["left", "middle", "right"] = "middle",
         input_text: typing.Optional[str] = None,
         input_enitites: typing.Optional[list[InputEntity]] = None,
+        offset_unit: OffsetUnit = "code_point",
         draw_entities: typing.Optional[list[DrawEntity]] = None,
         max_font_size: int = 128,
+        layout: typing.Optional[EntitiesLayout] = None,
         debug: bool = False,
         **kwargs,
     ) -> None:
+        if layout is not None:
+            generator.text_processor.draw_layout(im, layout)
+            if debug:
+                draw = CustomImageDraw(im)
+                draw.anchor(Point(box.x, box.y), Size(50, 50), fill=(255, 0, 0, 75))
+            return
+
         if input_text:
             entities = generator.entities_processor.convert_input_to_draw_entity(
                 input_text,
                 input_enitites or [],
+                offset_unit,
             )
         else:
             entities = draw_entities
@@ -36,6 +36,15 @@ class GridResizePipeLine(BasePipeLine):
         `resized_boxes` = pipeline.pipe(im, generator, box_keys=["box1", "box2"], grid_image_size=(1600, 900))
     """
 
+    def get_input_keys(self, kwargs: typing.Mapping[str, typing.Any]) -> tuple[str, ...]:
+        return ("box_keys", "grid_image_size", *kwargs.get("box_keys", ()))
+
+    def get_required_keys(self, kwargs: typing.Mapping[str, typing.Any]) -> tuple[str, ...]:
+        return ("box_keys", *kwargs.get("box_keys", ()))
+
+    def get_output_keys(self, kwargs: typing.Mapping[str, typing.Any]) -> tuple[str, ...]:
+        return tuple(kwargs.get("box_keys", ()))
+
     def _resize_box(
         self,
         box: SizeBox,
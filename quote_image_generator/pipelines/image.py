@@ -1,14 +1,24 @@
-import io
+import hashlib
 import typing
 
 import typing_extensions
-from PIL import Image, ImageDraw
+from PIL import Image
 
+from quote_image_generator.cache import CacheStats, LRUCache
 from quote_image_generator.generator import QuoteGenerator
+from quote_image_generator.image_draw import alpha_paste
+from quote_image_generator.image_io import (
+    DEFAULT_MAX_PIXELS,
+    decode_image,
+    decodes_reduced,
+    resize_image,
+)
+from quote_image_generator.instrumentation import count
+from quote_image_generator.masks import MaskProvider, MaskShape, default_mask_provider
 from quote_image_generator.pipelines.base import RedirectKeywordPipeLine
 from quote_image_generator.types import Size, SizeBox
 
-__all__ = ("ImagePipeLine", "CircleImagePipeLine", "RoundedImagePipeLine")
+__all__ = ("CircleImagePipeLine", "ImagePipeLine", "RoundedImagePipeLine")
 
 
 class ImagePipeLine(RedirectKeywordPipeLine):
@@ -22,16 +32,39 @@ class ImagePipeLine(RedirectKeywordPipeLine):
     - `REQUIRED_ARGS` (list[str]): Specifies "box" and "image" as required arguments.
     - `OPTIONAL_ARGS` (list[str]): Defines optional arguments including:
         - `keep_square`: Boolean to control whether the image should retain square proportions when resized.
+        - `image_cache_key`: Key of the image in the tile cache.
+    - `INPUT_KEYS` (tuple[str]): The unprefixed `vertical_align`, `horizontal_align` and `debug`.
+    - `OUTPUT_KEYS` (tuple[str]): Empty, the pipe returns nothing.
+    - `MASK_SHAPE` (MaskShape): Shape of the mask, a rectangle.
 
     Methods:
     - `get_mask`: Returns an image mask with full opacity, allowing for transparent overlays if needed.
+      Masks come from a `MaskProvider`, which caches them antialiased by shape and size.
+    - `get_mask_spec`: Shape and corner radius of the mask, part of the tile cache key.
     - `_pipe`: Core method that resizes the image (if needed), aligns it within the box based on specified
-      alignment parameters, and pastes it onto the target image.
+      alignment parameters, and pastes it onto the target image. Encoded images are decoded
+      straight to the box size, see `image_io.decode_image`. `Image` inputs are not modified.
+    - `prepare`: Decodes an encoded image once for all the variants of a quote, unless it is a
+      JPEG, and hashes it for the tile cache.
+
+    Constructor Parameters:
+    - `max_pixels` (Optional[int]): Largest encoded image accepted, in decoded pixels. Larger
+      images raise `ImageTooLargeError` before their pixels are allocated. JPEGs are decoded at
+      a reduced scale when the box is much smaller, and only that scale counts. `None` disables
+      the limit. Defaults to 64 megapixels.
+    - `mask_provider` (Optional[MaskProvider]): Cache of the masks, shared by all the image
+      pipes by default.
+    - `tile_cache_bytes` (int): Memory budget of the cache of finished tiles, the images resized
+      and masked, keyed by image content, size and mask. Encoded images are keyed by the hash
+      of their bytes, decoded `Image` inputs only with an `image_cache_key`. Defaults to 0,
+      which disables the cache.
 
     Parameters:
     - `box` (SizeBox): The area in which to place the image.
     - `image` (Union[bytes, Image.Image]): The image to be placed, either as bytes or a preloaded image object.
     - `keep_square` (bool): If True, resizes the image to fit within a square, maintaining aspect ratio. Defaults to True.
+    - `image_cache_key` (Optional[Hashable]): Identifies the image content in the tile cache, such
+      as a user id and avatar version, so the image bytes are not hashed on every render.
     - `vertical_align` (Literal["top", "middle", "bottom"]): Vertical alignment within the box.
     - `horizontal_align` (Literal["left", "middle", "right"]): Horizontal alignment within the box.
 
@@ -54,10 +87,93 @@ class ImagePipeLine(RedirectKeywordPipeLine):
     ]
     OPTIONAL_ARGS: typing.ClassVar[list[str]] = [
         "keep_square",
+        "image_cache_key",
     ]
+    INPUT_KEYS: typing.ClassVar[tuple[str, ...]] = ("vertical_align", "horizontal_align", "debug")
+    OUTPUT_KEYS: typing.ClassVar[tuple[str, ...]] = ()
+    MASK_SHAPE: typing.ClassVar[MaskShape] = "rectangle"
 
-    def get_mask(self, image: Image.Image) -> Image.Image:
-        return Image.new("L", image.size, 255)
+    def __init__(
+        self,
+        key: str,
+        required_keys: typing.Optional[list[str]] = None,
+        optional_keys: typing.Optional[list[str]] = None,
+        *,
+        max_pixels: typing.Optional[int] = DEFAULT_MAX_PIXELS,
+        mask_provider: typing.Optional[MaskProvider] = None,
+        tile_cache_bytes: int = 0,
+        **kwargs,
+    ) -> None:
+        super().__init__(key, required_keys, optional_keys, **kwargs)
+        self.max_pixels = max_pixels
+        self._mask_provider = mask_provider or default_mask_provider
+        self._tiles: typing.Optional[LRUCache[typing.Hashable, Image.Image]] = (
+            LRUCache(
+                maxsize=None,
+                max_bytes=tile_cache_bytes,
+                sizeof=lambda tile: len(tile.getbands()) * tile.width * tile.height,
+            )
+            if tile_cache_bytes
+            else None
+        )
+
+    @property
+    def tile_cache_stats(self) -> typing.Optional[CacheStats]:
+        return self._tiles.stats if self._tiles is not None else None
+
+    def get_mask_spec(self, size: tuple[int, int], **kwargs) -> tuple[MaskShape, int]:
+        """Shape and corner radius of the mask of an image of `size`."""
+        return self.MASK_SHAPE, 0
+
+    def get_mask(self, image: Image.Image, **kwargs) -> Image.Image:
+        shape, radius = self.get_mask_spec(image.size, **kwargs)
+        return self._mask_provider.get_mask(shape, image.size, radius)
+
+    def prepare(
+        self, generator: QuoteGenerator, kwargs: typing.Mapping[str, typing.Any]
+    ) -> typing.Optional[dict[str, typing.Any]]:
+        arguments = self._get_prepare_arguments(kwargs)
+        image = arguments.get("image")
+        if image is None or isinstance(image, Image.Image):
+            return None
+        prepared = {}
+        if self._tiles is not None and arguments.get("image_cache_key") is None:
+            prepared[f"{self.key}_image_cache_key"] = self._hash_image(image)
+        # Decoding a JPEG at the reduced scale of every size is faster than sharing a full decode.
+        if not decodes_reduced(image):
+            prepared[f"{self.key}_image"] = decode_image(image, max_pixels=self.max_pixels)
+        return prepared
+
+    def _hash_image(self, image: bytes) -> bytes:
+        return hashlib.blake2b(image, digest_size=16).digest()
+
+    def _get_tile(
+        self,
+        image: typing.Union[bytes, Image.Image],
+        size: tuple[int, int],
+        image_cache_key: typing.Optional[typing.Hashable],
+        kwargs: dict[str, typing.Any],
+    ) -> Image.Image:
+        tile_key = None
+        if self._tiles is not None:
+            if image_cache_key is None and not isinstance(image, Image.Image):
+                image_cache_key = self._hash_image(image)
+            if image_cache_key is not None:
+                tile_key = (image_cache_key, size, self.get_mask_spec(size, **kwargs))
+                tile = self._tiles.get(tile_key)
+                if tile is not None:
+                    count("cached_image_tiles")
+                    return tile
+
+        tile = (
+            resize_image(image, size)
+            if isinstance(image, Image.Image)
+            else decode_image(image, size, max_pixels=self.max_pixels)
+        )
+        tile.putalpha(self.get_mask(tile, **kwargs))
+        if tile_key is not None:
+            self._tiles.put(tile_key, tile)  # type: ignore[union-attr]
+        return tile
 
     def _pipe(
         self,
@@ -67,6 +183,7 @@ class ImagePipeLine(RedirectKeywordPipeLine):
         box: SizeBox,
         image: typing.Union[bytes, Image.Image],
         keep_square: bool = True,
+        image_cache_key: typing.Optional[typing.Hashable] = None,
         vertical_align: typing.Literal["top", "middle", "bottom"] = "middle",
         horizontal_align: typing.Literal["left", "middle", "right"] = "middle",
         **kwargs,
@@ -78,16 +195,7 @@ class ImagePipeLine(RedirectKeywordPipeLine):
         else:
             size = box.size
 
-        image = (
-            image
-            if isinstance(image, Image.Image)
-            else Image.open(
-                io.BytesIO(image),
-            )
-            .convert("RGBA")
-            .resize(size, resample=Image.Resampling.LANCZOS)
-        )
-        image.putalpha(self.get_mask(image))
+        image = self._get_tile(image, size, image_cache_key, kwargs)
 
         pos = (box.x, box.y)
 
@@ -112,27 +220,32 @@ class ImagePipeLine(RedirectKeywordPipeLine):
                 pos[1],
             )
 
-        im.paste(image, pos, mask=image)
+        alpha_paste(im, image, pos)
 
 
 class CircleImagePipeLine(ImagePipeLine):
 
-    @typing_extensions.override
-    def get_mask(self, image: Image.Image) -> Image.Image:
-        mask = Image.new("L", image.size, 0)
-        ImageDraw.Draw(mask).ellipse((0, 0, *image.size), fill=255)
-        return mask
+    MASK_SHAPE: typing.ClassVar[MaskShape] = "ellipse"
 
 
 class RoundedImagePipeLine(ImagePipeLine):
+    """
+    `ImagePipeLine` with rounded corners.
+
+    Class Variables:
+    - `DEFAULT_RADIUS` (int): Corner radius in pixels when `radius` is not given, 30.
+
+    Parameters:
+    - `radius` (Optional[int]): Corner radius in pixels, at most half the smaller side of the
+      image.
+    """
+
+    OPTIONAL_ARGS: typing.ClassVar[list[str]] = [*ImagePipeLine.OPTIONAL_ARGS, "radius"]
+    MASK_SHAPE: typing.ClassVar[MaskShape] = "rounded_rectangle"
+    DEFAULT_RADIUS: typing.ClassVar[int] = 30
 
     @typing_extensions.override
-    def get_mask(self, image: Image.Image) -> Image.Image:
-        mask = Image.new("L", image.size, 0)
-        ImageDraw.Draw(mask).rounded_rectangle(
-            (0, 0, *image.size),
-            30,
-            outline=255,
-            fill=255,
-        )
-        return mask
+    def get_mask_spec(
+        self, size: tuple[int, int], radius: typing.Optional[int] = None, **kwargs
+    ) -> tuple[MaskShape, int]:
+        return self.MASK_SHAPE, self.DEFAULT_RADIUS if radius is None else radius
@@ -60,6 +60,7 @@ class TextPipeLine(RedirectKeywordPipeLine):
         "horizontal_align",
         "max_font_size",
     ]
+    OUTPUT_KEYS: typing.ClassVar[tuple[str, ...]] = ()
 
     def _pipe(
         self,
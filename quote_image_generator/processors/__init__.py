@@ -1,11 +1,20 @@
-from .emoji import ABCEmojiSource, ChunkResult, FileEmojiSource
-from .entities import EntitiesProcessor
+from .emoji import ABCEmojiSource, AtlasEmojiSource, ChunkResult, FileEmojiSource
+from .entities import EntitiesProcessor, utf16_offset_index
+from .fonts import FontRegistry, default_font_registry
+from .layout import EntitiesLayout, LayoutLine, LayoutRun
 from .text import TextProcessor
 
 __all__ = (
     "ABCEmojiSource",
     "FileEmojiSource",
+    "AtlasEmojiSource",
     "ChunkResult",
+    "EntitiesLayout",
     "EntitiesProcessor",
+    "FontRegistry",
+    "default_font_registry",
+    "LayoutLine",
+    "LayoutRun",
     "TextProcessor",
+    "utf16_offset_index",
 )
@@ -1,18 +1,38 @@
 import abc
+import base64
+import concurrent.futures
 import functools
+import hashlib
+import io
+import json
 import logging
+import os
 import pathlib
 import re
+import tempfile
+import threading
 import typing
 
 from PIL import Image
 
+try:
+    import requests
+except ImportError:  # `requests` is only needed by `download_from_unicode`.
+    requests = None  # type: ignore[assignment]
+
+from quote_image_generator.cache import CacheStats, LRUCache
+from quote_image_generator.instrumentation import count
+from quote_image_generator.processors.emoji_atlas import EmojiAtlas, write_emoji_atlas
+from quote_image_generator.processors.emoji_import import iter_unicode_emoji_list
+from quote_image_generator.processors.emoji_matcher import EmojiMatcher
+
 logger = logging.getLogger(__name__)
 
 
 __all__ = (
-    "ChunkResult",
     "ABCEmojiSource",
+    "AtlasEmojiSource",
+    "ChunkResult",
     "FileEmojiSource",
 )
 
@@ -24,48 +44,258 @@ class ChunkResult(typing.TypedDict):
 
 class ABCEmojiSource(abc.ABC):
 
-    def __init__(self, emoji_scale: float = 1.1) -> None:
+    def __init__(
+        self,
+        emoji_scale: float = 1.1,
+        image_cache_bytes: typing.Optional[int] = 32 * 1024 * 1024,
+    ) -> None:
         self.emoji_scale = emoji_scale
+        # Guards lazy loading of emoji tables and matchers shared by render threads.
+        self._load_lock = threading.RLock()
+        self._sized_images: LRUCache[tuple[typing.Union[str, bytes], int], Image.Image] = LRUCache(
+            maxsize=None,
+            max_bytes=image_cache_bytes,
+            sizeof=lambda image: image.width * image.height * len(image.getbands()),
+        )
 
     @abc.abstractmethod
     def get_image(self, emoji_id: str) -> Image.Image: ...
+    def get_sized_image(self, emoji_id: str, size: int) -> Image.Image:
+        """
+        Returns the RGBA bitmap of `emoji_id` resized to `size`x`size`, ready to be pasted.
+        Bitmaps are cached, so the returned image is shared and must not be modified.
+        """
+        return self._sized_images.get_or_create(
+            (emoji_id, size),
+            lambda: self._resize_image(self.get_image(emoji_id), size),
+        )
+
+    def get_sized_image_from_bytes(self, data: bytes, size: int) -> Image.Image:
+        """Same as `get_sized_image` for an encoded emoji image, e.g. a custom emoji entity."""
+        return self._sized_images.get_or_create(
+            (data, size),
+            lambda: self._resize_image(Image.open(io.BytesIO(data)), size),
+        )
+
+    @property
+    def image_cache_stats(self) -> CacheStats:
+        return self._sized_images.stats
+
+    def _resize_image(self, image: Image.Image, size: int) -> Image.Image:
+        count("emoji_decodes")
+        count("image_resizes")
+        return image.convert("RGBA").resize((size, size), resample=Image.Resampling.LANCZOS)
+
     @abc.abstractmethod
     def is_emoji(self, emoji_id: str) -> bool: ...
     @abc.abstractmethod
     def get_emoji_regex(self) -> re.Pattern: ...
+    def get_emoji_matcher(self) -> typing.Optional[EmojiMatcher]:
+        """
+        Returns the trie segmenter used instead of `get_emoji_regex` when available.
+        Sources that can enumerate their emoji should override it.
+        """
+        return None
+
+    def get_signature(self) -> str:
+        """
+        Identifies the emoji and images of the source, so results rendered with them can be
+        cached. Sources whose emoji can change should return a value that changes with them.
+        """
+        return type(self).__qualname__
+
     @functools.lru_cache(maxsize=128)  # noqa: B019
     def chunk_by_emoji(self, text: str) -> list[ChunkResult]:
         chunks = []
-        for chunk in self.get_emoji_regex().split(text):
-            if not chunk:
-                continue
-            if self.is_emoji(chunk):
-                chunks.append(ChunkResult(type="emoji", content=chunk))
-                continue
-            chunks.append(ChunkResult(type="text", content=chunk))
-        logger.debug(f"Parsed text {text} to {chunks}")
+        matcher = self.get_emoji_matcher()
+        if matcher is not None:
+            for is_emoji, chunk in matcher.split(text):
+                chunks.append(ChunkResult(type="emoji" if is_emoji else "text", content=chunk))
+        else:
+            for chunk in self.get_emoji_regex().split(text):
+                if not chunk:
+                    continue
+                if self.is_emoji(chunk):
+                    chunks.append(ChunkResult(type="emoji", content=chunk))
+                    continue
+                chunks.append(ChunkResult(type="text", content=chunk))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Parsed text {text} to {chunks}")
         return chunks
 
     def get_emoji_count(self, text: str) -> int:
+        matcher = self.get_emoji_matcher()
+        if matcher is not None:
+            return matcher.count(text)
         return len(list(filter(lambda x: x["type"] == "emoji", self.chunk_by_emoji(text))))
 
     def get_emojies(self, text: str) -> list[str]:
+        matcher = self.get_emoji_matcher()
+        if matcher is not None:
+            return matcher.findall(text)
         return [it["content"] for it in self.chunk_by_emoji(text) if it["type"] == "emoji"]
 
 
 class FileEmojiSource(ABCEmojiSource):
 
-    def __init__(self, emoji_dir: pathlib.Path = pathlib.Path("emoji"), emoji_scale: float = 1.1):
+    # The index and the matcher are kept in a subdirectory, so that writing them does not
+    # change the modification time of `emoji_dir` the index is validated with.
+    CACHE_DIR_NAME = ".emoji-cache"
+    MATCHER_FILE_NAME = "matcher.json"
+    INDEX_FILE_NAME = "index.json"
+    INDEX_VERSION = 2
+
+    def __init__(
+        self,
+        emoji_dir: pathlib.Path = pathlib.Path("emoji"),
+        emoji_scale: float = 1.1,
+        save_matcher: bool = True,
+        image_cache_bytes: typing.Optional[int] = 32 * 1024 * 1024,
+        save_index: bool = True,
+    ):
         self.emoji_dir = emoji_dir
-        super().__init__(emoji_scale=emoji_scale)
+        self.save_matcher = save_matcher
+        self.save_index = save_index
+        self._emoji_table: typing.Optional[dict[str, pathlib.Path]] = None
+        self._matcher: typing.Optional[EmojiMatcher] = None
+        self._signature: typing.Optional[str] = None
+        super().__init__(emoji_scale=emoji_scale, image_cache_bytes=image_cache_bytes)
 
-    @functools.cached_property
+    @property
     def emoji_table(self) -> dict[str, pathlib.Path]:
-        logger.debug(f"Load emoji table from {self.emoji_dir}")
-        return {
-            "".join(chr(int(code, 16)) for code in it.stem.replace("U+", "").split()): it
-            for it in self.emoji_dir.glob("*.png")
-        }
+        if self._emoji_table is not None:
+            return self._emoji_table
+        with self._load_lock:
+            if self._emoji_table is None:
+                logger.debug(f"Load emoji table from {self.emoji_dir}")
+                files = self._read_index()
+                if files is None:
+                    files = self._scan_index()
+                self._emoji_table = {
+                    emoji_id: self.emoji_dir / name for name, emoji_id in files.items()
+                }
+            return self._emoji_table
+
+    def refresh_index(self) -> None:
+        """
+        Brings the index up to date with `emoji_dir` after emoji files were added or removed.
+        Only new file names are parsed, and the in-memory table and matcher are reset.
+        """
+        with self._load_lock:
+            self._scan_index()
+            self._reset_loaded()
+
+    def get_signature(self) -> str:
+        """
+        Hash of the name, size and modification time of every emoji file, computed once and
+        again after `refresh_index`, so edited or added emoji change it.
+        """
+        if self._signature is not None:
+            return self._signature
+        with self._load_lock:
+            if self._signature is None:
+                digest = hashlib.blake2b(digest_size=16)
+                for emoji_id, path in sorted(self.emoji_table.items()):
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    digest.update(f"{emoji_id}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+                self._signature = digest.hexdigest()
+            return self._signature
+
+    @property
+    def cache_dir(self) -> pathlib.Path:
+        return self.emoji_dir / self.CACHE_DIR_NAME
+
+    def _make_cache_dir(self) -> bool:
+        try:
+            self.cache_dir.mkdir(exist_ok=True)
+        except OSError as e:
+            logger.debug(f"Unable to create emoji cache directory {self.cache_dir}: {e}")
+            return False
+        return True
+
+    def _reset_loaded(self) -> None:
+        self._emoji_table = None
+        self._matcher = None
+        self._signature = None
+        self.get_emoji_regex.cache_clear()
+        self.chunk_by_emoji.cache_clear()
+
+    def _read_index(self, validate: bool = True) -> typing.Optional[dict[str, str]]:
+        try:
+            index = json.loads((self.cache_dir / self.INDEX_FILE_NAME).read_bytes())
+            mtime_ns = self.emoji_dir.stat().st_mtime_ns
+        except (OSError, ValueError):
+            return None
+        if index.get("version") != self.INDEX_VERSION:
+            return None
+        if validate and index.get("mtime_ns") != mtime_ns:
+            logger.debug(f"Emoji index of {self.emoji_dir} is stale")
+            return None
+        return index["files"]
+
+    def _scan_index(self, known: typing.Optional[dict[str, str]] = None) -> dict[str, str]:
+        """
+        Lists the emoji files of `emoji_dir` and saves the index. Names found in `known`, by
+        default the saved index, are not parsed again.
+        """
+        if known is None:
+            known = self._read_index(validate=False) or {}
+        save = self.save_index and self._make_cache_dir()
+        try:
+            # Taken before listing, so files added during the scan leave the index stale.
+            mtime_ns = self.emoji_dir.stat().st_mtime_ns
+            names = [it.name for it in os.scandir(self.emoji_dir) if it.name.endswith(".png")]
+        except FileNotFoundError:
+            return {}
+
+        files: dict[str, str] = {}
+        for name in names:
+            emoji_id = known.get(name) or self._parse_file_name(name)
+            if emoji_id:
+                files[name] = emoji_id
+        logger.debug(
+            f"Scanned {self.emoji_dir}: {len(files)} emoji, "
+            f"{len(files.keys() - known.keys())} added, {len(known.keys() - files.keys())} removed"
+        )
+        if save:
+            self._write_index(files, mtime_ns)
+        return files
+
+    def _write_index(self, files: dict[str, str], mtime_ns: int) -> None:
+        index_file = self.cache_dir / self.INDEX_FILE_NAME
+        try:
+            # Written to a temporary file and renamed, so concurrent workers never read a
+            # partial index.
+            fd, tmp_name = tempfile.mkstemp(prefix=f".{index_file.name}.", dir=self.cache_dir)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(
+                        {
+                            "version": self.INDEX_VERSION,
+                            "mtime_ns": mtime_ns,
+                            "files": files,
+                        },
+                        f,
+                        ensure_ascii=False,
+                    )
+                os.replace(tmp_name, index_file)
+            except BaseException:
+                pathlib.Path(tmp_name).unlink(missing_ok=True)
+                raise
+        except OSError as e:
+            logger.debug(f"Unable to save emoji index to {index_file}: {e}")
+
+    def _parse_file_name(self, name: str) -> typing.Optional[str]:
+        try:
+            return "".join(
+                chr(int(code, 16)) for code in name[: -len(".png")].replace("U+", "").split()
+            )
+        except ValueError:
+            logger.debug(f"Skip {name}: not an emoji file name")
+            return None
 
     @functools.cache  # noqa: B019
     def get_emoji_regex(self) -> re.Pattern:  # type: ignore
@@ -73,17 +303,64 @@ class FileEmojiSource(ABCEmojiSource):
         regex_pattern = "|".join(map(re.escape, emoji_patterns))
         return re.compile(f"({regex_pattern})")
 
+    def get_emoji_matcher(self) -> EmojiMatcher:
+        if self._matcher is not None:
+            return self._matcher
+        with self._load_lock:
+            if self._matcher is None:
+                self._matcher = self._load_matcher()
+            return self._matcher
+
+    def _load_matcher(self) -> EmojiMatcher:
+        matcher_file = self.cache_dir / self.MATCHER_FILE_NAME
+        signature = hashlib.blake2b(
+            "\n".join(sorted(self.emoji_table)).encode("utf-8"), digest_size=16
+        ).hexdigest()
+
+        matcher = EmojiMatcher.load(matcher_file, signature)
+        if matcher is not None:
+            return matcher
+
+        logger.debug(f"Build emoji matcher for {self.emoji_dir}")
+        matcher = EmojiMatcher(self.emoji_table)
+        if self.save_matcher and self._make_cache_dir():
+            try:
+                matcher.dump(matcher_file, signature)
+            except OSError as e:
+                logger.debug(f"Unable to save emoji matcher to {matcher_file}: {e}")
+        return matcher
+
     def is_emoji(self, emoji_id: str) -> bool:
         return emoji_id in self.emoji_table
 
     def get_image(self, emoji_id: str) -> Image.Image:
         return Image.open(self.emoji_table[emoji_id]).convert("RGBA")
 
+    def build_atlas(
+        self,
+        atlas_path: typing.Optional[pathlib.Path] = None,
+        cell_size: int = 72,
+    ) -> pathlib.Path:
+        """
+        Packs every emoji of `emoji_dir` into an atlas file for `AtlasEmojiSource`.
+        Defaults to `emoji_dir / "emoji.atlas"`.
+        """
+        atlas_path = atlas_path or self.emoji_dir / AtlasEmojiSource.ATLAS_FILE_NAME
+        logger.debug(f"Build emoji atlas {atlas_path} from {self.emoji_dir}")
+        write_emoji_atlas(
+            ((emoji_id, self.get_image(emoji_id)) for emoji_id in sorted(self.emoji_table)),
+            atlas_path,
+            cell_size=cell_size,
+        )
+        return atlas_path
+
     def download_from_unicode(self) -> None:
-        import requests
+        if requests is None:
+            raise RuntimeError("Downloading the emoji list requires the `requests` package")
 
         url = "https://unicode.org/emoji/charts/full-emoji-list.html"
         output_file = self.emoji_dir / "full-emoji-list.html"
+        self.emoji_dir.mkdir(parents=True, exist_ok=True)
         output_file.unlink(missing_ok=True)
 
         curr_len = 0
@@ -98,30 +375,104 @@ class FileEmojiSource(ABCEmojiSource):
                     logger.debug(f"Downloading full-emoji list from unicode: {curr_len}")
                     f.write(chunk)
 
-    def parse_from_unicode_html(self) -> None:
-        import base64
+    def parse_from_unicode_html(
+        self,
+        html_file: typing.Optional[pathlib.Path] = None,
+        workers: typing.Optional[int] = None,
+        max_pending: int = 256,
+    ) -> int:
+        """
+        Imports emoji images from a `full-emoji-list.html` chart into `emoji_dir` and returns the
+        number of imported emoji. Defaults to the chart saved by `download_from_unicode`.
 
-        from bs4 import BeautifulSoup
+        The chart is parsed as a stream and images are decoded and written by a thread pool,
+        with at most `max_pending` rows queued, so memory stays bounded whatever the chart size.
+        The emoji index is written from the imported rows, so the next load needs no rescan.
+        """
+        html_file = html_file or self.emoji_dir / "full-emoji-list.html"
+        self.emoji_dir.mkdir(parents=True, exist_ok=True)
+        known = self._read_index(validate=False) or {}
 
-        output_file = self.emoji_dir / "full-emoji-list.html"
+        logger.debug(f"Parse full-emoji list from {html_file}")
 
-        logger.debug(f"Parse full-emoji list from {output_file}")
-
-        soup = BeautifulSoup(output_file.read_text(encoding="utf-8"), features="html.parser")
-        for tr in soup.find_all("tr"):
-            emoji_code = tr.find("td", {"class": "code"})
-            if not emoji_code:
-                continue
-            emoji_code_txt = emoji_code.text
-            emoji_data = tr.find("td", {"class": "andr alt"}) or tr.find("td", {"class": "andr"})
-            if not emoji_data:
-                continue
-
-            for child in emoji_data.children:
-                if child.name == "img":
-                    emoji_data_txt = child.attrs["src"]
-                    outfile = pathlib.Path("emoji", emoji_code_txt + ".png")
-                    outfile.write_bytes(
-                        base64.b64decode(emoji_data_txt.replace("data:image/png;base64,", ""))
+        imported: dict[str, str] = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            pending: set[concurrent.futures.Future[tuple[str, str]]] = set()
+            for code, src in iter_unicode_emoji_list(html_file):
+                if len(pending) >= max_pending:
+                    done, pending = concurrent.futures.wait(
+                        pending, return_when=concurrent.futures.FIRST_COMPLETED
                     )
-                    logger.debug(f"Downloaded emoji {emoji_code_txt} to {outfile}")
+                    imported.update(future.result() for future in done)
+                pending.add(executor.submit(self._write_emoji_file, code, src))
+            imported.update(future.result() for future in concurrent.futures.as_completed(pending))
+
+        with self._load_lock:
+            self._scan_index({**known, **imported})
+            self._reset_loaded()
+        logger.debug(f"Imported {len(imported)} emoji to {self.emoji_dir}")
+        return len(imported)
+
+    def _write_emoji_file(self, code: str, src: str) -> tuple[str, str]:
+        outfile = self.emoji_dir / f"{code}.png"
+        outfile.write_bytes(base64.b64decode(src.replace("data:image/png;base64,", "")))
+        logger.debug(f"Downloaded emoji {code} to {outfile}")
+        return outfile.name, "".join(chr(int(it, 16)) for it in code.replace("U+", "").split())
+
+
+class AtlasEmojiSource(ABCEmojiSource):
+    """
+    Emoji source reading a memory-mapped atlas built with `FileEmojiSource.build_atlas`.
+
+    Opening the source reads only the atlas header, and `get_image` returns images backed by
+    the shared mapping without decoding or copying, so startup and first-render latency do not
+    depend on the number of emoji.
+    """
+
+    ATLAS_FILE_NAME = "emoji.atlas"
+
+    def __init__(
+        self,
+        atlas_path: pathlib.Path = pathlib.Path("emoji", ATLAS_FILE_NAME),
+        emoji_scale: float = 1.1,
+        image_cache_bytes: typing.Optional[int] = 32 * 1024 * 1024,
+    ):
+        self.atlas_path = atlas_path
+        self._atlas: typing.Optional[EmojiAtlas] = None
+        self._matcher: typing.Optional[EmojiMatcher] = None
+        super().__init__(emoji_scale=emoji_scale, image_cache_bytes=image_cache_bytes)
+
+    @property
+    def atlas(self) -> EmojiAtlas:
+        if self._atlas is not None:
+            return self._atlas
+        with self._load_lock:
+            if self._atlas is None:
+                logger.debug(f"Map emoji atlas {self.atlas_path}")
+                self._atlas = EmojiAtlas(self.atlas_path)
+            return self._atlas
+
+    @functools.cache  # noqa: B019
+    def get_emoji_regex(self) -> re.Pattern:  # type: ignore
+        emoji_patterns = sorted(self.atlas.rects.keys(), key=len, reverse=True)
+        regex_pattern = "|".join(map(re.escape, emoji_patterns))
+        return re.compile(f"({regex_pattern})")
+
+    def get_emoji_matcher(self) -> EmojiMatcher:
+        if self._matcher is not None:
+            return self._matcher
+        with self._load_lock:
+            if self._matcher is None:
+                self._matcher = EmojiMatcher(self.atlas.rects)
+            return self._matcher
+
+    def get_signature(self) -> str:
+        """Size and modification time of the atlas file."""
+        stat = self.atlas_path.stat()
+        return f"{type(self).__qualname__}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def is_emoji(self, emoji_id: str) -> bool:
+        return emoji_id in self.atlas
+
+    def get_image(self, emoji_id: str) -> Image.Image:
+        return self.atlas.get_image(emoji_id)
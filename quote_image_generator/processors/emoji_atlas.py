@@ -0,0 +1,135 @@
+import json
+import logging
+import mmap
+import os
+import pathlib
+import struct
+import tempfile
+import typing
+
+from PIL import Image
+
+from quote_image_generator.types import SizeBox
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = (
+    "EmojiAtlas",
+    "write_emoji_atlas",
+)
+
+
+MAGIC = b"QIGATLAS"
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct("<8sII")  # magic, version, header length
+_DATA_ALIGNMENT = 64
+
+
+def _data_offset(header_length: int) -> int:
+    offset = _PREAMBLE.size + header_length
+    return -(-offset // _DATA_ALIGNMENT) * _DATA_ALIGNMENT
+
+
+def write_emoji_atlas(
+    images: typing.Iterable[tuple[str, Image.Image]],
+    path: pathlib.Path,
+    cell_size: int = 72,
+) -> int:
+    """
+    Packs emoji images into an atlas file and returns the number of packed emoji.
+
+    The file is a preamble, a JSON header (cell size, sheet size, code point sequence to
+    rectangle index) and a pre-decoded RGBA sprite sheet. The sheet is a single column of
+    `cell_size` square cells, so the pixels of every rectangle are one contiguous slice of the
+    file and can be mapped without copying.
+    """
+    rects: dict[str, tuple[int, int, int, int]] = {}
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f, tempfile.TemporaryFile() as pixels:
+            cell_bytes = cell_size * cell_size * 4
+            for emoji_id, image in images:
+                if emoji_id in rects:
+                    continue
+                image = image.convert("RGBA")
+                if image.size != (cell_size, cell_size):
+                    image = image.resize((cell_size, cell_size), resample=Image.Resampling.LANCZOS)
+                rects[emoji_id] = (0, len(rects) * cell_size, cell_size, cell_size)
+                pixels.write(image.tobytes("raw", "RGBA"))
+
+            header = json.dumps(
+                {
+                    "cell_size": cell_size,
+                    "width": cell_size,
+                    "height": cell_size * len(rects),
+                    "rects": rects,
+                },
+                ensure_ascii=False,
+            ).encode("utf-8")
+            f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+            f.write(header)
+            f.write(b"\0" * (_data_offset(len(header)) - _PREAMBLE.size - len(header)))
+            pixels.seek(0)
+            while chunk := pixels.read(256 * cell_bytes):
+                f.write(chunk)
+        os.replace(tmp_name, path)
+    except BaseException:
+        pathlib.Path(tmp_name).unlink(missing_ok=True)
+        raise
+    logger.debug(f"Packed {len(rects)} emoji into {path}")
+    return len(rects)
+
+
+class EmojiAtlas:
+    """
+    Read-only view of an atlas file written by `write_emoji_atlas`.
+
+    The file is memory-mapped, so opening it costs one header read whatever the number of
+    emoji, and processes mapping the same atlas share its pages. `get_image` returns images
+    backed directly by the mapping.
+    """
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_length = _PREAMBLE.unpack_from(self._mmap)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not an emoji atlas of version {FORMAT_VERSION}")
+        header = json.loads(self._mmap[_PREAMBLE.size : _PREAMBLE.size + header_length])
+        self.cell_size: int = header["cell_size"]
+        self.width: int = header["width"]
+        self.height: int = header["height"]
+        self.rects: dict[str, SizeBox] = {
+            emoji_id: SizeBox(*rect) for emoji_id, rect in header["rects"].items()
+        }
+        self._data_offset = _data_offset(header_length)
+        self._view = memoryview(self._mmap)
+
+    def __contains__(self, emoji_id: str) -> bool:
+        return emoji_id in self.rects
+
+    def __len__(self) -> int:
+        return len(self.rects)
+
+    def get_image(self, emoji_id: str) -> Image.Image:
+        rect = self.rects[emoji_id]
+        if rect.x == 0 and rect.width == self.width:
+            start = self._data_offset + rect.y * self.width * 4
+            end = start + rect.width * rect.height * 4
+            return Image.frombuffer("RGBA", rect.size, self._view[start:end], "raw", "RGBA", 0, 1)
+        return self._sheet().crop(rect.to_point_box())
+
+    def _sheet(self) -> Image.Image:
+        end = self._data_offset + self.width * self.height * 4
+        return Image.frombuffer(
+            "RGBA",
+            (self.width, self.height),
+            self._view[self._data_offset : end],
+            "raw",
+            "RGBA",
+            0,
+            1,
+        )
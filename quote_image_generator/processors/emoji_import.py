@@ -0,0 +1,89 @@
+import html.parser
+import logging
+import pathlib
+import typing
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = (
+    "UnicodeEmojiListParser",
+    "iter_unicode_emoji_list",
+)
+
+
+class UnicodeEmojiListParser(html.parser.HTMLParser):
+    """
+    Incremental parser of the unicode.org `full-emoji-list.html` chart.
+
+    Rows are collected into `rows` as `(code, image source)` pairs as soon as they are complete,
+    so the caller can `feed` the document chunk by chunk and drain `rows` in between. For every
+    row the image of the `andr alt` cell is preferred, then the first `andr` cell, as the chart
+    used to be read with BeautifulSoup.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.rows: list[tuple[str, str]] = []
+        self._in_row = False
+        self._cell_classes: typing.Optional[list[str]] = None
+        self._code_parts: list[str] = []
+        self._preferred_image: typing.Optional[str] = None
+        self._fallback_image: typing.Optional[str] = None
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, typing.Optional[str]]]) -> None:
+        if tag == "tr":
+            self._end_row()
+            self._in_row = True
+        elif tag == "td" and self._in_row:
+            self._cell_classes = (dict(attrs).get("class") or "").split()
+        elif tag == "img" and self._cell_classes and "andr" in self._cell_classes:
+            src = dict(attrs).get("src")
+            if not src:
+                return
+            if self._cell_classes == ["andr", "alt"] and self._preferred_image is None:
+                self._preferred_image = src
+            if self._fallback_image is None:
+                self._fallback_image = src
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "td":
+            self._cell_classes = None
+        elif tag in ("tr", "table"):
+            self._end_row()
+
+    def handle_data(self, data: str) -> None:
+        if self._cell_classes and "code" in self._cell_classes:
+            self._code_parts.append(data)
+
+    def close(self) -> None:
+        super().close()
+        self._end_row()
+
+    def _end_row(self) -> None:
+        code = "".join(self._code_parts).strip()
+        image = self._preferred_image or self._fallback_image
+        if self._in_row and code and image:
+            self.rows.append((code, image))
+        self._in_row = False
+        self._cell_classes = None
+        self._code_parts = []
+        self._preferred_image = None
+        self._fallback_image = None
+
+
+def iter_unicode_emoji_list(
+    html_file: pathlib.Path, chunk_size: int = 1024 * 1024
+) -> typing.Iterator[tuple[str, str]]:
+    """
+    Streams `(code, image source)` rows out of a `full-emoji-list.html` file, holding at most
+    one chunk of the document and the rows parsed from it in memory.
+    """
+    parser = UnicodeEmojiListParser()
+    with open(html_file, encoding="utf-8") as f:
+        while chunk := f.read(chunk_size):
+            parser.feed(chunk)
+            yield from parser.rows
+            parser.rows.clear()
+    parser.close()
+    yield from parser.rows
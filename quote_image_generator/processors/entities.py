@@ -7,12 +7,46 @@ from quote_image_generator.types import (
     InputEntity,
     InputEntityType,
     NewLineDrawEntity,
+    OffsetUnit,
     TextDrawEntity,
     TextDrawEntityTypes,
     type_cast,
 )
 
-__all__ = ("EntitiesProcessor",)
+__all__ = (
+    "EntitiesProcessor",
+    "utf16_offset_index",
+)
+
+
+# Order of the styles of a combined run, the first one not drawing a bar gives its type.
+_STYLE_ORDER: tuple[TextDrawEntityTypes, ...] = (
+    "code",
+    "code_block",
+    "link",
+    "bold",
+    "italic",
+    "underline",
+    "strikethrough",
+    "quote",
+)
+_BAR_STYLES = ("code_block", "quote")
+
+
+def utf16_offset_index(text: str) -> list[int]:
+    """
+    Maps every UTF-16 offset of `text`, its length included, to the code point offset. Both
+    halves of a surrogate pair map to the code point they encode.
+    """
+    if text.isascii() or max(text) <= "\uffff":
+        return list(range(len(text) + 1))
+    index = []
+    for position, char in enumerate(text):
+        index.append(position)
+        if char > "\uffff":
+            index.append(position)
+    index.append(len(text))
+    return index
 
 
 class EntitiesProcessor:
@@ -74,24 +108,6 @@ class EntitiesProcessor:
             return self.colorset.link
         return self.colorset.default
 
-    def _create_text_entities(self, text: str, entity: InputEntity) -> list[DrawEntity]:
-        if entity["type"] == "emoji":
-            return []
-
-        content = text[entity["offset"] : entity["offset"] + entity["length"]]
-        color = self._get_color_by_entity_type(entity["type"])
-        font = self.font_table.get(entity["type"], self.fontset.default)
-
-        text_entity = TextDrawEntity(
-            type=entity["type"],
-            font=font,
-            color=color,
-            content=content,
-            offset=entity["offset"],
-            length=len(content),
-        )
-        return self._split_new_line_content(text_entity)
-
     def _create_default_entities(self, text: str, start: int, end: int) -> list[DrawEntity]:
         content = text[start:end]
         default_entity = TextDrawEntity(
@@ -104,29 +120,141 @@ class EntitiesProcessor:
         )
         return self._split_new_line_content(default_entity)
 
+    def _get_font_by_styles(self, styles: tuple[TextDrawEntityTypes, ...]) -> str:
+        fonts = [
+            self.font_table.get(style, self.fontset.default)  # type: ignore[call-overload]
+            for style in styles
+        ]
+        if len(fonts) == 1:
+            return fonts[0]
+        if self.fontset.mono in fonts:
+            return self.fontset.mono
+        bold = self.fontset.bold in fonts
+        italic = self.fontset.italic in fonts
+        if bold and italic:
+            return self.fontset.bold_italic or self.fontset.bold
+        if bold:
+            return self.fontset.bold
+        if italic:
+            return self.fontset.italic
+        return self.fontset.default
+
+    def _get_color_by_styles(self, styles: tuple[TextDrawEntityTypes, ...]) -> Color:
+        for style in ("code", "code_block", "link"):
+            if style in styles:
+                return self._get_color_by_entity_type(style)  # type: ignore[arg-type]
+        return self.colorset.default
+
+    def _create_styled_entities(
+        self, text: str, start: int, end: int, active: list[InputEntity]
+    ) -> list[DrawEntity]:
+        styles = tuple(
+            style for style in _STYLE_ORDER if any(entity["type"] == style for entity in active)
+        )
+        if not styles:
+            return []
+        # A bar is drawn in front of the first run of a quote or code block and of its lines.
+        bar_types = [
+            entity["type"]
+            for entity in active
+            if entity["type"] in _BAR_STYLES and entity["offset"] == start
+        ]
+        line_type = (
+            bar_types[0]
+            if bar_types
+            else next((style for style in styles if style in _BAR_STYLES), None)
+        )
+        content = text[start:end]
+        text_entity = TextDrawEntity(
+            type=(
+                bar_types[0]
+                if bar_types
+                else next((style for style in styles if style not in _BAR_STYLES), "default")
+            ),
+            font=self._get_font_by_styles(styles),
+            color=self._get_color_by_styles(styles),
+            content=content,
+            offset=start,
+            length=len(content),
+        )
+        entities = self._split_new_line_content(text_entity)
+        new_line = False
+        for entity in entities:
+            if entity["type"] == "new_line":
+                new_line = True
+                continue
+            piece = type_cast(entity, TextDrawEntity)
+            if new_line and line_type is not None:
+                piece["type"] = line_type
+            if styles != (piece["type"],):
+                piece["styles"] = styles
+        return entities
+
+    def _convert_utf16_offsets(self, text: str, entities: list[InputEntity]) -> list[InputEntity]:
+        index = utf16_offset_index(text)
+        last = len(index) - 1
+        converted = []
+        for entity in entities:
+            offset = index[max(0, min(entity["offset"], last))]
+            end = index[max(0, min(entity["offset"] + entity["length"], last))]
+            converted.append({**entity, "offset": offset, "length": max(0, end - offset)})
+        return converted  # type: ignore[return-value]
+
     def convert_input_to_draw_entity(
-        self, text: str, entities: list[InputEntity]
+        self,
+        text: str,
+        entities: list[InputEntity],
+        offset_unit: OffsetUnit = "code_point",
     ) -> list[DrawEntity]:
-        draw_entities = []
-        index = 0
-        while index < len(text):
-            entity_found = False
-            for entity in entities:
-                if entity["offset"] <= index < entity["offset"] + entity["length"]:
-                    entity_found = True
-                    if entity["type"] in self.font_table:
-                        draw_entities.extend(self._create_text_entities(text, entity))
-                    elif entity["type"] == "emoji":
-                        ent = type_cast(entity, EmojiDrawEntity)
-                        draw_entities.append({**ent, "emoji_image": ent["emoji_image"]})
-                    index += entity["length"]
-                    break
-            if not entity_found:
-                next_offset = min(
-                    (e["offset"] for e in entities if e["offset"] > index),
-                    default=len(text),
-                )
-                draw_entities.extend(self._create_default_entities(text, index, next_offset))
-                index = next_offset
+        """
+        Splits `text` at every entity boundary and converts every piece to draw entities, in
+        O((n + m) log m) for n characters and m entities.
+
+        A piece covered by several entities is one run combining their styles: the fonts of
+        bold and italic give `FontSet.bold_italic` (or bold), mono wins over both, and the
+        colors of code, then links, win over the default. Such runs list their styles in
+        `TextDrawEntity.styles`. An emoji entity replaces the text under it.
 
+        With `offset_unit="utf16"` the entity offsets and lengths count UTF-16 code units, and
+        are mapped to code points through one `utf16_offset_index` of the text. The draw
+        entities always count code points.
+        """
+        if offset_unit == "utf16":
+            entities = self._convert_utf16_offsets(text, entities)
+        text_length = len(text)
+        starts: dict[int, list[int]] = {}
+        ends: dict[int, list[int]] = {}
+        boundaries = {0, text_length}
+        for index, entity in enumerate(entities):
+            offset = min(entity["offset"], text_length)
+            boundaries.add(offset)
+            if entity["length"] > 0 and offset < text_length:
+                end = min(entity["offset"] + entity["length"], text_length)
+                starts.setdefault(offset, []).append(index)
+                ends.setdefault(end, []).append(index)
+                boundaries.add(end)
+
+        draw_entities: list[DrawEntity] = []
+        active: dict[int, InputEntity] = {}
+        start = 0
+        for position in sorted(boundaries):
+            changed = position in starts or position in ends
+            if position > start and (changed or not active or position == text_length):
+                # Empty entities only split uncovered text, like any entity offset.
+                segment = [active[index] for index in sorted(active)]
+                emoji = next((entity for entity in segment if entity["type"] == "emoji"), None)
+                if not segment:
+                    draw_entities.extend(self._create_default_entities(text, start, position))
+                elif emoji is None:
+                    draw_entities.extend(
+                        self._create_styled_entities(text, start, position, segment)
+                    )
+                elif emoji["offset"] == start:
+                    ent = type_cast(emoji, EmojiDrawEntity)
+                    draw_entities.append({**ent, "emoji_image": ent["emoji_image"]})
+                start = position
+            for index in ends.get(position, ()):
+                del active[index]
+            for index in starts.get(position, ()):
+                active[index] = entities[index]
         return draw_entities
@@ -0,0 +1,100 @@
+import logging
+import pathlib
+import typing
+
+from PIL import ImageFont
+
+from quote_image_generator.cache import CacheStats, LRUCache
+from quote_image_generator.instrumentation import count
+from quote_image_generator.types import FontSet
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = (
+    "FontRegistry",
+    "default_font_registry",
+)
+
+
+FontKey = tuple[str, int, typing.Optional[ImageFont.Layout]]
+
+
+class FontRegistry:
+    """
+    Cache of loaded FreeType fonts keyed by (font path, size, layout engine).
+
+    Loading a font opens and parses the font file, and text rendering asks for the same few fonts
+    at the same few sizes over and over, so every text code path goes through a registry.
+    `default_font_registry` is shared by all `TextProcessor` instances that were not given
+    their own registry.
+
+    Parameters:
+    - `maxsize` (Optional[int]): Maximum number of fonts kept alive, least recently used fonts
+      are evicted first. `None` keeps every font.
+    - `layout_engine` (Optional[ImageFont.Layout]): Layout engine used when a lookup does not
+      specify one. `None` lets Pillow pick the best available engine.
+
+    Methods:
+    - `get`: Returns the font for (path, size, layout engine), loading it on a miss.
+    - `warm`: Loads every font of a `FontSet` (or of a list of paths) at the given sizes upfront.
+    - `stats`: Hit, miss and eviction counters of the underlying cache.
+    """
+
+    def __init__(
+        self,
+        maxsize: typing.Optional[int] = 512,
+        layout_engine: typing.Optional[ImageFont.Layout] = None,
+    ) -> None:
+        self.layout_engine = layout_engine
+        self._fonts: LRUCache[FontKey, ImageFont.FreeTypeFont] = LRUCache(maxsize=maxsize)
+
+    def get(
+        self,
+        font_path: typing.Union[pathlib.Path, str],
+        size: int,
+        layout_engine: typing.Optional[ImageFont.Layout] = None,
+    ) -> ImageFont.FreeTypeFont:
+        path = font_path if isinstance(font_path, str) else str(font_path.absolute())
+        engine = layout_engine if layout_engine is not None else self.layout_engine
+        return self._fonts.get_or_create(
+            (path, size, engine),
+            lambda: self._load(path, size, engine),
+        )
+
+    def warm(
+        self,
+        fontset: typing.Union[FontSet, typing.Iterable[typing.Union[pathlib.Path, str]]],
+        sizes: typing.Iterable[int],
+        layout_engine: typing.Optional[ImageFont.Layout] = None,
+    ) -> None:
+        """
+        Loads every font of `fontset` at every size of `sizes`. A `maxsize` smaller than the
+        warmed fonts is raised to fit them, so warming does not evict its own fonts.
+        """
+        sizes = list(sizes)
+        font_paths = list(dict.fromkeys(path for path in fontset if path is not None))
+        needed = len(font_paths) * len(sizes)
+        if self._fonts.maxsize is not None and needed > self._fonts.maxsize:
+            logger.debug(f"Grow font registry from {self._fonts.maxsize} to {needed} fonts")
+            self._fonts.maxsize = needed
+        for font_path in font_paths:
+            for size in sizes:
+                self.get(font_path, size, layout_engine)
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._fonts.stats
+
+    def clear(self) -> None:
+        self._fonts.clear()
+
+    def _load(
+        self, path: str, size: int, layout_engine: typing.Optional[ImageFont.Layout]
+    ) -> ImageFont.FreeTypeFont:
+        logger.debug(f"Load font {path} with size {size}")
+        count("font_loads")
+        return ImageFont.truetype(path, size=size, encoding="utf-8", layout_engine=layout_engine)
+
+
+default_font_registry = FontRegistry()
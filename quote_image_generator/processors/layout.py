@@ -0,0 +1,68 @@
+import typing
+
+from PIL import ImageFont
+
+from quote_image_generator.types import Color, Point, Size, SizeBox, TextDrawEntityTypes
+
+__all__ = (
+    "EntitiesLayout",
+    "LayoutLine",
+    "LayoutRun",
+    "LayoutRunKind",
+)
+
+
+LayoutRunKind = typing.Literal["text", "emoji", "bar"]
+
+
+class LayoutRun(typing.NamedTuple):
+    """
+    A single paintable piece of an `EntitiesLayout`.
+
+    - `kind` "text" is a piece of text drawn with `font` and `color`, decorated according to
+      `entity_type` (underline, strikethrough), or to `styles` for a run of several entities.
+    - `kind` "emoji" is an emoji slot of `EntitiesLayout.emoji_size` pixels, filled with
+      `emoji_image` when the entity carried its own image or with the emoji source image of
+      `content` otherwise.
+    - `kind` "bar" is the vertical bar in front of quote and code block lines.
+
+    `position` is the top-left corner relative to `EntitiesLayout.origin` and `width` is the
+    horizontal advance of the run.
+    """
+
+    kind: LayoutRunKind
+    position: Point
+    width: int
+    line: int
+    entity_type: TextDrawEntityTypes
+    content: str = ""
+    font: typing.Optional[ImageFont.FreeTypeFont] = None
+    color: typing.Optional[Color] = None
+    emoji_image: typing.Optional[bytes] = None
+    styles: tuple[TextDrawEntityTypes, ...] = ()
+
+
+class LayoutLine(typing.NamedTuple):
+    y: int
+    width: int
+    height: int
+
+
+class EntitiesLayout(typing.NamedTuple):
+    """
+    Result of laying out draw entities inside a box: the fitted font size, the block size,
+    the aligned origin of the block inside the box, per-line metrics and every run to paint.
+
+    A layout only references fonts and emoji identifiers, so it can be computed, cached and
+    inspected without rasterising anything, and painted any number of times with
+    `TextProcessor.draw_layout`.
+    """
+
+    font_size: int
+    emoji_size: int
+    bar_width: int
+    box: SizeBox
+    origin: Point
+    size: Size
+    lines: tuple[LayoutLine, ...]
+    runs: tuple[LayoutRun, ...]
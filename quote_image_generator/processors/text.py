@@ -1,19 +1,23 @@
-import io
 import math
 import pathlib
 import typing
 
 import typing_extensions
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 
-from quote_image_generator.image_draw import CustomImageDraw
+from quote_image_generator.image_draw import CustomImageDraw, alpha_paste
+from quote_image_generator.instrumentation import count
 from quote_image_generator.processors.emoji import ABCEmojiSource
+from quote_image_generator.processors.fonts import FontRegistry, default_font_registry
+from quote_image_generator.processors.layout import EntitiesLayout, LayoutLine, LayoutRun
 from quote_image_generator.types import (
     DrawEntity,
+    EmojiDrawEntity,
     Point,
     Size,
     SizeBox,
     TextDrawEntity,
+    type_cast,
 )
 
 __all__ = ("TextProcessor",)
@@ -24,8 +28,17 @@ PIL_ANCHOR_SIZE = 2
 
 class TextProcessor:
 
-    def __init__(self, emoji_source: ABCEmojiSource) -> None:
+    # Smallest font sizes tried when fitting single lines and entities.
+    MIN_TEXT_FONT_SIZE: typing.ClassVar[int] = 1
+    MIN_ENTITIES_FONT_SIZE: typing.ClassVar[int] = 2
+
+    def __init__(
+        self,
+        emoji_source: ABCEmojiSource,
+        font_registry: typing.Optional[FontRegistry] = None,
+    ) -> None:
         self.emoji_source = emoji_source
+        self.font_registry = font_registry if font_registry is not None else default_font_registry
 
     def get_line_size_by_box(
         self,
@@ -41,20 +54,106 @@ class TextProcessor:
             text = text.replace(emoji, "", 1)
         font_path = font_path if isinstance(font_path, str) else str(font_path.absolute())
 
-        for size in range(max_font_size, 0, -1):
-            font = ImageFont.truetype(font_path, size=size, encoding="utf-8")
-            text_size = Size(math.floor(font.getlength(text)), size)
-            text_size = Size(
-                width=text_size.width
+        def measure(size: int) -> Size:
+            font = self.font_registry.get(font_path, size)
+            return Size(
+                width=math.floor(font.getlength(text))
                 + math.floor(len(emojies) * size * self.emoji_source.emoji_scale),
                 height=size,
             )
 
-            if text_size.width <= max_box_size.width and text_size.height <= max_box_size.height:
-                return size, text_size
-        raise ValueError(
-            f"Unable to fit text '{text}' within the box constraints {max_box_size} using any font size up to {max_font_size}."
+        fitted = self._fit_font_size(
+            measure, max_box_size, max_font_size, min_font_size=self.MIN_TEXT_FONT_SIZE
         )
+        if fitted is None:
+            raise ValueError(
+                f"Unable to fit text '{text}' within the box constraints {max_box_size} using any font size up to {max_font_size}."
+            )
+        return fitted
+
+    def _fit_font_size(
+        self,
+        measure: typing.Callable[[int], Size],
+        max_box_size: typing.Union[Size, SizeBox],
+        max_font_size: int,
+        min_font_size: int,
+    ) -> typing.Optional[tuple[int, Size]]:
+        """
+        Find the largest font size in `[min_font_size, max_font_size]` whose measured size fits
+        `max_box_size`, or `None` when even `min_font_size` does not fit.
+
+        Measured width and height grow monotonically with the font size, so instead of walking
+        down one size at a time the search gallops down from `max_font_size` with doubling steps
+        until a fitting size brackets the answer, then bisects the bracket. The returned size was
+        measured and fits, and the size right above it was measured and does not.
+        """
+
+        def fits(size: int) -> bool:
+            count("font_size_probes")
+            measured[size] = measure(size)
+            return (
+                measured[size].width <= max_box_size.width
+                and measured[size].height <= max_box_size.height
+            )
+
+        measured: dict[int, Size] = {}
+        too_big = None
+        for candidate in self._iter_galloping_sizes(max_font_size, min_font_size):
+            if fits(candidate):
+                fitting = candidate
+                break
+            too_big = candidate
+        else:
+            return None
+        if too_big is None:
+            return fitting, measured[fitting]
+
+        while too_big - fitting > 1:
+            middle = (too_big + fitting) // 2
+            if fits(middle):
+                fitting = middle
+            else:
+                too_big = middle
+        return fitting, measured[fitting]
+
+    @staticmethod
+    def _iter_galloping_sizes(max_font_size: int, min_font_size: int) -> typing.Iterator[int]:
+        """Sizes probed by `_fit_font_size` before it bisects, from `max_font_size` down."""
+        if max_font_size < min_font_size:
+            return
+        size, step = max_font_size, 1
+        yield size
+        while size > min_font_size:
+            size = max(size - step, min_font_size)
+            yield size
+            step *= 2
+
+    def get_font_size_probes(
+        self, max_font_size: int = 128, bisect_depth: int = 2
+    ) -> tuple[int, ...]:
+        """
+        Font sizes measured first when fitting text or entities up to `max_font_size`, largest
+        first: every size of the galloping search and the first `bisect_depth` bisection steps of
+        every bracket it can stop in. Loading them ahead, as `BatchRenderer` does, leaves only
+        the last few bisection steps of a fit to load fonts.
+        """
+
+        def bisect(fitting: int, too_big: int, depth: int) -> typing.Iterator[int]:
+            if depth and too_big - fitting > 1:
+                middle = (too_big + fitting) // 2
+                yield middle
+                yield from bisect(fitting, middle, depth - 1)
+                yield from bisect(middle, too_big, depth - 1)
+
+        sizes: set[int] = set()
+        for min_font_size in (self.MIN_TEXT_FONT_SIZE, self.MIN_ENTITIES_FONT_SIZE):
+            too_big = None
+            for size in self._iter_galloping_sizes(max_font_size, min_font_size):
+                sizes.add(size)
+                if too_big is not None:
+                    sizes.update(bisect(size, too_big, bisect_depth))
+                too_big = size
+        return tuple(sorted(sizes, reverse=True))
 
     def _redirect_position_by_anchor(
         self,
@@ -67,7 +166,7 @@ class TextProcessor:
         if len(pil_anchor) != PIL_ANCHOR_SIZE:
             raise ValueError("Invalid anchor string")
 
-        img_font = ImageFont.truetype(font, size=font_size, encoding="utf-8")
+        img_font = self.font_registry.get(font, font_size)
 
         ascent, descent = img_font.getmetrics()
 
@@ -98,19 +197,13 @@ class TextProcessor:
         pil_anchor: str = "lm",
     ):
         draw = image if isinstance(image, ImageDraw.ImageDraw) else ImageDraw.Draw(image)
-        font = ImageFont.truetype(
-            entity["font"],
-            size=font_size,
-            encoding="utf-8",
-        )
+        font = self.font_registry.get(entity["font"], font_size)
         current_position = Point(anchor.x, anchor.y)
         for chunk in self.emoji_source.chunk_by_emoji(entity["content"]):
             if chunk["type"] == "emoji":
-                emoji_image = self.emoji_source.get_image(chunk["content"]).resize(
-                    (emoji_size, emoji_size),
-                    Image.Resampling.LANCZOS,
-                )
-                draw._image.paste(
+                emoji_image = self.emoji_source.get_sized_image(chunk["content"], emoji_size)
+                alpha_paste(
+                    draw._image,
                     emoji_image,
                     self._redirect_position_by_anchor(
                         emoji_image,
@@ -119,7 +212,6 @@ class TextProcessor:
                         font_size=font_size,
                         pil_anchor=pil_anchor,
                     ),
-                    emoji_image.convert("RGBA"),
                 )
                 current_position = Point(current_position.x + emoji_size, current_position.y)
                 continue
@@ -133,195 +225,222 @@ class TextProcessor:
             )
             current_position = Point(current_position.x + length, current_position.y)
 
-    def get_entities_size(
-        self, entities: list[DrawEntity], max_box_size: SizeBox, max_font_size: int
-    ) -> tuple[int, Size]:
-        for size in range(max_font_size, 1, -1):
-            max_current_size = Size(0, size)
-            current_position = Point(0, 0)
-            for entity in entities:
-                if entity["type"] == "emoji":
-                    current_position = Point(
-                        current_position.x + math.floor(size * self.emoji_source.emoji_scale),
-                        current_position.y,
+    def _layout_runs(
+        self, entities: list[DrawEntity], font_size: int
+    ) -> tuple[Size, tuple[LayoutLine, ...], tuple[LayoutRun, ...]]:
+        emoji_size = math.floor(font_size * self.emoji_source.emoji_scale)
+        bar_width = math.floor(1 / 17 * font_size) or 1
+        runs: list[LayoutRun] = []
+        lines: list[LayoutLine] = []
+        current_position = Point(0, 0)
+
+        for entity in entities:
+            if entity["type"] == "emoji":
+                ent = type_cast(entity, EmojiDrawEntity)
+                runs.append(
+                    LayoutRun(
+                        kind="emoji",
+                        position=current_position,
+                        width=emoji_size,
+                        line=len(lines),
+                        entity_type="emoji",
+                        emoji_image=ent["emoji_image"],
                     )
-                elif entity["type"] == "new_line":
-                    current_position = Point(0, current_position.y + size)
-                elif entity["type"] in (
-                    "default",
-                    "italic",
-                    "code",
-                    "bold",
-                    "link",
-                    "underline",
-                    "strikethrough",
-                    "code_block",
-                    "quote",
-                ):
-                    content = entity["content"]
-
-                    emojies = self.emoji_source.get_emojies(content)
-                    for emoji in emojies:
-                        content = content.replace(emoji, "", 1)
-
-                    font = ImageFont.truetype(entity["font"], size=size, encoding="utf-8")
-                    text_size = Size(math.floor(font.getlength(content)), size)
-                    text_size = Size(
-                        width=text_size.width
-                        + math.floor(len(emojies) * size * self.emoji_source.emoji_scale),
-                        height=size,
+                )
+                current_position = Point(current_position.x + emoji_size, current_position.y)
+            elif entity["type"] == "new_line":
+                lines.append(LayoutLine(current_position.y, current_position.x, font_size))
+                current_position = Point(0, current_position.y + font_size)
+            elif entity["type"] in (
+                "default",
+                "link",
+                "bold",
+                "italic",
+                "underline",
+                "strikethrough",
+                "code",
+                "code_block",
+                "quote",
+            ):
+                ent = type_cast(entity, TextDrawEntity)
+                font = self.font_registry.get(ent["font"], font_size)
+
+                if ent["type"] in ("code_block", "quote"):
+                    runs.append(
+                        LayoutRun(
+                            kind="bar",
+                            position=current_position,
+                            width=bar_width + 5,
+                            line=len(lines),
+                            entity_type=ent["type"],
+                            color=ent["color"],
+                        )
                     )
                     current_position = Point(
-                        current_position.x + text_size.width, current_position.y
+                        current_position.x + bar_width + 5, current_position.y
                     )
-                else:
-                    typing_extensions.assert_never(entity["type"])
-
-                max_current_size = Size(
-                    max(max_current_size.width, current_position.x),
-                    max(max_current_size.height, current_position.y + size),
-                )
-            if (
-                max_current_size.width <= max_box_size.width
-                and max_current_size.height <= max_box_size.height
-            ):
-                return size, max_current_size
-
-        raise ValueError(
-            f"Unable to fit entities within the box constraints {max_box_size} using any font size up to {max_font_size}."
+                for chunk in self.emoji_source.chunk_by_emoji(ent["content"]):
+                    if chunk["type"] == "emoji":
+                        width = emoji_size
+                        runs.append(
+                            LayoutRun(
+                                kind="emoji",
+                                position=current_position,
+                                width=width,
+                                line=len(lines),
+                                entity_type=ent["type"],
+                                content=chunk["content"],
+                            )
+                        )
+                    else:
+                        width = math.ceil(font.getlength(chunk["content"]))
+                        runs.append(
+                            LayoutRun(
+                                kind="text",
+                                position=current_position,
+                                width=width,
+                                line=len(lines),
+                                entity_type=ent["type"],
+                                content=chunk["content"],
+                                font=font,
+                                color=ent["color"],
+                                styles=ent.get("styles", ()),
+                            )
+                        )
+                    current_position = Point(current_position.x + width, current_position.y)
+            else:
+                typing_extensions.assert_never(entity["type"])
+
+        lines.append(LayoutLine(current_position.y, current_position.x, font_size))
+        size = Size(
+            max(line.width for line in lines),
+            current_position.y + font_size,
         )
+        count("measured_runs", len(runs))
+        return size, tuple(lines), tuple(runs)
 
-    def draw_entities(
+    def layout_entities(
         self,
-        image: typing.Union[Image.Image, ImageDraw.ImageDraw],
         entities: list[DrawEntity],
         box: SizeBox,
         horizontal_align: typing.Literal["left", "middle", "right"],
         vertical_align: typing.Literal["top", "middle", "bottom"],
         max_font_size: int = 128,
-    ) -> None:
+    ) -> EntitiesLayout:
+        layouts: dict[int, tuple[Size, tuple[LayoutLine, ...], tuple[LayoutRun, ...]]] = {}
 
-        image = image if isinstance(image, Image.Image) else image._image
-        draw = CustomImageDraw(image)
+        def measure(size: int) -> Size:
+            layouts[size] = self._layout_runs(entities, size)
+            return layouts[size][0]
 
-        font_size, entities_size = self.get_entities_size(
-            entities, box, max_font_size=max_font_size
+        fitted = self._fit_font_size(
+            measure, box, max_font_size, min_font_size=self.MIN_ENTITIES_FONT_SIZE
         )
+        if fitted is None:
+            raise ValueError(
+                f"Unable to fit entities within the box constraints {box} using any font size up to {max_font_size}."
+            )
+        font_size, entities_size = fitted
+        _, lines, runs = layouts[font_size]
 
         delta_x = box.width - entities_size.width
         delta_y = box.height - entities_size.height
 
-        anchor = Point(box.x, box.y)  # left, top
+        origin = Point(box.x, box.y)  # left, top
 
         if horizontal_align == "middle":
-            anchor = Point(anchor.x + delta_x // 2, anchor.y)
+            origin = Point(origin.x + delta_x // 2, origin.y)
         if horizontal_align == "right":
-            anchor = Point(anchor.x + delta_x, anchor.y)
+            origin = Point(origin.x + delta_x, origin.y)
         if vertical_align == "middle":
-            anchor = Point(anchor.x, anchor.y + delta_y // 2)
+            origin = Point(origin.x, origin.y + delta_y // 2)
         if vertical_align == "bottom":
-            anchor = Point(anchor.x, anchor.y + delta_y)
+            origin = Point(origin.x, origin.y + delta_y)
+
+        return EntitiesLayout(
+            font_size=font_size,
+            emoji_size=math.floor(font_size * self.emoji_source.emoji_scale),
+            bar_width=math.floor(1 / 17 * font_size) or 1,
+            box=box,
+            origin=origin,
+            size=entities_size,
+            lines=lines,
+            runs=runs,
+        )
 
-        current_position = Point(anchor.x, anchor.y)
+    def get_entities_size(
+        self, entities: list[DrawEntity], max_box_size: SizeBox, max_font_size: int
+    ) -> tuple[int, Size]:
+        layout = self.layout_entities(
+            entities, max_box_size, "left", "top", max_font_size=max_font_size
+        )
+        return layout.font_size, layout.size
 
-        for entity in entities:
-            if entity["type"] == "emoji":
+    def draw_layout(
+        self,
+        image: typing.Union[Image.Image, ImageDraw.ImageDraw],
+        layout: EntitiesLayout,
+    ) -> None:
+        image = image if isinstance(image, Image.Image) else image._image
+        draw = CustomImageDraw(image)
+
+        for run in layout.runs:
+            position = Point(layout.origin.x + run.position.x, layout.origin.y + run.position.y)
+            if run.kind == "bar":
+                draw.line(
+                    (
+                        position.x,
+                        position.y + math.ceil(layout.bar_width * 1.3),
+                        position.x,
+                        position.y + layout.bar_width + layout.font_size,
+                    ),
+                    fill=run.color,
+                    width=layout.bar_width,
+                )
+            elif run.kind == "emoji":
                 emoji_image = (
-                    Image.open(io.BytesIO(entity["emoji_image"]))
-                    .convert("RGBA")
-                    .resize(
-                        (
-                            math.floor(font_size * self.emoji_source.emoji_scale),
-                            math.floor(font_size * self.emoji_source.emoji_scale),
-                        ),
-                        resample=Image.Resampling.LANCZOS,
+                    self.emoji_source.get_sized_image_from_bytes(
+                        run.emoji_image, layout.emoji_size
                     )
+                    if run.emoji_image is not None
+                    else self.emoji_source.get_sized_image(run.content, layout.emoji_size)
                 )
-                image.paste(
-                    emoji_image,
-                    current_position,
-                    emoji_image,
-                )
-                current_position = Point(current_position.x + font_size, current_position.y)
-            elif entity["type"] == "new_line":
-                current_position = Point(anchor.x, current_position.y + font_size)
-            elif entity["type"] in (
-                "default",
-                "link",
-                "bold",
-                "italic",
-                "underline",
-                "strikethrough",
-                "code",
-                "code_block",
-                "quote",
-            ):
-                font = ImageFont.truetype(
-                    entity["font"],
-                    size=font_size,
-                    encoding="utf-8",
-                )
-                emoji_size = math.floor(font_size * self.emoji_source.emoji_scale)
-
-                if entity["type"] in ("code_block", "quote"):
-                    line_width = math.floor(1 / 17 * font_size) or 1
-                    draw.line(
-                        (
-                            current_position.x,
-                            current_position.y + math.ceil(line_width * 1.3),
-                            current_position.x,
-                            current_position.y + line_width + font_size,
-                        ),
-                        fill=entity["color"],
-                        width=line_width,
-                    )
-                    current_position = Point(
-                        current_position.x + line_width + 5, current_position.y
+                alpha_paste(image, emoji_image, position)
+            else:
+                styles = run.styles or (run.entity_type,)
+                underline = "underline" in styles
+                strikethrough = "strikethrough" in styles
+                if underline and strikethrough:
+                    draw.decorated_text(
+                        position,
+                        run.content,
+                        font=run.font,
+                        fill=run.color,
+                        underline=True,
+                        strikethrough=True,
                     )
-                for chunk in self.emoji_source.chunk_by_emoji(entity["content"]):
-                    if chunk["type"] == "emoji":
-
-                        emoji_image = (
-                            self.emoji_source.get_image(chunk["content"])
-                            .resize(
-                                (emoji_size, emoji_size),
-                                resample=Image.Resampling.LANCZOS,
-                            )
-                            .convert("RGBA")
-                        )
-                        image.paste(
-                            emoji_image,
-                            current_position,
-                            emoji_image,
-                        )
-                        current_position = Point(
-                            current_position.x + emoji_size,
-                            current_position.y,
-                        )
-                    else:
+                elif underline:
+                    draw.underline_text(position, run.content, font=run.font, fill=run.color)
+                elif strikethrough:
+                    draw.strikethrough_text(position, run.content, font=run.font, fill=run.color)
+                else:
+                    draw.text(position, run.content, font=run.font, fill=run.color)
 
-                        if entity["type"] == "underline":
-                            draw.underline_text(
-                                current_position,
-                                chunk["content"],
-                                font=font,
-                                fill=entity["color"],
-                            )
-                        elif entity["type"] == "strikethrough":
-                            draw.strikethrough_text(
-                                current_position,
-                                chunk["content"],
-                                font=font,
-                                fill=entity["color"],
-                            )
-                        else:
-                            draw.text(
-                                current_position,
-                                chunk["content"],
-                                font=font,
-                                fill=entity["color"],
-                            )
-                        current_position = Point(
-                            current_position.x + math.ceil(font.getlength(chunk["content"])),
-                            current_position.y,
-                        )
+    def draw_entities(
+        self,
+        image: typing.Union[Image.Image, ImageDraw.ImageDraw],
+        entities: list[DrawEntity],
+        box: SizeBox,
+        horizontal_align: typing.Literal["left", "middle", "right"],
+        vertical_align: typing.Literal["top", "middle", "bottom"],
+        max_font_size: int = 128,
+    ) -> EntitiesLayout:
+        layout = self.layout_entities(
+            entities,
+            box,
+            horizontal_align=horizontal_align,
+            vertical_align=vertical_align,
+            max_font_size=max_font_size,
+        )
+        self.draw_layout(image, layout)
+        return layout
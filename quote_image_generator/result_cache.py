@@ -0,0 +1,331 @@
+import concurrent.futures
+import hashlib
+import logging
+import os
+import pathlib
+import struct
+import tempfile
+import threading
+import time
+import types
+import typing
+
+from PIL import Image
+
+from quote_image_generator.cache import CacheStats, LRUCache
+
+__all__ = (
+    "ResultCache",
+    "ResultCacheStats",
+    "content_key",
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def _feed(
+    digest: "hashlib._Hash", value: typing.Any, active: frozenset[int] = frozenset()
+) -> None:
+    # Every value is written as a type tag followed by a length-prefixed encoding, so that
+    # different values never produce the same stream. `active` holds the functions being hashed,
+    # so that recursive references end instead of looping.
+    def write(tag: bytes, data: bytes = b"") -> None:
+        digest.update(tag)
+        digest.update(struct.pack("<Q", len(data)))
+        digest.update(data)
+
+    if value is None or isinstance(value, bool):
+        write(b"c", repr(value).encode())
+    elif isinstance(value, (int, float)):
+        write(b"n", repr(value).encode())
+    elif isinstance(value, str):
+        write(b"s", value.encode("utf-8", "surrogatepass"))
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        write(b"b", hashlib.blake2b(value, digest_size=32).digest())
+    elif isinstance(value, Image.Image):
+        write(b"i", f"{value.mode}:{value.width}x{value.height}".encode())
+        write(b"b", hashlib.blake2b(value.tobytes(), digest_size=32).digest())
+    elif isinstance(value, tuple) and hasattr(value, "_fields"):
+        write(b"t", type(value).__qualname__.encode())
+        for field, item in zip(value._fields, value):
+            _feed(digest, field, active)
+            _feed(digest, item, active)
+    elif isinstance(value, (list, tuple)):
+        write(b"l", str(len(value)).encode())
+        for item in value:
+            _feed(digest, item, active)
+    elif isinstance(value, typing.Mapping):
+        write(b"m", str(len(value)).encode())
+        for key in sorted(value, key=repr):
+            _feed(digest, key, active)
+            _feed(digest, value[key], active)
+    elif isinstance(value, (set, frozenset)):
+        write(b"e", str(len(value)).encode())
+        for item in sorted(value, key=repr):
+            _feed(digest, item, active)
+    elif isinstance(value, os.PathLike):
+        write(b"p", os.fspath(value).encode("utf-8", "surrogatepass"))
+    elif isinstance(value, types.FunctionType):
+        if id(value) in active:
+            write(b"r", f"{value.__module__}.{value.__qualname__}".encode())
+        else:
+            _feed_function(digest, value, write, active | {id(value)})
+    elif isinstance(value, (types.ModuleType, types.BuiltinFunctionType, type)):
+        # Modules, builtins and classes referenced by a function are keyed by name, like the
+        # function itself.
+        name = getattr(value, "__qualname__", value.__name__)
+        write(b"g", f"{getattr(value, '__module__', None)}.{name}".encode())
+    else:
+        raise TypeError(f"Unable to build a content key from {type(value).__name__}")
+
+
+def _feed_code(
+    digest: "hashlib._Hash",
+    code: types.CodeType,
+    write: typing.Callable[[bytes, bytes], None],
+    active: frozenset[int],
+) -> None:
+    write(b"b", code.co_code)
+    # Attribute and global names are not part of the bytecode: `lambda fs: fs.bold` and
+    # `lambda fs: fs.italic` only differ by `co_names`.
+    _feed(digest, code.co_names, active)
+    write(b"l", str(len(code.co_consts)).encode())
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _feed_code(digest, const, write, active)
+        else:
+            # Constants of other types (complex, Ellipsis...) raise `TypeError`.
+            _feed(digest, const, active)
+
+
+def _iter_global_names(code: types.CodeType) -> typing.Iterator[str]:
+    yield from code.co_names
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            yield from _iter_global_names(const)
+
+
+def _feed_function(
+    digest: "hashlib._Hash",
+    function: types.FunctionType,
+    write: typing.Callable[[bytes, bytes], None],
+    active: frozenset[int],
+) -> None:
+    code = function.__code__
+    write(b"f", f"{function.__module__}.{function.__qualname__}".encode())
+    _feed_code(digest, code, write, active)
+    # Closures of the same code differ by their defaults and captured values.
+    _feed(digest, function.__defaults__, active)
+    _feed(digest, function.__kwdefaults__, active)
+    cells = function.__closure__ or ()
+    write(b"l", str(len(cells)).encode())
+    for cell in cells:
+        try:
+            captured = cell.cell_contents
+        except ValueError:
+            write(b"u", b"")  # Not assigned yet.
+            continue
+        _feed(digest, captured, active)
+    # Globals the code may read, including those of nested functions. Names that are not
+    # globals (attributes, builtins) are already covered by `co_names`.
+    global_names = sorted(
+        {name for name in _iter_global_names(code) if name in function.__globals__}
+    )
+    write(b"l", str(len(global_names)).encode())
+    for name in global_names:
+        _feed(digest, name, active)
+        _feed(digest, function.__globals__[name], active)
+
+
+def content_key(*values: typing.Any) -> str:
+    """
+    Canonical hash of `values`, stable across processes and runs.
+
+    Strings, numbers, containers and named tuples are hashed by value, bytes and images by
+    content and functions by name, code, names, defaults, captured values and the globals they
+    read. Other values, including functions that read such values, raise `TypeError`.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    for value in values:
+        _feed(digest, value)
+    return digest.hexdigest()
+
+
+class ResultCacheStats(typing.NamedTuple):
+    memory: CacheStats
+    disk_hits: int
+    disk_misses: int
+    coalesced: int
+
+
+class ResultCache:
+    """
+    Cache of encoded quotes keyed by `content_key`, shared by the threads of a `QuoteGenerator`
+    and, through the disk tier, by processes.
+
+    Parameters:
+    - `max_bytes` (int): Size of the in-memory LRU tier. Defaults to 64 MiB.
+    - `disk_dir` (Optional[Path]): Directory of the on-disk tier, disabled by default. Files are
+      written atomically, so several processes can share it.
+    - `disk_max_bytes` (int): Size of the on-disk tier. The oldest files are removed once it is
+      exceeded. Defaults to 512 MiB.
+    - `ttl` (Optional[float]): Seconds after which a result on disk is stale.
+
+    Methods:
+    - `get_or_render`: Returns the cached result or renders it. Concurrent calls with the same
+      key wait for the first one instead of rendering again.
+    - `get`, `put`, `clear`: Direct access to both tiers.
+    - `stats`: Hit and miss counters.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        disk_dir: typing.Optional[pathlib.Path] = None,
+        disk_max_bytes: int = 512 * 1024 * 1024,
+        ttl: typing.Optional[float] = None,
+    ) -> None:
+        self.disk_dir = pathlib.Path(disk_dir) if disk_dir is not None else None
+        self.disk_max_bytes = disk_max_bytes
+        self.ttl = ttl
+        self._memory: LRUCache[str, bytes] = LRUCache(
+            maxsize=None, max_bytes=max_bytes, sizeof=len
+        )
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, concurrent.futures.Future[bytes]] = {}
+        self._disk_bytes: typing.Optional[int] = None
+        self._disk_hits = 0
+        self._disk_misses = 0
+        self._coalesced = 0
+
+    @property
+    def stats(self) -> ResultCacheStats:
+        return ResultCacheStats(
+            memory=self._memory.stats,
+            disk_hits=self._disk_hits,
+            disk_misses=self._disk_misses,
+            coalesced=self._coalesced,
+        )
+
+    def get(self, key: str) -> typing.Optional[bytes]:
+        data = self._memory.get(key)
+        if data is None and self.disk_dir is not None:
+            data = self._read_disk(key)
+            if data is not None:
+                self._memory.put(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        self._memory.put(key, data)
+        if self.disk_dir is not None:
+            self._write_disk(key, data)
+
+    def get_or_render(self, key: str, render: typing.Callable[[], bytes]) -> bytes:
+        data = self.get(key)
+        if data is not None:
+            return data
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None and key in self._memory:
+                # Rendered by another thread since the lookup above.
+                data = self._memory.get(key)
+                if data is not None:
+                    return data
+            owner = future is None
+            if owner:
+                future = concurrent.futures.Future()
+                self._in_flight[key] = future
+            else:
+                self._coalesced += 1
+        if not owner:
+            return future.result()
+
+        try:
+            data = render()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            self.put(key, data)
+            future.set_result(data)
+            return data
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def clear(self) -> None:
+        self._memory.clear()
+        if self.disk_dir is not None:
+            for path in self._iter_disk_files():
+                path.unlink(missing_ok=True)
+            self._disk_bytes = 0
+
+    def _disk_path(self, key: str) -> pathlib.Path:
+        assert self.disk_dir is not None  # noqa: S101
+        return self.disk_dir / key[:2] / f"{key}.bin"
+
+    def _iter_disk_files(self) -> typing.Iterator[pathlib.Path]:
+        assert self.disk_dir is not None  # noqa: S101
+        return self.disk_dir.glob("*/*.bin")
+
+    def _read_disk(self, key: str) -> typing.Optional[bytes]:
+        path = self._disk_path(key)
+        try:
+            if self.ttl is not None and time.time() - path.stat().st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                raise FileNotFoundError(path)
+            data = path.read_bytes()
+        except OSError:
+            self._disk_misses += 1
+            return None
+        self._disk_hits += 1
+        return data
+
+    def _write_disk(self, key: str, data: bytes) -> None:
+        path = self._disk_path(key)
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_name, path)
+            except BaseException:
+                pathlib.Path(tmp_name).unlink(missing_ok=True)
+                raise
+        except OSError as e:
+            logger.debug(f"Unable to save result {key} to {path}: {e}")
+            return
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(data) - replaced
+            over_limit = self._disk_bytes is None or self._disk_bytes > self.disk_max_bytes
+        if over_limit:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        files = []
+        for path in self._iter_disk_files():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        if total > self.disk_max_bytes:
+            files.sort()
+            for mtime, size, path in files:
+                stale = self.ttl is not None and time.time() - mtime > self.ttl
+                if total <= self.disk_max_bytes and not stale:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+            logger.debug(f"Pruned result cache {self.disk_dir} to {total} bytes")
+        with self._lock:
+            self._disk_bytes = total
@@ -12,11 +12,14 @@ __all__ = (
     "ColorSet",
     "InputEntityType",
     "InputEntity",
+    "OffsetUnit",
     "EmojiDrawEntity",
     "NewLineDrawEntity",
     "TextDrawEntityTypes",
     "TextDrawEntity",
     "DrawEntity",
+    "OutputFormat",
+    "OutputSpec",
     "type_cast",
 )
 
@@ -76,6 +79,7 @@ class FontSet(typing.NamedTuple):
     bold: str
     italic: str
     mono: str
+    bold_italic: typing.Optional[str] = None
 
 
 Color: typing_extensions.TypeAlias = typing.Union[
@@ -102,6 +106,11 @@ InputEntityType = typing.Literal[
 ]
 
 
+# Unit of the offsets and lengths of input entities: Python string indexes or UTF-16 code
+# units, as used by Telegram and JavaScript.
+OffsetUnit = typing.Literal["code_point", "utf16"]
+
+
 class InputEntity(typing.TypedDict):
     type: InputEntityType
     offset: int
@@ -143,6 +152,8 @@ class TextDrawEntity(typing.TypedDict):
     content: str
     font: str
     color: Color
+    # Every style of a run covered by several entities, `type` being the one deciding its bar.
+    styles: typing_extensions.NotRequired[tuple[TextDrawEntityTypes, ...]]
 
 
 DrawEntity: typing_extensions.TypeAlias = typing.Union[
@@ -150,6 +161,36 @@ DrawEntity: typing_extensions.TypeAlias = typing.Union[
 ]
 
 
+OutputFormat = typing.Literal["PNG", "WEBP", "JPEG"]
+
+
+class OutputSpec(typing.NamedTuple):
+    """
+    Encoding of a generated quote.
+
+    - `PNG`: `compress_level` from 0 (no compression, fastest) to 9, zlib's default 6 if unset.
+    - `WEBP`: lossy with `quality` (0-100) or `lossless`, `method` from 0 (fastest) to 6.
+    - `JPEG`: `quality` from 0 to 95. The alpha channel is dropped.
+    """
+
+    format: OutputFormat = "PNG"
+    compress_level: typing.Optional[int] = None
+    quality: typing.Optional[int] = None
+    lossless: bool = False
+    method: typing.Optional[int] = None
+
+    def save_options(self) -> dict[str, typing.Any]:
+        if self.format == "PNG":
+            options = {"compress_level": self.compress_level}
+        elif self.format == "WEBP":
+            options = {"quality": self.quality, "lossless": self.lossless, "method": self.method}
+        elif self.format == "JPEG":
+            options = {"quality": self.quality}
+        else:
+            raise ValueError(f"Unsupported output format {self.format!r}")
+        return {key: value for key, value in options.items() if value is not None}
+
+
 T = typing.TypeVar("T")
 
 
@@ -0,0 +1,123 @@
+import functools
+import io
+import pathlib
+import typing
+
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from quote_image_generator import QuoteGenerator, pipelines, processors, types
+
+EMOJI_SEQUENCES = ("😂", "👍", "🔥", "❤️", "❤️‍🔥", "👨‍👩‍👧", "🇺🇦", "✨")
+
+
+@pytest.fixture(scope="session")
+def font_path(tmp_path_factory: pytest.TempPathFactory) -> str:
+    font = ImageFont.load_default(size=16)
+    if not isinstance(font, ImageFont.FreeTypeFont):
+        pytest.skip("Pillow was built without FreeType support")
+    path = tmp_path_factory.mktemp("fonts") / "font.ttf"
+    path.write_bytes(font.font_bytes)
+    return str(path)
+
+
+@pytest.fixture
+def fontset(font_path: str) -> types.FontSet:
+    return types.FontSet(default=font_path, bold=font_path, italic=font_path, mono=font_path)
+
+
+@pytest.fixture
+def colorset() -> types.ColorSet:
+    return types.ColorSet((255, 255, 255), (0, 0, 255), (255, 0, 0))
+
+
+@pytest.fixture
+def emoji_dir(tmp_path: pathlib.Path) -> pathlib.Path:
+    path = tmp_path / "emoji"
+    path.mkdir()
+    for index, sequence in enumerate(EMOJI_SEQUENCES):
+        image = Image.new("RGBA", (72, 72), (0, 0, 0, 0))
+        ImageDraw.Draw(image).ellipse((4, 4, 68, 68), fill=(index * 30, 255 - index * 30, 128))
+        image.save(path / (" ".join(f"U+{ord(char):X}" for char in sequence) + ".png"))
+    return path
+
+
+@pytest.fixture
+def entities_processor(
+    fontset: types.FontSet, colorset: types.ColorSet
+) -> processors.EntitiesProcessor:
+    return processors.EntitiesProcessor(fontset, colorset)
+
+
+@pytest.fixture
+def avatar() -> bytes:
+    image = Image.linear_gradient("L").resize((320, 240)).convert("RGB")
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+
+def build_generator(
+    emoji_dir: pathlib.Path, fontset: types.FontSet, colorset: types.ColorSet, **kwargs
+) -> QuoteGenerator:
+    return QuoteGenerator(
+        kwargs.pop("size", (800, 450)),
+        kwargs.pop(
+            "pipeline",
+            [
+                pipelines.GradientBackgroundPipeLine(),
+                pipelines.TextPipeLine(key="title"),
+                pipelines.EntitiesPipeLine(key="quote"),
+                pipelines.CircleImagePipeLine("author_image"),
+            ],
+        ),
+        text_processor=processors.TextProcessor(processors.FileEmojiSource(emoji_dir)),
+        entities_processor=processors.EntitiesProcessor(fontset, colorset),
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def generator_factory(
+    emoji_dir: pathlib.Path, fontset: types.FontSet, colorset: types.ColorSet
+) -> typing.Callable[..., QuoteGenerator]:
+    return functools.partial(build_generator, emoji_dir, fontset, colorset)
+
+
+@pytest.fixture
+def make_generator(
+    generator_factory: typing.Callable[..., QuoteGenerator],
+) -> typing.Iterator[typing.Callable[..., QuoteGenerator]]:
+    generators: list[QuoteGenerator] = []
+
+    def make(**kwargs) -> QuoteGenerator:
+        generator = generator_factory(**kwargs)
+        generators.append(generator)
+        return generator
+
+    yield make
+    for generator in generators:
+        generator.close()
+
+
+@pytest.fixture
+def make_request(avatar: bytes) -> typing.Callable[..., dict[str, typing.Any]]:
+    def make(index: int = 0, **kwargs) -> dict[str, typing.Any]:
+        quote = f"Quote {index} 😂\nBold line 🔥"
+        return {
+            "background_from_color": (255, 0, 0),
+            "background_to_color": (0, 0, 255),
+            "background_direction": "t-b",
+            "title_content": "Title ✨",
+            "title_box": types.SizeBox(25, 25, 750, 40),
+            "quote_input_text": quote,
+            "quote_input_enitites": [
+                types.InputEntity(type="bold", offset=quote.index("Bold"), length=9)
+            ],
+            "quote_box": types.SizeBox(25, 90, 750, 220),
+            "author_image_image": avatar,
+            "author_image_box": types.SizeBox(25, 330, 100, 100),
+            **kwargs,
+        }
+
+    return make
@@ -0,0 +1,66 @@
+import multiprocessing
+
+import pytest
+
+from quote_image_generator import BatchRenderer
+from quote_image_generator.processors import FileEmojiSource, FontRegistry, TextProcessor
+from quote_image_generator.types import Size
+
+
+@pytest.fixture
+def fork_context():
+    if "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("The fork start method is not available")
+    return multiprocessing.get_context("fork")
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_batch_renderer_matches_in_process_renders(
+    generator_factory, make_request, fork_context, ordered
+):
+    generator = generator_factory()
+    expected = [generator.generate_quote(**make_request(index)) for index in range(4)]
+
+    with BatchRenderer(generator_factory, processes=2, mp_context=fork_context) as renderer:
+        results = list(renderer.render((make_request(index) for index in range(4)), ordered))
+
+    if ordered:
+        assert [index for index, _ in results] == list(range(4))
+    assert dict(results) == dict(enumerate(expected))
+
+
+def test_batch_renderer_merges_shared_kwargs(generator_factory, make_request, fork_context):
+    request = make_request()
+    shared = {key: request.pop(key) for key in ("author_image_image", "background_direction")}
+    expected = generator_factory().generate_quote(**make_request())
+
+    with BatchRenderer(
+        generator_factory, processes=1, shared_kwargs=shared, mp_context=fork_context
+    ) as renderer:
+        assert list(renderer.render([request])) == [(0, expected)]
+
+
+def test_warm_grows_a_small_registry(fontset):
+    registry = FontRegistry(maxsize=4)
+    registry.warm(fontset, range(10, 20))
+
+    assert registry.stats.evictions == 0
+    assert registry.stats.entries == 10
+
+
+@pytest.mark.parametrize("min_font_size", [1, 2])
+def test_font_size_probes_cover_the_start_of_every_search(emoji_dir, min_font_size):
+    processor = TextProcessor(FileEmojiSource(emoji_dir))
+    warm = set(processor.get_font_size_probes(128))
+
+    for width in range(3 * min_font_size, 3 * 130):
+        probes = []
+
+        def measure(size, probes=probes):
+            probes.append(size)
+            return Size(3 * size, size)
+
+        processor._fit_font_size(measure, Size(width, 200), 128, min_font_size)
+        fitting = next(index for index, size in enumerate(probes) if 3 * size <= width)
+        # The galloping probes and the first two bisection steps after them are warm.
+        assert set(probes[: fitting + 3]) <= warm, (width, probes)
@@ -0,0 +1,112 @@
+import asyncio
+import concurrent.futures
+import threading
+
+import pytest
+
+from quote_image_generator import instrumentation
+from quote_image_generator.concurrency import iter_windowed
+
+
+class CountingHooks(instrumentation.Hooks):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pipes = 0
+
+    def on_pipe(self, pipe, wall_time, cpu_time):
+        with self.lock:
+            self.pipes += 1
+
+
+def test_iter_windowed_keeps_order_and_bounds_pending():
+    consumed = []
+
+    def items():
+        for index in range(20):
+            consumed.append(index)
+            yield index
+
+    with concurrent.futures.ThreadPoolExecutor(4) as executor:
+        results = iter_windowed(executor, lambda item: item * 2, items(), max_pending=3)
+        assert next(results) == (0, 0)
+        assert len(consumed) == 3
+        assert list(results) == [(index, index * 2) for index in range(1, 20)]
+
+
+def test_iter_windowed_unordered_yields_everything():
+    with concurrent.futures.ThreadPoolExecutor(4) as executor:
+        results = iter_windowed(executor, str, range(10), max_pending=2, ordered=False)
+        assert sorted(results) == [(index, str(index)) for index in range(10)]
+
+
+def test_iter_windowed_rejects_empty_window():
+    with (
+        concurrent.futures.ThreadPoolExecutor(1) as executor,
+        pytest.raises(ValueError, match="max_pending"),
+    ):
+        next(iter_windowed(executor, str, range(3), max_pending=0))
+
+
+def test_generate_many_matches_sequential_renders(make_generator, make_request):
+    generator = make_generator(max_workers=2)
+    expected = [generator.generate_quote(**make_request(index)) for index in range(4)]
+
+    results = dict(generator.generate_many(make_request(index) for index in range(4)))
+
+    assert [results[index] for index in range(4)] == expected
+
+
+def test_generate_many_uses_context_hooks(make_generator, make_request):
+    generator = make_generator(max_workers=2)
+    hooks = CountingHooks()
+
+    with instrumentation.use_hooks(hooks):
+        results = list(generator.generate_many(make_request(index) for index in range(3)))
+
+    assert len(results) == 3
+    assert hooks.pipes == 3 * len(generator.pipeline)
+
+
+def test_agenerate_quote_uses_context_hooks(make_generator, make_request):
+    generator = make_generator(max_workers=2)
+    hooks = CountingHooks()
+
+    async def render():
+        with instrumentation.use_hooks(hooks):
+            return await generator.agenerate_quote(**make_request())
+
+    assert asyncio.run(render()) == generator.generate_quote(**make_request())
+    assert hooks.pipes == len(generator.pipeline)
+
+
+def test_agenerate_quote_bounds_queued_renders(make_generator, make_request, monkeypatch):
+    generator = make_generator(max_workers=1, max_pending=2)
+    executor = generator.executor
+    submit = executor.submit
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+
+    def done(future):
+        nonlocal in_flight
+        with lock:
+            in_flight -= 1
+
+    def counting_submit(*args, **kwargs):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        future = submit(*args, **kwargs)
+        future.add_done_callback(done)
+        return future
+
+    monkeypatch.setattr(executor, "submit", counting_submit)
+
+    async def render_all():
+        return await asyncio.gather(
+            *(generator.agenerate_quote(**make_request(index)) for index in range(6))
+        )
+
+    assert len(asyncio.run(render_all())) == 6
+    assert peak == 2
@@ -0,0 +1,39 @@
+import pytest
+from PIL import Image, ImageChops
+
+from quote_image_generator import processors
+from quote_image_generator.processors.emoji_atlas import EmojiAtlas, write_emoji_atlas
+
+
+def test_atlas_source_matches_file_source(emoji_dir):
+    files = processors.FileEmojiSource(emoji_dir)
+    atlas = processors.AtlasEmojiSource(files.build_atlas())
+
+    assert sorted(atlas.atlas.rects) == sorted(files.emoji_table)
+    for emoji_id in files.emoji_table:
+        expected = files.get_image(emoji_id)
+        assert ImageChops.difference(atlas.get_image(emoji_id), expected).getbbox() is None
+    assert atlas.chunk_by_emoji("a😂b") == files.chunk_by_emoji("a😂b")
+
+
+def test_atlas_resizes_to_the_cell_size(tmp_path):
+    path = tmp_path / "emoji.atlas"
+    count = write_emoji_atlas(
+        [("a", Image.new("RGBA", (10, 10), "red")), ("a", Image.new("RGBA", (8, 8)))],
+        path,
+        cell_size=16,
+    )
+
+    atlas = EmojiAtlas(path)
+    assert count == len(atlas) == 1
+    assert atlas.get_image("a").size == (16, 16)
+
+
+def test_failed_write_leaves_no_files(tmp_path):
+    def images():
+        yield "a", Image.new("RGBA", (16, 16))
+        raise RuntimeError("broken image")
+
+    with pytest.raises(RuntimeError, match="broken image"):
+        write_emoji_atlas(images(), tmp_path / "emoji.atlas", cell_size=16)
+    assert list(tmp_path.iterdir()) == []
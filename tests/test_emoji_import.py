@@ -0,0 +1,65 @@
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from quote_image_generator import processors
+from quote_image_generator.processors.emoji_import import iter_unicode_emoji_list
+
+RED, GREEN, BLUE = (255, 0, 0, 255), (0, 255, 0, 255), (0, 0, 255, 255)
+
+
+def image_src(color):
+    output = io.BytesIO()
+    Image.new("RGBA", (4, 4), color).save(output, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(output.getvalue()).decode()
+
+
+def row(code, *cells):
+    images = "".join(f'<td class="{classes}"><img src="{src}"></td>' for classes, src in cells)
+    return f'<tr><td class="rchars">1</td><td class="code"><a>{code}</a></td>{images}</tr>\n'
+
+
+@pytest.fixture
+def chart(tmp_path):
+    path = tmp_path / "full-emoji-list.html"
+    path.write_text(
+        '<html><body><table>\n<tr><th class="cchars">Code</th><th>Sample</th></tr>\n'
+        # The `andr alt` image is preferred over the first `andr` one.
+        + row("U+1F602", ("andr", image_src(RED)), ("andr alt", image_src(GREEN)))
+        + row("U+1F44D", ("apple", image_src(RED)), ("andr", image_src(BLUE)))
+        + row("U+2764 U+FE0F", ("andr", image_src(GREEN)))
+        # No Android image: skipped.
+        + row("U+1F525", ("apple", image_src(RED))) + "</table></body></html>",
+        encoding="utf-8",
+    )
+    return path
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64])
+def test_chart_is_streamed_in_chunks(chart, chunk_size):
+    rows = list(iter_unicode_emoji_list(chart, chunk_size=chunk_size))
+
+    assert rows == list(iter_unicode_emoji_list(chart))
+    assert [code for code, _ in rows] == ["U+1F602", "U+1F44D", "U+2764 U+FE0F"]
+
+
+def test_chart_is_imported(chart, tmp_path):
+    emoji_dir = tmp_path / "emoji"
+    source = processors.FileEmojiSource(emoji_dir)
+
+    assert source.parse_from_unicode_html(chart, workers=2, max_pending=1) == 3
+
+    assert sorted(path.name for path in emoji_dir.glob("*.png")) == [
+        "U+1F44D.png",
+        "U+1F602.png",
+        "U+2764 U+FE0F.png",
+    ]
+    with Image.open(emoji_dir / "U+1F602.png") as image:
+        assert image.convert("RGBA").getpixel((0, 0)) == GREEN
+    with Image.open(emoji_dir / "U+1F44D.png") as image:
+        assert image.convert("RGBA").getpixel((0, 0)) == BLUE
+    assert source.is_emoji("😂")
+    assert source.is_emoji("❤️")
+    assert not source.is_emoji("🔥")
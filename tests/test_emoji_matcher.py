@@ -0,0 +1,62 @@
+import json
+import re
+
+import pytest
+
+from quote_image_generator.processors.emoji_matcher import EmojiMatcher
+
+SEQUENCES = ("😂", "❤️", "❤️‍🔥", "🇺🇦", "©", "👨‍👩‍👧", "👨")
+
+
+@pytest.fixture
+def matcher():
+    return EmojiMatcher(SEQUENCES)
+
+
+def regex_split(text):
+    pattern = re.compile(
+        "({})".format("|".join(map(re.escape, sorted(SEQUENCES, key=len, reverse=True))))
+    )
+    return [(chunk in SEQUENCES, chunk) for chunk in pattern.split(text) if chunk]
+
+
+def test_longest_sequence_wins(matcher):
+    assert matcher.findall("❤️‍🔥 ❤️ 👨‍👩‍👧 👨") == ["❤️‍🔥", "❤️", "👨‍👩‍👧", "👨"]
+
+
+@pytest.mark.parametrize(
+    "text", ["", "plain text", "😂😂", "a😂b❤️c", "© 2024 🇺🇦!", "👨‍👩 partial", "Цитата ❤️‍🔥"]
+)
+def test_split_matches_the_alternation_regex(matcher, text):
+    assert matcher.split(text) == regex_split(text)
+
+
+def test_count_and_contains(matcher):
+    assert matcher.count("😂 x 😂 🇺🇦") == 3
+    assert "🇺🇦" in matcher
+    assert "🇺" not in matcher
+    assert len(matcher) == len(SEQUENCES)
+
+
+def test_dump_writes_json_and_load_reads_it_back(matcher, tmp_path):
+    path = tmp_path / "matcher.json"
+    matcher.dump(path, "signature")
+
+    assert json.loads(path.read_text(encoding="utf-8"))["signature"] == "signature"
+    loaded = EmojiMatcher.load(path, "signature")
+    assert loaded is not None
+    assert len(loaded) == len(matcher)
+    assert loaded.split("a😂b❤️‍🔥") == matcher.split("a😂b❤️‍🔥")
+
+
+def test_load_rejects_stale_and_broken_files(matcher, tmp_path):
+    path = tmp_path / "matcher.json"
+    assert EmojiMatcher.load(path, "signature") is None
+
+    matcher.dump(path, "signature")
+    assert EmojiMatcher.load(path, "other") is None
+
+    path.write_bytes(b"\x80\x05not json")
+    assert EmojiMatcher.load(path, "signature") is None
+    path.write_text('{"version": 2}', encoding="utf-8")
+    assert EmojiMatcher.load(path, "signature") is None
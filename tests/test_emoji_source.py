@@ -0,0 +1,82 @@
+import json
+import os
+
+from PIL import Image
+
+from quote_image_generator import processors
+
+
+def test_index_is_written_once_and_read_back(emoji_dir, monkeypatch):
+    source = processors.FileEmojiSource(emoji_dir)
+    source.emoji_table  # noqa: B018
+    index_file = source.cache_dir / source.INDEX_FILE_NAME
+    assert json.loads(index_file.read_text(encoding="utf-8"))["files"]
+
+    def fail(self, name):
+        raise AssertionError(f"{name} was parsed again")
+
+    monkeypatch.setattr(processors.FileEmojiSource, "_parse_file_name", fail)
+    source = processors.FileEmojiSource(emoji_dir)
+    assert source.is_emoji("😂")
+    assert source._read_index() is not None
+
+
+def test_index_write_leaves_only_the_cache_and_stays_valid(emoji_dir):
+    source = processors.FileEmojiSource(emoji_dir)
+    source.get_emoji_matcher()
+
+    hidden = {path.name for path in emoji_dir.iterdir() if path.name.startswith(".")}
+    assert hidden == {source.CACHE_DIR_NAME}
+    assert {path.name for path in source.cache_dir.iterdir()} == {
+        source.INDEX_FILE_NAME,
+        source.MATCHER_FILE_NAME,
+    }
+    # Renaming the index into place must not leave it stale.
+    assert source._read_index() is not None
+
+
+def test_index_write_keeps_the_emoji_dir_mtime(emoji_dir):
+    processors.FileEmojiSource(emoji_dir).emoji_table  # noqa: B018
+    mtime_ns = emoji_dir.stat().st_mtime_ns
+
+    source = processors.FileEmojiSource(emoji_dir)
+    source.refresh_index()
+    source.get_emoji_matcher()
+
+    assert emoji_dir.stat().st_mtime_ns == mtime_ns
+
+
+def test_emoji_added_during_a_scan_invalidate_the_index(emoji_dir, monkeypatch):
+    scandir = os.scandir
+
+    def scandir_then_add(path):
+        entries = list(scandir(path))
+        Image.new("RGBA", (8, 8)).save(emoji_dir / "U+1F389.png")
+        return entries
+
+    source = processors.FileEmojiSource(emoji_dir)
+    monkeypatch.setattr(os, "scandir", scandir_then_add)
+    assert not source.is_emoji("🎉")
+    monkeypatch.undo()
+
+    assert source._read_index() is None
+    assert processors.FileEmojiSource(emoji_dir).is_emoji("🎉")
+
+
+def test_added_emoji_invalidate_the_index(emoji_dir):
+    source = processors.FileEmojiSource(emoji_dir)
+    assert not source.is_emoji("🎉")
+
+    Image.new("RGBA", (8, 8)).save(emoji_dir / "U+1F389.png")
+
+    assert processors.FileEmojiSource(emoji_dir).is_emoji("🎉")
+    source.refresh_index()
+    assert source.is_emoji("🎉")
+
+
+def test_partial_index_is_ignored(emoji_dir):
+    source = processors.FileEmojiSource(emoji_dir)
+    source.cache_dir.mkdir()
+    (source.cache_dir / source.INDEX_FILE_NAME).write_text('{"version": 2, "fi')
+
+    assert source.is_emoji("😂")
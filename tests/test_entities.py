@@ -0,0 +1,171 @@
+import pytest
+
+from quote_image_generator import types
+from quote_image_generator.processors import EntitiesProcessor
+
+COLORS = types.ColorSet((1, 1, 1), (2, 2, 2), (3, 3, 3))
+
+
+@pytest.fixture
+def processor():
+    return EntitiesProcessor(types.FontSet("default", "bold", "italic", "mono", "bi"), COLORS)
+
+
+def contents(draw_entities):
+    return [(entity["type"], entity.get("content")) for entity in draw_entities]
+
+
+def test_text_without_entities_is_one_default_run(processor):
+    assert contents(processor.convert_input_to_draw_entity("plain text", [])) == [
+        ("default", "plain text")
+    ]
+
+
+def test_empty_text(processor):
+    assert processor.convert_input_to_draw_entity("", []) == []
+
+
+def test_entities_split_the_text(processor):
+    draw_entities = processor.convert_input_to_draw_entity(
+        "a bold and code",
+        [
+            types.InputEntity(type="bold", offset=2, length=4),
+            types.InputEntity(type="code", offset=11, length=4),
+        ],
+    )
+
+    assert contents(draw_entities) == [
+        ("default", "a "),
+        ("bold", "bold"),
+        ("default", " and "),
+        ("code", "code"),
+    ]
+    assert [entity["offset"] for entity in draw_entities] == [0, 2, 6, 11]
+    assert draw_entities[1]["font"] == "bold"
+    assert draw_entities[3]["font"] == "mono"
+    assert draw_entities[3]["color"] == COLORS.code
+
+
+def test_overlapping_styles_combine(processor):
+    draw_entities = processor.convert_input_to_draw_entity(
+        "abc def ghi",
+        [
+            types.InputEntity(type="bold", offset=0, length=7),
+            types.InputEntity(type="italic", offset=4, length=7),
+        ],
+    )
+
+    assert contents(draw_entities) == [("bold", "abc "), ("bold", "def"), ("italic", " ghi")]
+    assert draw_entities[1]["styles"] == ("bold", "italic")
+    assert draw_entities[1]["font"] == "bi"
+    assert "styles" not in draw_entities[0]
+
+
+def test_bold_italic_falls_back_to_bold(processor):
+    processor = EntitiesProcessor(types.FontSet("default", "bold", "italic", "mono"), COLORS)
+    draw_entities = processor.convert_input_to_draw_entity(
+        "abc",
+        [
+            types.InputEntity(type="italic", offset=0, length=3),
+            types.InputEntity(type="bold", offset=0, length=3),
+        ],
+    )
+
+    assert draw_entities[0]["font"] == "bold"
+
+
+def test_mono_and_link_color_win(processor):
+    draw_entities = processor.convert_input_to_draw_entity(
+        "abc",
+        [
+            types.InputEntity(type="bold", offset=0, length=3),
+            types.InputEntity(type="link", offset=0, length=3),
+            types.InputEntity(type="code", offset=1, length=1),
+        ],
+    )
+
+    assert [entity["color"] for entity in draw_entities] == [COLORS.link, COLORS.code, COLORS.link]
+    # Links use the italic font, so bold links use the bold italic one.
+    assert [entity["font"] for entity in draw_entities] == ["bi", "mono", "bi"]
+    assert draw_entities[1]["styles"] == ("code", "link", "bold")
+
+
+def test_nested_entities_with_the_same_end(processor):
+    draw_entities = processor.convert_input_to_draw_entity(
+        "abcdef",
+        [
+            types.InputEntity(type="underline", offset=0, length=6),
+            types.InputEntity(type="strikethrough", offset=3, length=3),
+        ],
+    )
+
+    assert contents(draw_entities) == [("underline", "abc"), ("underline", "def")]
+    assert draw_entities[1]["styles"] == ("underline", "strikethrough")
+
+
+def test_new_lines_split_runs(processor):
+    draw_entities = processor.convert_input_to_draw_entity(
+        "ab\ncd", [types.InputEntity(type="bold", offset=1, length=3)]
+    )
+
+    assert contents(draw_entities) == [
+        ("default", "a"),
+        ("bold", "b"),
+        ("new_line", None),
+        ("bold", "c"),
+        ("default", "d"),
+    ]
+
+
+def test_quote_bar_starts_every_line(processor):
+    draw_entities = processor.convert_input_to_draw_entity(
+        "q1\nq2",
+        [
+            types.InputEntity(type="quote", offset=0, length=5),
+            types.InputEntity(type="bold", offset=1, length=3),
+        ],
+    )
+
+    assert contents(draw_entities) == [
+        ("quote", "q"),
+        ("bold", "1"),
+        ("new_line", None),
+        ("quote", "q"),
+        ("default", "2"),
+    ]
+    assert draw_entities[3]["styles"] == ("bold", "quote")
+    assert draw_entities[4]["styles"] == ("quote",)
+
+
+def test_emoji_entity_replaces_its_text(processor):
+    draw_entities = processor.convert_input_to_draw_entity(
+        "x :) y",
+        [
+            types.InputEntity(type="emoji", offset=2, length=2, emoji_image=b"png"),
+            types.InputEntity(type="bold", offset=0, length=6),
+        ],
+    )
+
+    assert contents(draw_entities) == [("bold", "x "), ("emoji", None), ("bold", " y")]
+    assert draw_entities[1]["emoji_image"] == b"png"
+
+
+def test_entities_past_the_end_are_clamped(processor):
+    draw_entities = processor.convert_input_to_draw_entity(
+        "abc",
+        [
+            types.InputEntity(type="bold", offset=1, length=10),
+            types.InputEntity(type="italic", offset=7, length=2),
+        ],
+    )
+
+    assert contents(draw_entities) == [("default", "a"), ("bold", "bc")]
+
+
+def test_empty_entities_are_ignored(processor):
+    draw_entities = processor.convert_input_to_draw_entity(
+        "abc", [types.InputEntity(type="bold", offset=1, length=0)]
+    )
+
+    assert "".join(entity["content"] for entity in draw_entities) == "abc"
+    assert {entity["type"] for entity in draw_entities} == {"default"}
@@ -0,0 +1,69 @@
+import math
+
+import pytest
+
+from quote_image_generator import processors, types
+from quote_image_generator.types import Size, SizeBox
+
+
+def linear_fit(measure, box, max_font_size, min_font_size):
+    for size in range(max_font_size, min_font_size - 1, -1):
+        measured = measure(size)
+        if measured.width <= box.width and measured.height <= box.height:
+            return size, measured
+    return None
+
+
+@pytest.fixture
+def text_processor(emoji_dir):
+    return processors.TextProcessor(processors.FileEmojiSource(emoji_dir))
+
+
+@pytest.mark.parametrize("max_font_size", [1, 2, 3, 17, 64, 128])
+@pytest.mark.parametrize("min_font_size", [1, 2, 5])
+def test_fit_matches_a_linear_walk(text_processor, max_font_size, min_font_size):
+    # Rounded non-linear growth, with plateaus, like measured text.
+    def measure(size):
+        return Size(math.floor(size * 2.7 + math.sqrt(size) * 3), size + size // 9)
+
+    for width in range(0, 400, 3):
+        for height in (0, 1, 2, 10, 40, 200):
+            box = Size(width, height)
+            assert text_processor._fit_font_size(
+                measure, box, max_font_size, min_font_size
+            ) == linear_fit(measure, box, max_font_size, min_font_size), (box,)
+
+
+@pytest.mark.parametrize(
+    "text", ["A", "Quote 😂", "A much longer line of text with emoji 🔥 and ✨ in it"]
+)
+def test_line_size_matches_a_linear_walk(text_processor, font_path, text):
+    def measure(size):
+        return text_processor.get_line_size_by_box(text, Size(10**6, size), font_path, size)[1]
+
+    for box in (Size(20, 20), Size(120, 30), Size(400, 80), Size(2000, 200), Size(10**6, 10**6)):
+        expected = linear_fit(measure, box, 128, text_processor.MIN_TEXT_FONT_SIZE)
+        if expected is None:
+            with pytest.raises(ValueError, match="Unable to fit"):
+                text_processor.get_line_size_by_box(text, box, font_path, 128)
+        else:
+            assert text_processor.get_line_size_by_box(text, box, font_path, 128) == expected
+
+
+@pytest.mark.parametrize("text", ["A", "Quote 😂\nBold line 🔥", "word " * 40 + "\nlast line ✨"])
+def test_entities_size_matches_a_linear_walk(text_processor, entities_processor, text):
+    entities = entities_processor.convert_input_to_draw_entity(
+        text, [types.InputEntity(type="bold", offset=0, length=1)]
+    )
+
+    def measure(size):
+        return text_processor._layout_runs(entities, size)[0]
+
+    for box in (SizeBox(0, 0, 40, 20), SizeBox(0, 0, 300, 120), SizeBox(0, 0, 750, 220)):
+        expected = linear_fit(measure, box, 128, text_processor.MIN_ENTITIES_FONT_SIZE)
+        if expected is None:
+            with pytest.raises(ValueError, match="Unable to fit"):
+                text_processor.layout_entities(entities, box, "left", "top")
+            continue
+        layout = text_processor.layout_entities(entities, box, "left", "top", max_font_size=128)
+        assert (layout.font_size, layout.size) == expected
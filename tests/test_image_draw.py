@@ -0,0 +1,40 @@
+import pytest
+from PIL import Image
+
+from quote_image_generator import processors, types
+from quote_image_generator.image_draw import alpha_paste
+
+
+def test_alpha_paste_combines_alpha_on_rgba():
+    im = Image.new("RGBA", (4, 4), (0, 0, 0, 0))
+    alpha_paste(im, Image.new("RGBA", (2, 2), (255, 0, 0, 128)), (1, 1))
+
+    assert im.getpixel((1, 1)) == (255, 0, 0, 128)
+    assert im.getpixel((0, 0)) == (0, 0, 0, 0)
+
+
+def test_alpha_paste_clips_to_the_image():
+    im = Image.new("RGBA", (4, 4), (0, 0, 0, 255))
+    alpha_paste(im, Image.new("RGBA", (4, 4), (0, 255, 0, 255)), (-2, 2))
+
+    assert im.getbbox() == (0, 0, 4, 4)
+    assert im.getpixel((1, 3)) == (0, 255, 0, 255)
+    assert im.getpixel((2, 3)) == (0, 0, 0, 255)
+
+
+@pytest.mark.parametrize("mode", ["RGB", "L"])
+def test_alpha_paste_falls_back_to_paste(mode):
+    im = Image.new(mode, (4, 4))
+    alpha_paste(im, Image.new("RGBA", (2, 2), (255, 255, 255, 255)), (0, 0))
+
+    assert im.getbbox() == (0, 0, 2, 2)
+
+
+def test_draw_entities_on_rgb_image(emoji_dir, entities_processor):
+    text_processor = processors.TextProcessor(processors.FileEmojiSource(emoji_dir))
+    entities = entities_processor.convert_input_to_draw_entity("Hello 😂 world", [])
+    image = Image.new("RGB", (400, 100))
+
+    text_processor.draw_entities(image, entities, types.SizeBox(0, 0, 400, 100), "left", "top")
+
+    assert image.getbbox() is not None
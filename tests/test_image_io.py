@@ -0,0 +1,66 @@
+import io
+
+import pytest
+from PIL import Image
+
+from quote_image_generator import pipelines, types
+from quote_image_generator.image_io import (
+    ImageTooLargeError,
+    decode_image,
+    decodes_reduced,
+    resize_image,
+)
+
+
+def encode(image, image_format):
+    output = io.BytesIO()
+    image.save(output, format=image_format)
+    return output.getvalue()
+
+
+def test_decode_image_resizes_to_rgba(avatar):
+    image = decode_image(avatar, (64, 48))
+
+    assert image.mode == "RGBA"
+    assert image.size == (64, 48)
+
+
+def test_decode_image_checks_max_pixels():
+    data = encode(Image.new("RGB", (200, 100)), "PNG")
+
+    with pytest.raises(ImageTooLargeError):
+        decode_image(data, (20, 10), max_pixels=10_000)
+    assert decode_image(data, (20, 10), max_pixels=20_000).size == (20, 10)
+
+
+def test_jpeg_limit_counts_the_reduced_scale():
+    data = encode(Image.new("RGB", (800, 800)), "JPEG")
+
+    assert decodes_reduced(data)
+    assert decode_image(data, (50, 50), max_pixels=100_000).size == (50, 50)
+    with pytest.raises(ImageTooLargeError):
+        decode_image(data, None, max_pixels=100_000)
+
+
+def test_resize_image_does_not_modify_its_input():
+    image = Image.new("RGBA", (40, 40), (255, 0, 0, 255))
+
+    resized = resize_image(image, (40, 40))
+    resized.putalpha(0)
+
+    assert image.getpixel((0, 0)) == (255, 0, 0, 255)
+
+
+def test_image_pipes_accept_positional_keys():
+    pipe = pipelines.CircleImagePipeLine("avatar", ["box", "image"], ["keep_square"])
+
+    assert pipe.required_keys == ["box", "image"]
+    assert pipe.optional_keys == ["keep_square"]
+
+
+def test_image_pipe_draws_inside_its_box(make_generator, avatar):
+    generator = make_generator(size=(200, 200), pipeline=[pipelines.ImagePipeLine("avatar")])
+
+    image = generator.render(avatar_image=avatar, avatar_box=types.SizeBox(50, 50, 100, 100))
+
+    assert image.getbbox() == (50, 50, 150, 150)
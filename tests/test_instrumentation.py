@@ -0,0 +1,53 @@
+from quote_image_generator import instrumentation, pipelines
+
+
+def test_prometheus_render_exposes_recorded_events():
+    hooks = instrumentation.PrometheusHooks(namespace="qig")
+    title = pipelines.TextPipeLine(key='ti"tle\n')
+    hooks.on_pipe(title, 0.25, 0.125)
+    hooks.on_pipe(title, 0.5, 0.25)
+    hooks.on_pipe(pipelines.GradientBackgroundPipeLine(), 1.0, 0.5)
+    hooks.on_count("cached_pipes", 2)
+    hooks.on_count("cached_pipes")
+    hooks.on_count("font_size_probes", 7)
+    hooks.on_encode("PNG", 0.5, 100)
+    hooks.on_encode("PNG", 0.25, 50)
+
+    assert hooks.render() == (
+        "# HELP qig_pipe_runs_total Pipe runs.\n"
+        "# TYPE qig_pipe_runs_total counter\n"
+        'qig_pipe_runs_total{pipe="GradientBackgroundPipeLine",key=""} 1\n'
+        'qig_pipe_runs_total{pipe="TextPipeLine",key="ti\\"tle\\n"} 2\n'
+        "# HELP qig_pipe_seconds_total Time spent in pipes.\n"
+        "# TYPE qig_pipe_seconds_total counter\n"
+        'qig_pipe_seconds_total{pipe="GradientBackgroundPipeLine",key="",clock="cpu"} 0.5\n'
+        'qig_pipe_seconds_total{pipe="GradientBackgroundPipeLine",key="",clock="wall"} 1.0\n'
+        'qig_pipe_seconds_total{pipe="TextPipeLine",key="ti\\"tle\\n",clock="cpu"} 0.375\n'
+        'qig_pipe_seconds_total{pipe="TextPipeLine",key="ti\\"tle\\n",clock="wall"} 0.75\n'
+        "# HELP qig_events_total Counted rendering events.\n"
+        "# TYPE qig_events_total counter\n"
+        'qig_events_total{event="cached_pipes"} 3\n'
+        'qig_events_total{event="font_size_probes"} 7\n'
+        "# HELP qig_encodes_total Encoded quotes.\n"
+        "# TYPE qig_encodes_total counter\n"
+        'qig_encodes_total{format="PNG"} 2\n'
+        "# HELP qig_encode_seconds_total Time spent encoding quotes.\n"
+        "# TYPE qig_encode_seconds_total counter\n"
+        'qig_encode_seconds_total{format="PNG"} 0.75\n'
+        "# HELP qig_encode_bytes_total Size of the encoded quotes.\n"
+        "# TYPE qig_encode_bytes_total counter\n"
+        'qig_encode_bytes_total{format="PNG"} 150\n'
+    )
+
+
+def test_prometheus_hooks_record_a_render(make_generator, make_request):
+    hooks = instrumentation.PrometheusHooks()
+    generator = make_generator(hooks=hooks)
+    for _ in range(3):
+        generator.generate_quote(**make_request())
+
+    lines = hooks.render().splitlines()
+
+    assert 'quote_image_generator_pipe_runs_total{pipe="EntitiesPipeLine",key="quote"} 3' in lines
+    assert 'quote_image_generator_encodes_total{format="PNG"} 3' in lines
+    assert any(line.startswith('quote_image_generator_events_total{event="') for line in lines)
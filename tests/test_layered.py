@@ -0,0 +1,40 @@
+from PIL import Image, ImageChops
+
+from quote_image_generator import pipelines, types
+
+
+def assert_same_pixels(first: Image.Image, second: Image.Image) -> None:
+    assert first.size == second.size
+    assert ImageChops.difference(first, second).getbbox() is None
+
+
+def test_layered_render_matches_direct_render(make_generator, make_request):
+    direct = make_generator()
+    layered = make_generator(layered=True)
+
+    for index in (0, 1, 0, 2):
+        request = make_request(index)
+        assert_same_pixels(layered.render(**request), direct.render(**request))
+
+
+def test_layered_render_reuses_unchanged_layers(make_generator, make_request):
+    layered = make_generator(layered=True)
+    layered.render(**make_request(0))
+    misses = layered.layer_cache_stats.misses
+
+    layered.render(**make_request(1))
+
+    # Only the quote changed, so only its layer is drawn again.
+    assert layered.layer_cache_stats.misses == misses + 1
+
+
+def test_layered_render_of_translucent_pipes(make_generator, avatar):
+    pipeline = [pipelines.CircleImagePipeLine("author_image")]
+    direct = make_generator(size=(200, 200), pipeline=pipeline)
+    layered = make_generator(size=(200, 200), pipeline=pipeline, layered=True)
+    request = {
+        "author_image_image": avatar,
+        "author_image_box": types.SizeBox(50, 50, 100, 100),
+    }
+
+    assert_same_pixels(layered.render(**request), direct.render(**request))
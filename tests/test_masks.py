@@ -0,0 +1,41 @@
+from quote_image_generator import pipelines
+from quote_image_generator.masks import MaskProvider
+
+
+def test_masks_are_cached():
+    provider = MaskProvider()
+    mask = provider.get_mask("ellipse", (40, 40))
+
+    assert provider.get_mask("ellipse", (40, 40)) is mask
+    assert provider.stats.hits == 1
+
+
+def test_rectangle_mask_is_opaque():
+    mask = MaskProvider().get_mask("rectangle", (10, 20), radius=5)
+
+    assert mask.mode == "L"
+    assert mask.getextrema() == (255, 255)
+
+
+def test_ellipse_mask_is_antialiased():
+    mask = MaskProvider().get_mask("ellipse", (40, 40))
+
+    assert mask.getpixel((0, 0)) == 0
+    assert mask.getpixel((20, 20)) == 255
+    assert any(0 < value < 255 for value in mask.getdata())
+
+
+def test_rounded_radius_is_clamped():
+    provider = MaskProvider()
+
+    assert provider.get_mask("rounded_rectangle", (20, 20), radius=100) is provider.get_mask(
+        "rounded_rectangle", (20, 20), radius=10
+    )
+    assert provider.get_mask("rounded_rectangle", (20, 20)).getextrema() == (255, 255)
+
+
+def test_rounded_pipe_keeps_the_30px_default_radius():
+    pipe = pipelines.RoundedImagePipeLine("avatar")
+
+    assert pipe.get_mask_spec((500, 500)) == ("rounded_rectangle", 30)
+    assert pipe.get_mask_spec((500, 500), radius=8) == ("rounded_rectangle", 8)
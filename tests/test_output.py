@@ -0,0 +1,65 @@
+import io
+
+import pytest
+from PIL import Image
+
+from quote_image_generator import instrumentation
+from quote_image_generator.types import OutputSpec
+
+
+class RecordingHooks(instrumentation.Hooks):
+    def __init__(self):
+        self.encodes = []
+
+    def on_encode(self, image_format, seconds, nbytes):
+        self.encodes.append((image_format, nbytes))
+
+
+class WriteOnlyStream:
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+
+    def flush(self):
+        pass
+
+    def tell(self):
+        raise io.UnsupportedOperation("tell")
+
+
+@pytest.mark.parametrize(
+    "output_spec", [OutputSpec(), OutputSpec("JPEG", quality=80), OutputSpec("WEBP")]
+)
+def test_save_image_to_non_seekable_stream_with_hooks(make_generator, output_spec):
+    hooks = RecordingHooks()
+    generator = make_generator(hooks=hooks)
+    stream = WriteOnlyStream()
+
+    generator.save_image(Image.new("RGBA", (64, 64), (255, 0, 0, 255)), stream, output_spec)
+
+    data = b"".join(stream.chunks)
+    assert Image.open(io.BytesIO(data)).format == output_spec.format
+    assert hooks.encodes == [(output_spec.format, len(data))]
+
+
+def test_save_image_to_path_with_hooks(make_generator, tmp_path):
+    hooks = RecordingHooks()
+    generator = make_generator(hooks=hooks)
+    path = tmp_path / "quote.png"
+
+    generator.save_image(Image.new("RGBA", (64, 64)), path)
+
+    assert hooks.encodes == [("PNG", path.stat().st_size)]
+
+
+def test_generate_quote_encodes_with_output_spec(make_generator, make_request):
+    generator = make_generator(output_spec=OutputSpec("JPEG", quality=80))
+    data = generator.generate_quote(**make_request())
+
+    assert Image.open(io.BytesIO(data)).format == "JPEG"
+    assert (
+        Image.open(io.BytesIO(generator.generate_quote(OutputSpec(), **make_request()))).format
+        == "PNG"
+    )
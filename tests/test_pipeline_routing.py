@@ -0,0 +1,79 @@
+import typing
+
+import pytest
+
+from quote_image_generator.pipelines.base import (
+    KeywordRoute,
+    MissingPipelineKeysError,
+    RedirectKeywordPipeLine,
+    route_kwargs,
+)
+
+
+class RecordingPipeLine(RedirectKeywordPipeLine):
+    REQUIRED_ARGS: typing.ClassVar[list[str]] = ["box"]
+    OPTIONAL_ARGS: typing.ClassVar[list[str]] = ["color"]
+    OUTPUT_KEYS = ()
+
+    def __init__(self, key, **kwargs):
+        super().__init__(key, **kwargs)
+        self.calls = []
+
+    def _pipe(self, im, generator, /, **kwargs):
+        self.calls.append(kwargs)
+
+
+class UnroutedRecordingPipeLine(RecordingPipeLine):
+    INPUT_KEYS = None
+
+
+def test_missing_keys_are_reported_upfront(make_generator):
+    first, second = RecordingPipeLine("first"), RecordingPipeLine("second")
+    generator = make_generator(pipeline=[first, second])
+
+    with pytest.raises(MissingPipelineKeysError) as error:
+        generator.render()
+
+    assert error.value.missing == [(first, ("first_box",)), (second, ("second_box",))]
+    assert str(error.value) == (
+        "Missing pipeline keys: RecordingPipeLine('first'): first_box; "
+        "RecordingPipeLine('second'): second_box"
+    )
+    assert first.calls == []
+
+
+def test_pipe_kwargs_satisfy_required_keys(make_generator):
+    pipe = RecordingPipeLine("first", first_box=(1, 2))
+    make_generator(pipeline=[pipe]).render()
+
+    assert pipe.calls == [{"box": (1, 2), "debug": False}]
+
+
+@pytest.mark.parametrize("pipe_type", [RecordingPipeLine, UnroutedRecordingPipeLine])
+def test_redirected_kwargs(make_generator, pipe_type):
+    pipe = pipe_type("first")
+    make_generator(pipeline=[pipe]).render(first_box=(1, 2), first_color="red", other=1)
+
+    assert pipe.calls[0]["box"] == (1, 2)
+    assert pipe.calls[0]["color"] == "red"
+    # Only the unrouted pipe receives every kwarg.
+    assert ("other" in pipe.calls[0]) is (pipe_type is UnroutedRecordingPipeLine)
+
+
+@pytest.mark.parametrize("pipe_type", [RecordingPipeLine, UnroutedRecordingPipeLine])
+def test_plain_key_wins_over_prefixed_key(make_generator, pipe_type):
+    pipe = pipe_type("first")
+    make_generator(pipeline=[pipe]).render(box=(1, 2), first_box=(3, 4))
+
+    assert pipe.calls[0]["box"] == (1, 2)
+
+
+def test_route_kwargs_skips_optional_none():
+    route = (
+        KeywordRoute("box", ("box", "first_box"), required=True),
+        KeywordRoute("color", ("color", "first_color")),
+    )
+
+    assert route_kwargs(route, {"first_box": 1, "first_color": None}) == ({"box": 1}, ())
+    assert route_kwargs(route, {"first_box": 1, "color": None}) == ({"box": 1, "color": None}, ())
+    assert route_kwargs(route, {"first_color": None}) == ({}, ("first_box",))
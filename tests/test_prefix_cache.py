@@ -0,0 +1,64 @@
+from quote_image_generator import instrumentation, pipelines
+
+
+class CountingHooks(instrumentation.Hooks):
+    def __init__(self):
+        self.counts = {}
+
+    def on_count(self, name, value=1):
+        self.counts[name] = self.counts.get(name, 0) + value
+
+
+def requests(make_request):
+    # The background and title repeat, the quote changes on every render.
+    return [make_request(index % 3) for index in range(8)]
+
+
+def test_prefix_cache_renders_the_same_pixels(make_generator, make_request):
+    direct = make_generator()
+    cached = make_generator(prefix_cache_size=8)
+
+    for request in requests(make_request):
+        assert cached.render(**request).tobytes() == direct.render(**request).tobytes()
+
+
+def test_prefix_cache_skips_repeated_pipes(make_generator, make_request):
+    hooks = CountingHooks()
+    generator = make_generator(prefix_cache_size=8, hooks=hooks)
+
+    for request in requests(make_request):
+        generator.render(**request)
+
+    assert hooks.counts.get("cached_pipes", 0) > 0
+    assert generator.prefix_cache_stats.hits > 0
+
+
+def test_prefix_cache_follows_pipeline_changes(make_generator, make_request):
+    generator = make_generator(prefix_cache_size=8)
+    for _ in range(3):
+        generator.render(**make_request())
+
+    generator.pipeline = generator.pipeline[:1]
+    direct = make_generator(pipeline=generator.pipeline[:1])
+
+    assert (
+        generator.render(**make_request()).tobytes() == direct.render(**make_request()).tobytes()
+    )
+
+    # A pipe with the same inputs but another color.
+    generator.pipeline = [
+        *generator.pipeline,
+        pipelines.TextPipeLine(key="title", title_color=(255, 0, 0)),
+    ]
+    for _ in range(3):
+        generator.render(**make_request())
+    generator.pipeline[-1] = pipelines.TextPipeLine(key="title", title_color=(0, 255, 0))
+    direct = make_generator(pipeline=list(generator.pipeline))
+
+    assert (
+        generator.render(**make_request()).tobytes() == direct.render(**make_request()).tobytes()
+    )
+
+
+def test_disabled_prefix_cache_has_no_stats(make_generator):
+    assert make_generator().prefix_cache_stats is None
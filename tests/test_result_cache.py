@@ -0,0 +1,192 @@
+import concurrent.futures
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from quote_image_generator import ResultCache, pipelines
+from quote_image_generator.result_cache import content_key
+
+
+def test_content_key_is_stable_and_typed():
+    assert content_key({"a": 1, "b": [1, 2]}) == content_key({"b": [1, 2], "a": 1})
+    assert content_key(1) != content_key("1")
+    assert content_key(("a", "b")) != content_key(("ab",))
+
+
+def test_content_key_rejects_unknown_objects():
+    with pytest.raises(TypeError):
+        content_key(object())
+
+
+def test_content_key_hashes_closures_by_captured_values():
+    def make(path):
+        return lambda fs: path
+
+    assert content_key(make("a")) != content_key(make("b"))
+    assert content_key(make("a")) == content_key(make("a"))
+
+
+def test_content_key_hashes_defaults():
+    def make(size):
+        def scale(value, size=size):
+            return value * size
+
+        return scale
+
+    assert content_key(make(1)) != content_key(make(2))
+
+
+def test_content_key_hashes_attribute_names():
+    assert content_key(lambda fs: fs.bold) != content_key(lambda fs: fs.italic)
+
+
+SCALE = 2
+
+
+def scaled(value):
+    return value * SCALE
+
+
+def test_content_key_hashes_referenced_globals(monkeypatch):
+    key = content_key(scaled)
+    monkeypatch.setattr(sys.modules[__name__], "SCALE", 3)
+
+    assert content_key(scaled) != key
+
+
+def test_content_key_rejects_functions_reading_unkeyable_globals():
+    with pytest.raises(TypeError):
+        content_key(lambda: RECORDS)
+
+
+RECORDS = object()
+
+
+def test_content_key_of_nested_code_is_stable_across_processes():
+    source = (
+        "from quote_image_generator.result_cache import content_key\n"
+        "def outer(value):\n"
+        "    return [lambda: value + item for item in range(3)]\n"
+        "print(content_key(outer))\n"
+    )
+    keys = {
+        subprocess.run(  # noqa: S603
+            [sys.executable, "-c", source], capture_output=True, text=True, check=True
+        ).stdout
+        for _ in range(2)
+    }
+    assert len(keys) == 1
+
+
+def test_get_or_render_coalesces_concurrent_calls():
+    cache = ResultCache()
+    started = threading.Event()
+    release = threading.Event()
+    renders = []
+
+    def render():
+        renders.append(1)
+        started.set()
+        release.wait(5)
+        return b"image"
+
+    with concurrent.futures.ThreadPoolExecutor(4) as executor:
+        futures = [executor.submit(cache.get_or_render, "key", render)]
+        started.wait(5)
+        futures += [executor.submit(cache.get_or_render, "key", render) for _ in range(3)]
+        while cache.stats.coalesced < 3:
+            time.sleep(0.001)
+        release.set()
+        assert [future.result() for future in futures] == [b"image"] * 4
+
+    assert len(renders) == 1
+    assert cache.stats.coalesced == 3
+
+
+def test_failed_render_is_not_cached():
+    cache = ResultCache()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_render("key", fail)
+    assert cache.get_or_render("key", lambda: b"image") == b"image"
+
+
+def test_disk_tier_is_shared(tmp_path):
+    ResultCache(disk_dir=tmp_path).put("abcd", b"image")
+    reopened = ResultCache(disk_dir=tmp_path)
+    assert reopened.get("abcd") == b"image"
+    assert reopened.stats.disk_hits == 1
+
+
+def test_disk_ttl_expires_results(tmp_path):
+    cache = ResultCache(disk_dir=tmp_path, ttl=60)
+    cache.put("abcd", b"image")
+    path = cache._disk_path("abcd")
+    os.utime(path, (time.time() - 120, time.time() - 120))
+
+    assert ResultCache(disk_dir=tmp_path, ttl=60).get("abcd") is None
+    assert not path.exists()
+
+
+def test_disk_eviction_removes_oldest(tmp_path):
+    cache = ResultCache(disk_dir=tmp_path, disk_max_bytes=250)
+    for index, key in enumerate(("aa01", "aa02", "aa03")):
+        cache.put(key, bytes(100))
+        os.utime(cache._disk_path(key), (1000 + index, 1000 + index))
+
+    assert not cache._disk_path("aa01").exists()
+    assert cache._disk_path("aa02").exists()
+    assert cache._disk_path("aa03").exists()
+
+
+def test_overwriting_a_key_does_not_grow_the_disk_budget(tmp_path):
+    cache = ResultCache(disk_dir=tmp_path, disk_max_bytes=250)
+    cache.put("aa01", bytes(100))
+    cache.put("aa02", bytes(100))
+    for _ in range(5):
+        cache.put("aa02", bytes(100))
+
+    assert cache._disk_bytes == 200
+    assert cache._disk_path("aa01").exists()
+
+
+def test_generate_quote_uses_the_cache(make_generator, make_request):
+    cache = ResultCache()
+    generator = make_generator(result_cache=cache)
+    first = generator.generate_quote(**make_request())
+
+    assert generator.generate_quote(**make_request()) == first
+    assert cache.stats.memory.hits == 1
+    assert generator.generate_quote(**make_request(1)) != first
+
+
+def test_unkeyable_pipe_renders_uncached(make_generator, make_request):
+    pipe = pipelines.GradientBackgroundPipeLine()
+    pipe.helper = object()
+    cache = ResultCache()
+    generator = make_generator(
+        result_cache=cache, pipeline=[pipe, pipelines.TextPipeLine(key="title")]
+    )
+
+    request = make_request()
+    assert generator.get_result_key(**request) is None
+    assert generator.generate_quote(**request) == generator.generate_quote(**request)
+    assert cache.stats.memory.hits == 0
+
+
+def test_result_key_changes_with_emoji_files(make_generator, make_request, emoji_dir):
+    generator = make_generator(result_cache=ResultCache())
+    key = generator.get_result_key(**make_request())
+
+    path = next(emoji_dir.glob("*.png"))
+    path.write_bytes(path.read_bytes() + b"\0")
+    generator.text_processor.emoji_source.refresh_index()
+
+    assert generator.get_result_key(**make_request()) != key
@@ -0,0 +1,76 @@
+import io
+
+import pytest
+from PIL import Image
+
+from quote_image_generator import pipelines, types
+from quote_image_generator.image_io import resize_image
+
+BOX = types.SizeBox(10, 10, 100, 100)
+
+
+@pytest.fixture
+def render(make_generator):
+    pipe = pipelines.RoundedImagePipeLine("avatar", tile_cache_bytes=8 * 1024 * 1024)
+    generator = make_generator(size=(300, 200), pipeline=[pipe])
+
+    def render(image, box=BOX, **kwargs):
+        return generator.render(avatar_image=image, avatar_box=box, **kwargs).tobytes()
+
+    render.pipe = pipe
+    return render
+
+
+def encode(color):
+    output = io.BytesIO()
+    Image.new("RGB", (64, 64), color).save(output, format="PNG")
+    return output.getvalue()
+
+
+def test_same_image_and_size_is_a_hit(render):
+    first = render(encode("red"))
+
+    assert render(encode("red")) == first
+    assert render.pipe.tile_cache_stats.hits == 1
+    assert render(encode("blue")) != first
+    assert render.pipe.tile_cache_stats.misses == 2
+
+
+@pytest.mark.parametrize(
+    ("box", "kwargs"),
+    [(BOX, {"avatar_radius": 5}), (types.SizeBox(10, 10, 80, 80), {})],
+    ids=["mask", "size"],
+)
+def test_other_mask_or_size_is_a_miss(render, box, kwargs):
+    render(encode("red"))
+    render(encode("red"), box, **kwargs)
+
+    assert render.pipe.tile_cache_stats.hits == 0
+    assert render.pipe.tile_cache_stats.entries == 2
+
+
+def test_decoded_images_are_cached_by_image_cache_key(render):
+    image = Image.new("RGBA", (100, 100), (255, 0, 0, 255))
+    original = image.tobytes()
+
+    render(image)
+    assert render.pipe.tile_cache_stats.entries == 0
+
+    first = render(image, avatar_image_cache_key=("user", 1))
+    assert render(image, avatar_image_cache_key=("user", 1)) == first
+    assert render.pipe.tile_cache_stats.hits == 1
+    # The tile is masked, the image of the caller is not.
+    assert image.tobytes() == original
+
+
+@pytest.mark.parametrize("mode", ["RGB", "RGBA", "L"])
+@pytest.mark.parametrize("size", [(100, 100), (50, 50)])
+def test_resize_image_leaves_the_image_unchanged(mode, size):
+    image = Image.new(mode, (100, 100), "red")
+    original = image.tobytes()
+
+    tile = resize_image(image, size)
+    tile.putalpha(0)
+
+    assert tile is not image
+    assert (image.mode, image.size, image.tobytes()) == (mode, (100, 100), original)
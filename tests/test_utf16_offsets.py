@@ -0,0 +1,99 @@
+import pytest
+
+from quote_image_generator import types
+from quote_image_generator.processors import EntitiesProcessor, utf16_offset_index
+
+
+@pytest.fixture
+def processor():
+    return EntitiesProcessor(
+        types.FontSet("default", "bold", "italic", "mono"),
+        types.ColorSet((1, 1, 1), (2, 2, 2), (3, 3, 3)),
+    )
+
+
+def code_point_offset(text, offset):
+    return len(text.encode("utf-16-le")[: offset * 2].decode("utf-16-le", "ignore"))
+
+
+@pytest.mark.parametrize("text", ["", "ascii", "é一", "😂", "a😂b", "😂😂", "🇺🇦 x", "👨‍👩‍👧!"])
+def test_index_matches_utf16_encoding(text):
+    index = utf16_offset_index(text)
+
+    assert len(index) == len(text.encode("utf-16-le")) // 2 + 1
+    assert index == [code_point_offset(text, offset) for offset in range(len(index))]
+
+
+def test_both_halves_of_a_surrogate_pair_map_to_its_code_point():
+    assert utf16_offset_index("a😂b") == [0, 1, 1, 2, 3]
+
+
+def test_utf16_entities_after_emoji(processor):
+    text = "😂😂 bold"
+    draw_entities = processor.convert_input_to_draw_entity(
+        text, [types.InputEntity(type="bold", offset=5, length=4)], "utf16"
+    )
+
+    assert draw_entities[-1]["content"] == "bold"
+    assert draw_entities[-1]["offset"] == text.index("bold")
+
+
+def test_utf16_entity_covering_a_surrogate_pair(processor):
+    draw_entities = processor.convert_input_to_draw_entity(
+        "a😂b", [types.InputEntity(type="bold", offset=1, length=2)], "utf16"
+    )
+
+    assert [(entity["type"], entity["content"]) for entity in draw_entities] == [
+        ("default", "a"),
+        ("bold", "😂"),
+        ("default", "b"),
+    ]
+
+
+def test_utf16_offsets_inside_a_pair_snap_to_its_start(processor):
+    draw_entities = processor.convert_input_to_draw_entity(
+        "a😂b", [types.InputEntity(type="bold", offset=2, length=2)], "utf16"
+    )
+
+    assert [(entity["type"], entity["content"]) for entity in draw_entities] == [
+        ("default", "a"),
+        ("bold", "😂b"),
+    ]
+
+
+def test_utf16_entities_past_the_end_are_clamped(processor):
+    draw_entities = processor.convert_input_to_draw_entity(
+        "😂ab",
+        [
+            types.InputEntity(type="bold", offset=3, length=10),
+            types.InputEntity(type="italic", offset=20, length=1),
+        ],
+        "utf16",
+    )
+
+    assert [(entity["type"], entity["content"]) for entity in draw_entities] == [
+        ("default", "😂a"),
+        ("bold", "b"),
+    ]
+
+
+def test_utf16_mode_equals_converted_code_point_entities(processor):
+    text = "x 😂 y 🇺🇦 z ❤️‍🔥 w"
+    utf16_entities = [
+        types.InputEntity(type="bold", offset=0, length=5),
+        types.InputEntity(type="italic", offset=7, length=6),
+        types.InputEntity(type="code", offset=14, length=8),
+    ]
+    code_point_entities = [
+        types.InputEntity(
+            type=entity["type"],
+            offset=code_point_offset(text, entity["offset"]),
+            length=code_point_offset(text, entity["offset"] + entity["length"])
+            - code_point_offset(text, entity["offset"]),
+        )
+        for entity in utf16_entities
+    ]
+
+    assert processor.convert_input_to_draw_entity(
+        text, utf16_entities, "utf16"
+    ) == processor.convert_input_to_draw_entity(text, code_point_entities)
@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from quote_image_generator import pipelines, types
+
+SIZES = ((800, 450), (450, 450), (320, 180))
+
+
+class BoxRecordingPipeLine(pipelines.BasePipeLine):
+    INPUT_KEYS = ("quote_box", "author_image_box")
+    OUTPUT_KEYS = ()
+
+    def __init__(self):
+        super().__init__()
+        self.boxes = {}
+
+    def pipe(self, im, generator, /, **kwargs):
+        self.boxes[im.size] = (kwargs["quote_box"], kwargs["author_image_box"])
+
+
+def grid_pipeline(recorder):
+    return [
+        pipelines.GradientBackgroundPipeLine(),
+        pipelines.GridResizePipeLine(),
+        recorder,
+        pipelines.EntitiesPipeLine(key="quote"),
+        pipelines.CircleImagePipeLine("author_image"),
+    ]
+
+
+@pytest.fixture(params=[1, 4], ids=["1 cpu", "4 cpus"])
+def cpu_count(request, monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: request.param)
+    return request.param
+
+
+def test_render_variants_matches_one_generator_per_size(make_generator, make_request, cpu_count):
+    generator = make_generator()
+    request = make_request()
+
+    variants = generator.render_variants(SIZES, **request)
+
+    assert [variant.size for variant in variants] == list(SIZES)
+    for size, variant in zip(SIZES, variants):
+        expected = make_generator(size=size).render(**request)
+        assert variant.tobytes() == expected.tobytes()
+
+
+def test_render_variants_scales_grid_boxes(make_generator, make_request, cpu_count):
+    recorder = BoxRecordingPipeLine()
+    generator = make_generator(pipeline=grid_pipeline(recorder))
+    request = make_request(
+        box_keys=["quote_box", "author_image_box"],
+        grid_image_size=(800, 450),
+        quote_box=types.SizeBox(80, 90, 640, 180),
+        author_image_box=types.SizeBox(40, 300, 120, 120),
+    )
+
+    variants = generator.render_variants(SIZES, **request)
+
+    # Every size scales the boxes of the request, not the ones of another variant.
+    assert recorder.boxes == {
+        (800, 450): (types.SizeBox(80, 90, 640, 180), types.SizeBox(40, 300, 120, 120)),
+        (450, 450): (types.SizeBox(45, 90, 360, 180), types.SizeBox(22, 300, 67, 120)),
+        (320, 180): (types.SizeBox(32, 36, 256, 72), types.SizeBox(16, 120, 48, 48)),
+    }
+    for size, variant in zip(SIZES, variants):
+        expected = make_generator(size=size, pipeline=grid_pipeline(BoxRecordingPipeLine()))
+        assert variant.tobytes() == expected.render(**request).tobytes()
+
+
+def test_generate_variants_encodes_every_size(make_generator, make_request):
+    generator = make_generator()
+
+    assert len(generator.generate_variants(SIZES, **make_request())) == len(SIZES)